@@ -1,8 +1,12 @@
 from fastapi import APIRouter
-from app.api.routes import auth, exams, student
+from app.api.routes import auth, debug, exams, jobs, media, search, student
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router)
 api_router.include_router(exams.router)
 api_router.include_router(student.router)
+api_router.include_router(jobs.router)
+api_router.include_router(search.router)
+api_router.include_router(media.router)
+api_router.include_router(debug.router)
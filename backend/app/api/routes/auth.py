@@ -1,11 +1,16 @@
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 
-from app.core import get_db, get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token
+from app.core import (
+    get_db, get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token,
+    require_role
+)
+from app.core.admission import admission_control
 from app.models import User
-from app.schemas import UserRegister, UserLogin, TokenResponse, TokenRefresh, UserResponse
+from app.schemas import UserRegister, UserLogin, TokenResponse, TokenRefresh, UserResponse, RosterReport
+from app.services import roster
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -14,7 +19,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     """Register a new user (teacher or student)."""
     # Check if email exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
+    result = await db.execute(select(User).where(func.lower(User.email) == user_data.email))
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -32,10 +37,42 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     return user
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/roster", response_model=RosterReport)
+async def provision_roster(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """
+    Create student accounts in bulk from a CSV roster.
+    
+    Columns: email, full_name, and optionally password (generated and
+    returned in the report when blank) and role (students only).
+    """
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Roster must be UTF-8 CSV")
+    
+    try:
+        rows = await roster.provision(db, text)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    await db.commit()
+    
+    created = sum(1 for r in rows if r.status == "created")
+    failed = sum(1 for r in rows if r.status == "invalid")
+    return RosterReport(created=created, skipped=len(rows) - created - failed, failed=failed, rows=rows)
+
+
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(admission_control("login", rate_per_minute=10, burst=5, per="email"))]
+)
 async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Authenticate user and return JWT tokens."""
-    result = await db.execute(select(User).where(User.email == credentials.email))
+    result = await db.execute(select(User).where(func.lower(User.email) == credentials.email))
     user = result.scalar_one_or_none()
     
     if not user or not verify_password(credentials.password, user.password_hash):
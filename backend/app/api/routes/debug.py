@@ -0,0 +1,44 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core import settings
+from app.core import profiler
+from app.schemas import ProfileSummary
+
+router = APIRouter(prefix="/debug", tags=["Debug (Admin)"])
+
+
+def require_profiler_token(x_profiler_token: Optional[str] = Header(None)):
+    """Operators only: the PROFILER_TOKEN secret, not a user role."""
+    if not settings.PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiler.is_authorized(x_profiler_token):
+        raise HTTPException(status_code=403, detail="Invalid profiler token")
+
+
+@router.get("/profiles", response_model=List[ProfileSummary], dependencies=[Depends(require_profiler_token)])
+async def list_profiles(path: Optional[str] = None, limit: int = Query(50, ge=1, le=1000)):
+    """Recent request profiles of the worker that serves this request, newest first."""
+    profiles = [p for p in profiler.recent_profiles() if path is None or p.path.startswith(path)]
+    return [ProfileSummary(**p.summary()) for p in profiles[:limit]]
+
+
+@router.get("/profiles/merged", response_class=PlainTextResponse, dependencies=[Depends(require_profiler_token)])
+async def merged_profile(path: Optional[str] = None, kind: str = Query("wall", pattern="^(wall|cpu)$")):
+    """Collapsed stacks summed over this worker's recent profiles (optionally one path prefix)."""
+    profiles = [p for p in profiler.recent_profiles() if path is None or p.path.startswith(path)]
+    return PlainTextResponse(profiler.merged_collapsed(profiles, kind))
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_profiler_token)])
+async def get_profile(profile_id: str, kind: str = Query("wall", pattern="^(wall|cpu)$")):
+    """
+    One profile as collapsed stacks ("frame;frame;frame count" per line),
+    ready for flamegraph.pl or speedscope. wall includes time spent awaiting
+    the database; cpu only samples where the request was running.
+    """
+    profile = profiler.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found (it may be on another worker)")
+    return PlainTextResponse(profile.collapsed(kind))
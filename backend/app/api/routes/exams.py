@@ -1,25 +1,47 @@
+import asyncio
+import json
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, delete
+from sqlalchemy.orm import selectinload, noload, aliased
 
-from app.core import get_db, require_role
-from app.models import User, Exam, Question, Option
+from app.core import get_db, require_role, make_etag, conditional_response, settings
+from app.core.database import async_session_maker
+from app.models import User, Exam, Question, Option, Attempt, ArchivedAttempt, CollusionPair, Media
 from app.schemas import (
-    ExamCreate, ExamUpdate, ExamResponse, ExamListResponse,
-    QuestionCreate, QuestionResponse
+    ExamCreate, ExamUpdate, ExamClone, ExamResponse, ExamListResponse,
+    QuestionCreate, QuestionResponse, OptionInsert, OptionResponse, MoveRequest, RegradeRequest, RegradeResult, ExamMonitor,
+    CollusionPairResponse, JobAccepted, Leaderboard, LeaderboardEntry
 )
+from app.services.sampling import append_to_pool, remove_from_pool, invalidate_strata
+from app.services.answers import MAX_OPTIONS
+from app.services.grading import MAX_MULTI_OPTIONS, key_mask
+from app.services.regrade import regrade, set_correct_option, set_correct_options, refresh_key_mask
+from app.services import archive, cloning, collusion, delivery, monitoring, ordering, ranking, tasks
 
 router = APIRouter(prefix="/exams", tags=["Exams (Teacher)"])
 
 
 @router.get("", response_model=List[ExamListResponse])
 async def list_exams(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("teacher"))
 ):
     """List all exams created by the teacher."""
+    # Cheap version check over the teacher_id index before loading anything
+    version = await db.execute(
+        select(func.count(Exam.id), func.coalesce(func.sum(Exam.version), 0), func.max(Exam.updated_at))
+        .where(Exam.teacher_id == current_user.id)
+    )
+    not_modified = conditional_response(request, response, make_etag("exams", current_user.id, *version.one()))
+    if not_modified:
+        return not_modified
+    
     result = await db.execute(
         select(Exam)
         .options(selectinload(Exam.questions))
@@ -58,7 +80,11 @@ async def create_exam(
         start_date=exam_data.start_date,
         end_date=exam_data.end_date,
         randomize_questions=exam_data.randomize_questions,
-        randomize_options=exam_data.randomize_options
+        randomize_options=exam_data.randomize_options,
+        questions_per_attempt=exam_data.questions_per_attempt,
+        pool_strata=exam_data.pool_strata,
+        page_size=exam_data.page_size,
+        packed_answers=exam_data.packed_answers
     )
     db.add(exam)
     await db.commit()
@@ -70,10 +96,22 @@ async def create_exam(
 @router.get("/{exam_id}", response_model=ExamResponse)
 async def get_exam(
     exam_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("teacher"))
 ):
     """Get exam details with questions and answers (teacher only)."""
+    version = await db.scalar(
+        select(Exam.version).where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+    )
+    if version is None:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    
+    not_modified = conditional_response(request, response, make_etag("exam", exam_id, version))
+    if not_modified:
+        return not_modified
+    
     result = await db.execute(
         select(Exam)
         .options(selectinload(Exam.questions).selectinload(Question.options))
@@ -103,15 +141,60 @@ async def update_exam(
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
     
-    for field, value in exam_data.model_dump(exclude_unset=True).items():
+    changes = exam_data.model_dump(exclude_unset=True)
+    for field, value in changes.items():
         setattr(exam, field, value)
+    exam.version = Exam.version + 1
+    
+    # Results (re)published: materialize every result before students arrive
+    if changes.get("results_published"):
+        await tasks.enqueue_for_exam(db, tasks.MATERIALIZE_RESULTS, exam.id, current_user.id)
     
     await db.commit()
     await db.refresh(exam)
     
+    # Build the score index now, not when the first of many students asks for a rank
+    if changes.get("results_published"):
+        await ranking.get_index(db, exam.id, exam.version, exam.archived_at is not None)
+    
     return exam
 
 
+@router.post("/{exam_id}/clone", response_model=ExamListResponse, status_code=status.HTTP_201_CREATED)
+async def clone_exam(
+    exam_id: str,
+    clone_data: ExamClone,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """
+    Duplicate an exam with all its questions and options.
+    
+    Copied inside the database with INSERT ... SELECT in one transaction.
+    """
+    source = await _owned_exam_id(db, exam_id, current_user)
+    
+    new_id = await cloning.clone_exam(db, source, current_user.id, clone_data.title)
+    await db.commit()
+    
+    exam = await db.scalar(
+        select(Exam).options(noload(Exam.questions), noload(Exam.attempts)).where(Exam.id == new_id)
+    )
+    question_count = await db.scalar(
+        select(func.count()).select_from(Question).where(Question.exam_id == new_id)
+    )
+    return ExamListResponse(
+        id=exam.id,
+        title=exam.title,
+        description=exam.description,
+        time_limit_minutes=exam.time_limit_minutes,
+        start_date=exam.start_date,
+        end_date=exam.end_date,
+        is_published=exam.is_published,
+        question_count=question_count
+    )
+
+
 @router.delete("/{exam_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_exam(
     exam_id: str,
@@ -129,53 +212,89 @@ async def delete_exam(
     
     await db.delete(exam)
     await db.commit()
+    
+    if exam.archived_at is not None:
+        await archive.remove_archive(exam.id)
 
 
 @router.post("/{exam_id}/questions", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
 async def add_question(
     exam_id: str,
     question_data: QuestionCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("teacher"))
 ):
-    """Add a question to an exam."""
-    # Verify exam ownership
+    """Add a question to an exam (last, or before/after another question)."""
+    # Verify exam ownership (without pulling in the existing pool); the row
+    # lock serializes concurrent adds, which each rewrite question_pool
     result = await db.execute(
-        select(Exam).where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+        select(Exam)
+        .options(noload(Exam.questions), noload(Exam.attempts))
+        .where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+        .with_for_update()
     )
     exam = result.scalar_one_or_none()
     
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
     
-    # Validate at least one correct answer
+    # Validate the answer key: exactly one correct option, or at least one for multi-select
     correct_count = sum(1 for opt in question_data.options if opt.is_correct)
-    if correct_count != 1:
+    if question_data.multi_select:
+        if correct_count < 1:
+            raise HTTPException(status_code=400, detail="A multi-select question needs at least one correct answer")
+        if len(question_data.options) > MAX_MULTI_OPTIONS:
+            raise HTTPException(
+                status_code=400, detail=f"Multi-select questions allow at most {MAX_MULTI_OPTIONS} options"
+            )
+    elif question_data.partial_credit:
+        raise HTTPException(status_code=400, detail="Partial credit requires a multi-select question")
+    elif correct_count != 1:
         raise HTTPException(status_code=400, detail="Each question must have exactly one correct answer")
+    if exam.packed_answers and len(question_data.options) > MAX_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Packed exams allow at most {MAX_OPTIONS} options per question")
+    if question_data.media_digest is not None and not await db.scalar(
+        select(Media.digest).where(Media.digest == question_data.media_digest)
+    ):
+        raise HTTPException(status_code=400, detail="Unknown media_digest; upload it first")
     
-    # Get current question count for ordering
-    q_result = await db.execute(
-        select(Question).where(Question.exam_id == exam_id)
-    )
-    question_count = len(q_result.scalars().all())
+    # Sparse ordering key from the neighbours only
+    try:
+        order, crowded = await ordering.position_key(
+            db, Question, exam.id, before_id=question_data.before_id, after_id=question_data.after_id
+        )
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Question not found")
+    if crowded:
+        background_tasks.add_task(ordering.rebalance_in_background, Question, exam.id, exam.id)
     
     # Create question
     question = Question(
         exam_id=exam_id,
         content=question_data.content,
         points=question_data.points,
-        order=question_count
+        tag=question_data.tag,
+        multi_select=question_data.multi_select,
+        partial_credit=question_data.partial_credit,
+        media_digest=question_data.media_digest,
+        key_mask=key_mask(o.is_correct for o in question_data.options) if question_data.multi_select else None,
+        order=order
     )
     db.add(question)
     await db.flush()
     
+    # Register in the exam's question pool for per-attempt sampling
+    exam.question_pool = append_to_pool(exam.question_pool, question.id)
+    exam.version = Exam.version + 1
+    
     # Create options
     for i, opt_data in enumerate(question_data.options):
         option = Option(
             question_id=question.id,
             content=opt_data.content,
             is_correct=opt_data.is_correct,
-            order=i
+            order=i * ordering.GAP
         )
         db.add(option)
     
@@ -190,3 +309,531 @@ async def add_question(
     )
     
     return result.scalar_one()
+
+
+async def _editable_question(db: AsyncSession, exam_id: str, question_id: str, teacher: User, lock: bool = False):
+    """
+    The teacher's exam and one of its questions (with options) for a
+    structural edit. lock takes the exam row for edits that rewrite question_pool.
+    """
+    query = (
+        select(Exam)
+        .options(noload(Exam.questions), noload(Exam.attempts))
+        .where(Exam.id == exam_id, Exam.teacher_id == teacher.id)
+    )
+    exam = await db.scalar(query.with_for_update() if lock else query)
+    if not exam:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    if exam.archived_at is not None:
+        raise HTTPException(status_code=409, detail="Exam is archived")
+    
+    question = await db.scalar(
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.id == question_id, Question.exam_id == exam.id)
+    )
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return exam, question
+
+
+async def _has_attempts(db: AsyncSession, exam: Exam) -> bool:
+    return bool(await db.scalar(select(Attempt.id).where(Attempt.exam_id == exam.id).limit(1)))
+
+
+async def _reload_question(db: AsyncSession, question_id) -> Question:
+    result = await db.execute(
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.id == question_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@router.patch("/{exam_id}/questions/{question_id}/position", response_model=QuestionResponse)
+async def move_question(
+    exam_id: str,
+    question_id: str,
+    move: MoveRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Move a question before/after another one (or last); writes one row."""
+    exam, question = await _editable_question(db, exam_id, question_id, current_user)
+    
+    try:
+        question.order, crowded = await ordering.position_key(
+            db, Question, exam.id, before_id=move.before_id, after_id=move.after_id, exclude_id=question.id
+        )
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Question not found")
+    exam.version = Exam.version + 1
+    await db.commit()
+    delivery.invalidate_questions([question.id])
+    
+    if crowded:
+        background_tasks.add_task(ordering.rebalance_in_background, Question, exam.id, exam.id)
+    return await _reload_question(db, question.id)
+
+
+@router.delete("/{exam_id}/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_question(
+    exam_id: str,
+    question_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """
+    Delete a question and its options.
+    
+    Only before anyone has started the exam: attempts address questions by
+    their position in the exam's question pool.
+    """
+    exam, question = await _editable_question(db, exam_id, question_id, current_user, lock=True)
+    if await _has_attempts(db, exam):
+        raise HTTPException(status_code=409, detail="Questions cannot be deleted once the exam has attempts")
+    
+    await db.execute(
+        delete(Question).where(Question.id == question.id).execution_options(synchronize_session=False)
+    )
+    exam.question_pool = remove_from_pool(exam.question_pool, question.id)
+    exam.version = Exam.version + 1
+    await db.commit()
+    
+    invalidate_strata(exam.id)
+    delivery.invalidate_questions([question.id])
+
+
+@router.post(
+    "/{exam_id}/questions/{question_id}/options",
+    response_model=OptionResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def add_option(
+    exam_id: str,
+    question_id: str,
+    option_data: OptionInsert,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Add an option to a question (last, or before/after another option)."""
+    exam, question = await _editable_question(db, exam_id, question_id, current_user)
+    
+    if option_data.is_correct and not question.multi_select and any(o.is_correct for o in question.options):
+        raise HTTPException(status_code=400, detail="Each question must have exactly one correct answer")
+    if question.multi_select and len(question.options) >= MAX_MULTI_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Multi-select questions allow at most {MAX_MULTI_OPTIONS} options")
+    if exam.packed_answers and len(question.options) >= MAX_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Packed exams allow at most {MAX_OPTIONS} options per question")
+    # Packed answers and multi-select masks record option positions; appending keeps them valid
+    if (exam.packed_answers or question.multi_select) and (option_data.before_id or option_data.after_id):
+        if await _has_attempts(db, exam):
+            raise HTTPException(status_code=409, detail="Options of a question with recorded positions can only be appended")
+    
+    try:
+        order, crowded = await ordering.position_key(
+            db, Option, question.id, before_id=option_data.before_id, after_id=option_data.after_id
+        )
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Option not found")
+    
+    option = Option(
+        question_id=question.id,
+        content=option_data.content,
+        is_correct=option_data.is_correct,
+        order=order
+    )
+    db.add(option)
+    if question.multi_select:
+        await db.flush()
+        await refresh_key_mask(db, question.id)
+    exam.version = Exam.version + 1
+    await db.commit()
+    await db.refresh(option)
+    delivery.invalidate_questions([question.id])
+    
+    if crowded:
+        background_tasks.add_task(ordering.rebalance_in_background, Option, question.id, exam.id)
+    return option
+
+
+@router.patch("/{exam_id}/questions/{question_id}/options/{option_id}/position", response_model=OptionResponse)
+async def move_option(
+    exam_id: str,
+    question_id: str,
+    option_id: str,
+    move: MoveRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Move an option before/after another one (or last); writes one row."""
+    exam, question = await _editable_question(db, exam_id, question_id, current_user)
+    option = next((o for o in question.options if str(o.id) == option_id.lower()), None)
+    if not option:
+        raise HTTPException(status_code=404, detail="Option not found")
+    if (exam.packed_answers or question.multi_select) and await _has_attempts(db, exam):
+        raise HTTPException(status_code=409, detail="Options of a question with recorded positions cannot be reordered")
+    
+    try:
+        option.order, crowded = await ordering.position_key(
+            db, Option, question.id, before_id=move.before_id, after_id=move.after_id, exclude_id=option.id
+        )
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Option not found")
+    if question.multi_select:
+        await db.flush()
+        await refresh_key_mask(db, question.id)
+    exam.version = Exam.version + 1
+    await db.commit()
+    await db.refresh(option)
+    delivery.invalidate_questions([question.id])
+    
+    if crowded:
+        background_tasks.add_task(ordering.rebalance_in_background, Option, question.id, exam.id)
+    return option
+
+
+@router.delete("/{exam_id}/questions/{question_id}/options/{option_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_option(
+    exam_id: str,
+    question_id: str,
+    option_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Delete an option that is not the (last) correct answer, before the exam has attempts."""
+    exam, question = await _editable_question(db, exam_id, question_id, current_user)
+    option = next((o for o in question.options if str(o.id) == option_id.lower()), None)
+    if not option:
+        raise HTTPException(status_code=404, detail="Option not found")
+    if option.is_correct and not (
+        question.multi_select and sum(1 for o in question.options if o.is_correct) > 1
+    ):
+        raise HTTPException(status_code=400, detail="Mark another option correct before deleting this one")
+    if await _has_attempts(db, exam):
+        raise HTTPException(status_code=409, detail="Options cannot be deleted once the exam has attempts")
+    
+    await db.delete(option)
+    if question.multi_select:
+        await db.flush()
+        await refresh_key_mask(db, question.id)
+    exam.version = Exam.version + 1
+    await db.commit()
+    delivery.invalidate_questions([question.id])
+
+
+@router.post("/{exam_id}/regrade", response_model=RegradeResult)
+async def regrade_exam(
+    exam_id: str,
+    regrade_data: RegradeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """
+    Recompute correctness and scores for every attempt after an answer-key fix.
+    
+    Runs as set-based SQL in one transaction; attempts are never loaded.
+    """
+    row = await db.execute(
+        select(Exam.id, Exam.results_published, Exam.archived_at)
+        .where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+    )
+    row = row.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    exam, results_published, archived_at = row
+    if archived_at is not None:
+        raise HTTPException(status_code=409, detail="Exam is archived")
+    
+    key_options_changed = 0
+    if regrade_data.question_id is not None:
+        row = await db.execute(
+            select(Question.id, Question.multi_select)
+            .where(Question.id == regrade_data.question_id, Question.exam_id == exam)
+        )
+        row = row.one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Question not found")
+        question, multi_select = row
+        
+        if multi_select and regrade_data.correct_option_id is not None:
+            raise HTTPException(status_code=400, detail="Use correct_option_ids for a multi-select question")
+        if not multi_select and regrade_data.correct_option_ids is not None:
+            raise HTTPException(status_code=400, detail="correct_option_ids is only for multi-select questions")
+        
+        if regrade_data.correct_option_ids is not None:
+            wanted = set(regrade_data.correct_option_ids)
+            if not wanted:
+                raise HTTPException(status_code=400, detail="A multi-select question needs at least one correct answer")
+            found = await db.scalar(
+                select(func.count()).where(Option.id.in_(wanted), Option.question_id == question)
+            )
+            if found != len(wanted):
+                raise HTTPException(status_code=404, detail="Option not found")
+            key_options_changed = await set_correct_options(db, question, wanted)
+        elif regrade_data.correct_option_id is not None:
+            option = await db.scalar(
+                select(Option.id).where(
+                    Option.id == regrade_data.correct_option_id,
+                    Option.question_id == question
+                )
+            )
+            if not option:
+                raise HTTPException(status_code=404, detail="Option not found")
+            key_options_changed = await set_correct_option(db, question, option)
+    elif regrade_data.correct_option_id is not None or regrade_data.correct_option_ids is not None:
+        raise HTTPException(status_code=400, detail="correct_option_id(s) requires question_id")
+    
+    summary = await regrade(db, exam, regrade_data.question_id)
+    
+    # Regrading bumps the exam version, so published snapshots are rebuilt
+    if results_published:
+        await tasks.enqueue_for_exam(db, tasks.MATERIALIZE_RESULTS, exam, current_user.id)
+    await db.commit()
+    ranking.invalidate(exam)
+    
+    return RegradeResult(
+        exam_id=exam,
+        question_id=regrade_data.question_id,
+        key_options_changed=key_options_changed,
+        responses_updated=summary.responses_updated,
+        attempts_rescored=summary.attempts_rescored,
+        scores_increased=summary.scores_increased,
+        scores_decreased=summary.scores_decreased
+    )
+
+
+async def _owned_exam_id(db: AsyncSession, exam_id: str, teacher: User):
+    owned = await db.scalar(
+        select(Exam.id).where(Exam.id == exam_id, Exam.teacher_id == teacher.id)
+    )
+    if not owned:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    return owned
+
+
+@router.get("/{exam_id}/leaderboard", response_model=Leaderboard)
+async def get_leaderboard(
+    exam_id: str,
+    limit: int = Query(10, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Best attempts of the exam with student names, from the exam's score index."""
+    row = await db.execute(
+        select(Exam.id, Exam.version, Exam.archived_at)
+        .where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+    )
+    row = row.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    exam, version, archived_at = row
+    
+    index = await ranking.get_index(db, exam, version, archived_at is not None)
+    top = await ranking.top_attempts(db, exam, index, limit, archived_at is not None)
+    names = await db.execute(select(User.id, User.full_name).where(User.id.in_({s for _, s, _ in top})))
+    names = dict(names.all())
+    return Leaderboard(
+        exam_id=exam,
+        ranked_attempts=index.total,
+        entries=[
+            LeaderboardEntry(rank=index.rank(score), score=score, student_name=names.get(student_id))
+            for _, student_id, score in top
+        ]
+    )
+
+
+@router.get("/{exam_id}/monitor", response_model=ExamMonitor)
+async def monitor_exam(
+    exam_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """
+    Live counters for a running exam, served from memory.
+    
+    Poll with If-None-Match: unchanged counters answer 304.
+    """
+    exam = await _owned_exam_id(db, exam_id, current_user)
+    data = await monitoring.snapshot(db, exam)
+    
+    not_modified = conditional_response(request, response, make_etag("monitor", exam, data["version"]))
+    if not_modified:
+        return not_modified
+    
+    return ExamMonitor(**data)
+
+
+@router.get("/{exam_id}/monitor/stream")
+async def stream_exam_monitor(
+    exam_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Push live counters as server-sent events whenever they change."""
+    exam = await _owned_exam_id(db, exam_id, current_user)
+    
+    async def events():
+        last_version = None
+        while not await request.is_disconnected():
+            # Short-lived session: only used when counters are due for reconciliation
+            async with async_session_maker() as session:
+                data = await monitoring.snapshot(session, exam)
+            if data["version"] != last_version:
+                last_version = data["version"]
+                yield f"data: {ExamMonitor(**data).model_dump_json()}\n\n"
+            await asyncio.sleep(settings.MONITOR_PUSH_SECONDS)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.post("/{exam_id}/archive", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def archive_exam(
+    exam_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """
+    Move a closed exam's attempts and responses to compressed cold storage.
+    
+    Results stay available to students and teachers; regrading is no longer
+    possible. Runs as a background job; follow it at /jobs/{job_id}.
+    """
+    row = await db.execute(
+        select(Exam.id, Exam.end_date, Exam.archived_at)
+        .where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+    )
+    row = row.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    exam, end_date, archived_at = row
+    
+    if archived_at is not None:
+        raise HTTPException(status_code=409, detail="Exam is already archived")
+    if end_date is None or end_date >= datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Only closed exams can be archived")
+    
+    job_id = await tasks.enqueue_for_exam(db, tasks.ARCHIVE_EXAM, exam, current_user.id)
+    await db.commit()
+    return JobAccepted(job_id=job_id, exam_id=exam, status="archiving")
+
+
+@router.get("/{exam_id}/results")
+async def export_exam_results(
+    exam_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """
+    Stream every attempt's summary as NDJSON, from the live tables or, once
+    the exam is archived, from its archived attempt rows.
+    """
+    row = await db.execute(
+        select(Exam.id, Exam.archived_at).where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+    )
+    row = row.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    exam, archived_at = row
+    
+    if archived_at is None:
+        source, attempt_id = Attempt, Attempt.id
+    else:
+        source, attempt_id = ArchivedAttempt, ArchivedAttempt.attempt_id
+    columns = (
+        attempt_id.label("attempt_id"), source.student_id, source.started_at, source.submitted_at,
+        source.is_submitted, source.force_submitted, source.score, source.max_score
+    )
+    
+    async def lines():
+        last_id = None
+        async with async_session_maker() as session:
+            while True:
+                query = select(*columns).where(source.exam_id == exam).order_by(attempt_id).limit(1000)
+                if last_id is not None:
+                    query = query.where(attempt_id > last_id)
+                rows = (await session.execute(query)).all()
+                if not rows:
+                    return
+                last_id = rows[-1].attempt_id
+                yield "".join(
+                    json.dumps(
+                        {key: value.isoformat() if isinstance(value, datetime) else value
+                         for key, value in r._mapping.items()},
+                        default=str
+                    ) + "\n"
+                    for r in rows
+                )
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/{exam_id}/collusion", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def analyze_collusion(
+    exam_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Recompute the exam's answer-similarity report as a background job (see /jobs/{job_id})."""
+    row = await db.execute(
+        select(Exam.id, Exam.archived_at).where(Exam.id == exam_id, Exam.teacher_id == current_user.id)
+    )
+    row = row.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    exam, archived_at = row
+    if archived_at is not None:
+        raise HTTPException(status_code=409, detail="Exam is archived")
+    
+    job_id = await tasks.enqueue_for_exam(db, tasks.ANALYZE_COLLUSION, exam, current_user.id)
+    await db.commit()
+    return JobAccepted(job_id=job_id, exam_id=exam, status="analyzing")
+
+
+@router.get("/{exam_id}/collusion", response_model=List[CollusionPairResponse])
+async def get_collusion_report(
+    exam_id: str,
+    limit: int = Query(50, ge=1, le=collusion.MAX_PAIRS),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Pairs of attempts with the most unlikely overlap of wrong answers, from the last analysis."""
+    exam = await _owned_exam_id(db, exam_id, current_user)
+    
+    student_a, student_b = aliased(User), aliased(User)
+    result = await db.execute(
+        select(CollusionPair, student_a.full_name, student_b.full_name)
+        .join(student_a, student_a.id == CollusionPair.student_a)
+        .join(student_b, student_b.id == CollusionPair.student_b)
+        .where(CollusionPair.exam_id == exam)
+        .order_by(CollusionPair.score.desc())
+        .limit(limit)
+    )
+    
+    return [
+        CollusionPairResponse(
+            attempt_a=pair.attempt_a,
+            attempt_b=pair.attempt_b,
+            student_a=pair.student_a,
+            student_b=pair.student_b,
+            student_a_name=name_a,
+            student_b_name=name_b,
+            shared_incorrect=pair.shared_incorrect,
+            expected_shared=pair.expected_shared,
+            jaccard=pair.jaccard,
+            score=pair.score,
+            computed_at=pair.computed_at
+        )
+        for pair, name_a, name_b in result.all()
+    ]
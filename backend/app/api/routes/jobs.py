@@ -0,0 +1,65 @@
+import uuid
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+
+from app.core import get_db, require_role
+from app.models import User, Job, JobStatus
+from app.schemas import JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["Jobs (Teacher)"])
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    exam_id: Optional[uuid.UUID] = None,
+    status: Optional[JobStatus] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """The teacher's background jobs, newest first."""
+    query = select(Job).where(Job.created_by == current_user.id)
+    if exam_id is not None:
+        query = query.where(Job.exam_id == exam_id)
+    if status is not None:
+        query = query.where(Job.status == status)
+    result = await db.scalars(query.order_by(Job.created_at.desc()).limit(limit))
+    return result.all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Status, progress and result of a background job; poll until it succeeds or fails."""
+    job = await db.scalar(select(Job).where(Job.id == job_id, Job.created_by == current_user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Cancel a job that is still waiting to run (including one waiting to retry)."""
+    cancelled = await db.scalar(
+        update(Job)
+        .where(Job.id == job_id, Job.created_by == current_user.id, Job.status == JobStatus.QUEUED)
+        .values(status=JobStatus.CANCELLED)
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    if cancelled is None:
+        exists = await db.scalar(select(Job.id).where(Job.id == job_id, Job.created_by == current_user.id))
+        if not exists:
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=409, detail="Only queued jobs can be cancelled")
+    await db.commit()
+    return cancelled
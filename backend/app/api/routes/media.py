@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import get_db, require_role
+from app.core.etag import etag_matches
+from app.models import User
+from app.schemas import MediaResponse
+from app.services import media
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+
+@router.post("", response_model=MediaResponse, status_code=status.HTTP_201_CREATED)
+async def upload_media(
+    request: Request,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Upload an image; identical content is stored once and gets the same digest."""
+    try:
+        stored = await media.store_upload(db, file, current_user.id)
+    except media.MediaTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+    except media.MediaRejected as exc:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc))
+    await db.commit()
+    
+    return MediaResponse(
+        digest=stored.digest,
+        content_type=stored.content_type,
+        size=stored.size,
+        url=request.url_for("get_media", digest=stored.digest).path,
+        created_at=stored.created_at
+    )
+
+
+@router.get("/{digest}", name="get_media")
+async def get_media(
+    digest: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Serve media by digest, with immutable caching and Range support. No
+    login: the digest is only known to those who were shown the question.
+    """
+    found = await media.lookup(db, digest) if media.DIGEST.match(digest) else None
+    if found is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    content_type, size = found
+    
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": media.CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff"
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    path = media.media_path(digest)
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = media.parse_range(request.headers.get("range"), size) if if_range in (None, etag) else None
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    if byte_range is None:
+        return media.MediaFileResponse(
+            path, media_type=content_type, headers={**headers, "Content-Length": str(size)}
+        )
+    start, end = byte_range
+    return media.MediaFileResponse(
+        path,
+        start=start,
+        length=end - start + 1,
+        status_code=206,
+        media_type=content_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)}
+    )
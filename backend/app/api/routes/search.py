@@ -0,0 +1,31 @@
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import get_db, require_role
+from app.models import User
+from app.schemas import QuestionSearchPage
+from app.services import search
+
+router = APIRouter(prefix="/search", tags=["Search (Teacher)"])
+
+
+@router.get("/questions", response_model=QuestionSearchPage)
+async def search_questions(
+    q: str = Query(..., min_length=1, max_length=200),
+    exam_id: Optional[uuid.UUID] = None,
+    tag: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("teacher"))
+):
+    """Search the teacher's questions and their options, best matches first."""
+    try:
+        results, next_cursor = await search.search_questions(
+            db, current_user.id, q, exam_id=exam_id, tag=tag, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return QuestionSearchPage(results=results, next_cursor=next_cursor)
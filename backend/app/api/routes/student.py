@@ -1,16 +1,32 @@
-import random
+import gzip
 from datetime import datetime, timedelta
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response as HTTPResponse, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, noload
 
-from app.core import get_db, require_role
-from app.models import User, Exam, Question, Option, Attempt, Response
+from app.core import get_db, require_role, make_etag, conditional_response
+from app.core.etag import CACHE_CONTROL
+from app.core.compression import accepts
+from app.core.admission import admission_control
+from app.models import User, Exam, Question, Option, Attempt, Response, AttemptResultSnapshot, ArchivedAttempt
 from app.schemas import (
     ExamListResponse, ExamSecure, QuestionSecure, OptionSecure,
-    AttemptStart, AttemptSubmit, AttemptResult, AttemptListResponse, ResponseResult
+    AttemptStart, AttemptSubmit, AttemptResult, AttemptListResponse, ResponseResult,
+    QuestionPage, AttemptRank, Leaderboard, LeaderboardEntry
+)
+from app.services.sampling import (
+    sample_questions, pack_indices, load_attempt_questions, attempt_question_ids, pool_size,
+    order_varies_per_attempt
+)
+from app.services.results import build_attempt_result, store_result
+from app.services.grading import grade_submission, mask_option_ids
+from app.services import answers, archive, idempotency, monitoring, ranking
+from app.services.delivery import (
+    DeliverySnapshot, store_snapshot, get_snapshot, discard_snapshot, render_page, page_payload
 )
 
 router = APIRouter(prefix="/student", tags=["Student"])
@@ -24,9 +40,10 @@ async def list_available_exams(
     """List published exams available for the student."""
     now = datetime.utcnow()
     
+    # Counted from the question pool: no questions, options or attempts are loaded
     result = await db.execute(
         select(Exam)
-        .options(selectinload(Exam.questions))
+        .options(noload(Exam.questions), noload(Exam.attempts))
         .where(
             Exam.is_published == True,
             (Exam.start_date == None) | (Exam.start_date <= now),
@@ -45,15 +62,20 @@ async def list_available_exams(
             start_date=e.start_date,
             end_date=e.end_date,
             is_published=e.is_published,
-            question_count=len(e.questions)
+            question_count=min(e.questions_per_attempt or pool_size(e.question_pool), pool_size(e.question_pool))
         )
         for e in exams
     ]
 
 
-@router.post("/exams/{exam_id}/start", response_model=AttemptStart)
+@router.post(
+    "/exams/{exam_id}/start",
+    response_model=AttemptStart,
+    dependencies=[Depends(admission_control("start_exam", rate_per_minute=20, burst=5))]
+)
 async def start_exam(
     exam_id: str,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("student"))
 ):
@@ -62,13 +84,20 @@ async def start_exam(
     
     SECURITY: This endpoint returns questions WITHOUT the is_correct flag.
     The answer key NEVER leaves the server.
+    
+    With an Idempotency-Key, retries replay the first response.
     """
     now = datetime.utcnow()
+    scope = f"start:{exam_id}"
+    
+    replayed = await idempotency.replay(db, current_user.id, idempotency.validate_key(idempotency_key), scope)
+    if replayed:
+        return replayed
     
-    # Get exam with questions
+    # Get exam metadata only; questions are loaded per attempt from the pool
     result = await db.execute(
         select(Exam)
-        .options(selectinload(Exam.questions).selectinload(Question.options))
+        .options(noload(Exam.questions), noload(Exam.attempts))
         .where(
             Exam.id == exam_id,
             Exam.is_published == True,
@@ -83,7 +112,9 @@ async def start_exam(
     
     # Check for existing incomplete attempt
     existing = await db.execute(
-        select(Attempt).where(
+        select(Attempt)
+        .options(noload(Attempt.responses))
+        .where(
             Attempt.student_id == current_user.id,
             Attempt.exam_id == exam_id,
             Attempt.is_submitted == False
@@ -94,7 +125,7 @@ async def start_exam(
     if not attempt:
         # Check if already completed
         completed = await db.execute(
-            select(Attempt).where(
+            select(Attempt.id).where(
                 Attempt.student_id == current_user.id,
                 Attempt.exam_id == exam_id,
                 Attempt.is_submitted == True
@@ -103,15 +134,18 @@ async def start_exam(
         if completed.scalar_one_or_none():
             raise HTTPException(status_code=400, detail="You have already completed this exam")
         
-        # Create new attempt
+        # Create new attempt with its own draw from the question pool
+        indices = await sample_questions(db, exam)
         attempt = Attempt(
             student_id=current_user.id,
             exam_id=exam_id,
-            started_at=now
+            started_at=now,
+            question_indices=pack_indices(indices)
         )
         db.add(attempt)
         await db.commit()
         await db.refresh(attempt)
+        monitoring.record_start(exam.id)
     
     # Calculate expiry
     expires_at = attempt.started_at + timedelta(minutes=exam.time_limit_minutes)
@@ -123,34 +157,26 @@ async def start_exam(
         attempt.submitted_at = expires_at
         attempt.force_submitted = True
         await db.commit()
+        monitoring.record_submit(exam.id, forced=True, at=expires_at)
+        ranking.record_submit(exam.id, attempt.score)
         raise HTTPException(status_code=400, detail="Exam time has expired")
     
-    # Prepare SECURE questions (no is_correct flag!)
-    questions = list(exam.questions)
-    if exam.randomize_questions:
-        random.shuffle(questions)
+    # Freeze this attempt's question order; pages are served from the snapshot
+    question_ids = await attempt_question_ids(db, attempt, exam)
+    snapshot = DeliverySnapshot(
+        attempt_id=attempt.id,
+        student_id=current_user.id,
+        exam_id=exam.id,
+        expires_at=expires_at,
+        randomize_options=exam.randomize_options,
+        page_size=exam.page_size or len(question_ids),
+        question_ids=question_ids,
+        per_attempt_order=order_varies_per_attempt(exam)
+    )
+    store_snapshot(snapshot)
     
-    secure_questions = []
-    for q in questions:
-        options = list(q.options)
-        if exam.randomize_options:
-            random.shuffle(options)
-        
-        # CRITICAL: Convert to secure schema WITHOUT is_correct
-        secure_options = [
-            OptionSecure(id=o.id, content=o.content, order=i)
-            for i, o in enumerate(options)
-        ]
-        
-        secure_questions.append(
-            QuestionSecure(
-                id=q.id,
-                content=q.content,
-                order=len(secure_questions),
-                points=q.points,
-                options=secure_options
-            )
-        )
+    # Prepare SECURE questions (no is_correct flag!) - the first page in paged mode
+    secure_questions, next_cursor = await render_page(db, snapshot, 0, snapshot.page_size)
     
     secure_exam = ExamSecure(
         id=exam.id,
@@ -160,18 +186,107 @@ async def start_exam(
         questions=secure_questions
     )
     
-    return AttemptStart(
+    attempt_start = AttemptStart(
         attempt_id=attempt.id,
         exam=secure_exam,
         server_time=now,
-        expires_at=expires_at
+        expires_at=expires_at,
+        question_order=snapshot.question_ids if exam.page_size else [],
+        next_cursor=next_cursor
     )
+    if idempotency_key is None:
+        return attempt_start
+    
+    body = attempt_start.model_dump_json().encode("utf-8")
+    idempotency.remember(db, current_user.id, idempotency_key, scope, body)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key stored its response first
+        await db.rollback()
+        replayed = await idempotency.replay(db, current_user.id, idempotency_key, scope)
+        if replayed:
+            return replayed
+        raise
+    return HTTPResponse(content=body, media_type="application/json")
+
+
+@router.get("/exams/{exam_id}/attempts/{attempt_id}/questions", response_model=QuestionPage)
+async def get_question_page(
+    exam_id: UUID,
+    attempt_id: UUID,
+    request: Request,
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("student"))
+):
+    """
+    Get the next page of questions for a paged-delivery attempt.
+    
+    SECURITY: Served from the attempt's snapshot, which never holds is_correct.
+    """
+    now = datetime.utcnow()
+    
+    try:
+        offset = int(cursor or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    snapshot = get_snapshot(attempt_id)
+    if snapshot is None:
+        # Cache miss (restart or another worker): rebuild from the attempt's stored draw
+        result = await db.execute(
+            select(Attempt)
+            .options(
+                selectinload(Attempt.exam).options(noload(Exam.questions), noload(Exam.attempts)),
+                noload(Attempt.responses)
+            )
+            .where(Attempt.exam_id == exam_id, Attempt.id == attempt_id, Attempt.student_id == current_user.id)
+        )
+        attempt = result.scalar_one_or_none()
+        
+        if not attempt:
+            raise HTTPException(status_code=404, detail="Attempt not found")
+        
+        if attempt.is_submitted:
+            raise HTTPException(status_code=400, detail="Exam already submitted")
+        
+        question_ids = await attempt_question_ids(db, attempt, attempt.exam)
+        snapshot = DeliverySnapshot(
+            attempt_id=attempt.id,
+            student_id=attempt.student_id,
+            exam_id=attempt.exam_id,
+            expires_at=attempt.started_at + timedelta(minutes=attempt.exam.time_limit_minutes),
+            randomize_options=attempt.exam.randomize_options,
+            page_size=attempt.exam.page_size or len(question_ids),
+            question_ids=question_ids,
+            per_attempt_order=order_varies_per_attempt(attempt.exam)
+        )
+        store_snapshot(snapshot)
+    elif snapshot.student_id != current_user.id or snapshot.exam_id != exam_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    
+    if now > snapshot.expires_at:
+        discard_snapshot(snapshot.attempt_id)
+        raise HTTPException(status_code=400, detail="Exam time has expired")
+    
+    # Served precompressed: identical pages are encoded and compressed once
+    payload = await page_payload(db, snapshot, offset)
+    return payload.response(request)
 
 
-@router.post("/attempts/{attempt_id}/submit", response_model=AttemptResult)
+@router.post(
+    "/exams/{exam_id}/attempts/{attempt_id}/submit",
+    response_model=AttemptResult,
+    dependencies=[Depends(admission_control("submit_attempt", rate_per_minute=10, burst=3))]
+)
 async def submit_attempt(
-    attempt_id: str,
+    exam_id: UUID,
+    attempt_id: UUID,
     submission: AttemptSubmit,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("student"))
 ):
@@ -180,14 +295,25 @@ async def submit_attempt(
     
     SECURITY: Grading is done SERVER-SIDE only.
     The client never knows the correct answers during the exam.
+    
+    With an Idempotency-Key, retries replay the first response without regrading.
     """
     now = datetime.utcnow()
+    scope = f"submit:{attempt_id}"
     
-    # Get attempt
+    replayed = await idempotency.replay(db, current_user.id, idempotency.validate_key(idempotency_key), scope)
+    if replayed:
+        return replayed
+    
+    # Get attempt (locked, so concurrent submissions are serialized)
     result = await db.execute(
         select(Attempt)
-        .options(selectinload(Attempt.exam).selectinload(Exam.questions).selectinload(Question.options))
-        .where(Attempt.id == attempt_id, Attempt.student_id == current_user.id)
+        .options(
+            selectinload(Attempt.exam).options(noload(Exam.questions), noload(Exam.attempts)),
+            noload(Attempt.responses)
+        )
+        .where(Attempt.exam_id == exam_id, Attempt.id == attempt_id, Attempt.student_id == current_user.id)
+        .with_for_update(of=Attempt)
     )
     attempt = result.scalar_one_or_none()
     
@@ -195,57 +321,67 @@ async def submit_attempt(
         raise HTTPException(status_code=404, detail="Attempt not found")
     
     if attempt.is_submitted:
+        # A concurrent retry may have just committed the keyed response
+        replayed = await idempotency.replay(db, current_user.id, idempotency_key, scope)
+        if replayed:
+            return replayed
         raise HTTPException(status_code=400, detail="Exam already submitted")
     
     # Check time limit
     expires_at = attempt.started_at + timedelta(minutes=attempt.exam.time_limit_minutes)
     force_submitted = now > expires_at
     
-    # Build question/option lookup
-    question_map = {q.id: q for q in attempt.exam.questions}
-    option_map = {}
-    for q in attempt.exam.questions:
-        for o in q.options:
-            option_map[o.id] = o
+    # Grade SERVER-SIDE over the questions drawn for this attempt
+    questions = await load_attempt_questions(db, attempt, attempt.exam)
+    graded = grade_submission(questions, submission.responses)
+    total_score, max_score = graded.score, graded.max_score
     
-    # Process responses and calculate score SERVER-SIDE
-    total_score = 0
-    max_score = sum(q.points for q in attempt.exam.questions)
+    packed = attempt.exam.packed_answers
     response_results = []
+    saved_responses = []
+    selections = {}
     
-    for resp in submission.responses:
-        question = question_map.get(resp.question_id)
-        if not question:
-            continue
-        
-        selected_option = option_map.get(resp.selected_option_id)
-        correct_option = next((o for o in question.options if o.is_correct), None)
+    for graded_response in graded.responses:
+        question = graded_response.question
         
-        # SERVER-SIDE grading - this is where we check the answer!
-        is_correct = selected_option and selected_option.is_correct
-        points_earned = question.points if is_correct else 0
-        total_score += points_earned
-        
-        # Save response
-        response = Response(
-            attempt_id=attempt.id,
-            question_id=question.id,
-            selected_option_id=resp.selected_option_id,
-            is_correct=is_correct,
-            answered_at=now
-        )
-        db.add(response)
+        # Save response (packed exams keep it on the attempt row, below)
+        if packed:
+            selections[question.id] = (
+                graded_response.selected_mask if question.multi_select else graded_response.selected_option_id
+            )
+        else:
+            response = Response(
+                attempt_id=attempt.id,
+                exam_id=attempt.exam_id,
+                question_id=question.id,
+                selected_option_id=graded_response.selected_option_id,
+                selected_mask=graded_response.selected_mask,
+                is_correct=graded_response.is_correct,
+                answered_at=now
+            )
+            db.add(response)
+            saved_responses.append(response)
         
         response_results.append(ResponseResult(
             question_id=question.id,
             question_content=question.content,
-            selected_option_id=resp.selected_option_id,
-            correct_option_id=correct_option.id if correct_option else None,
-            is_correct=is_correct,
-            points_earned=points_earned,
+            selected_option_id=graded_response.selected_option_id,
+            correct_option_id=graded_response.correct_option_id,
+            selected_option_ids=(
+                mask_option_ids(question, graded_response.selected_mask) if question.multi_select else None
+            ),
+            correct_option_ids=(
+                mask_option_ids(question, graded_response.correct_mask) if question.multi_select else None
+            ),
+            is_correct=graded_response.is_correct,
+            points_earned=graded_response.points_earned,
             max_points=question.points
         ))
     
+    if packed:
+        attempt.answers, attempt.correct_mask, _ = answers.encode(questions, selections)
+        saved_responses = answers.decode(attempt, questions)
+    
     # Update attempt
     attempt.is_submitted = True
     attempt.submitted_at = now
@@ -253,10 +389,15 @@ async def submit_attempt(
     attempt.max_score = max_score
     attempt.force_submitted = force_submitted
     
-    await db.commit()
+    # Results already public: materialize the result document in the same transaction
+    if attempt.exam.results_published:
+        await store_result(
+            db, attempt, attempt.exam,
+            build_attempt_result(attempt, attempt.exam, questions, saved_responses)
+        )
     
     # Return result (detailed breakdown only if results are published)
-    return AttemptResult(
+    attempt_result = AttemptResult(
         attempt_id=attempt.id,
         exam_title=attempt.exam.title,
         score=total_score,
@@ -266,23 +407,66 @@ async def submit_attempt(
         submitted_at=attempt.submitted_at,
         responses=response_results if attempt.exam.results_published else []
     )
+    body = attempt_result.model_dump_json().encode("utf-8")
+    idempotency.remember(db, current_user.id, idempotency_key, scope, body)
+    
+    await db.commit()
+    discard_snapshot(attempt.id)
+    monitoring.record_submit(attempt.exam_id, forced=force_submitted, at=now)
+    ranking.record_submit(attempt.exam_id, total_score)
+    
+    return HTTPResponse(content=body, media_type="application/json")
 
 
 @router.get("/attempts", response_model=List[AttemptListResponse])
 async def list_attempts(
+    request: Request,
+    response: HTTPResponse,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("student"))
 ):
     """List all exam attempts for the student."""
+    # Narrow version rows over the student_id index before loading anything
+    versions = await db.execute(
+        select(Attempt.id, Attempt.is_submitted, Attempt.score, Exam.version)
+        .join(Exam, Exam.id == Attempt.exam_id)
+        .where(Attempt.student_id == current_user.id)
+        .order_by(Attempt.id)
+    )
+    archived_versions = await db.execute(
+        select(ArchivedAttempt.attempt_id, Exam.version)
+        .join(Exam, Exam.id == ArchivedAttempt.exam_id)
+        .where(ArchivedAttempt.student_id == current_user.id)
+        .order_by(ArchivedAttempt.attempt_id)
+    )
+    etag = make_etag(
+        "attempts", current_user.id,
+        tuple(tuple(row) for row in versions.all()),
+        tuple(tuple(row) for row in archived_versions.all())
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
     result = await db.execute(
         select(Attempt)
-        .options(selectinload(Attempt.exam))
+        .options(
+            selectinload(Attempt.exam).options(noload(Exam.questions), noload(Exam.attempts)),
+            noload(Attempt.responses)
+        )
         .where(Attempt.student_id == current_user.id)
         .order_by(Attempt.started_at.desc())
     )
     attempts = result.scalars().all()
     
-    return [
+    # Attempts of archived exams live on as summary rows
+    archived = await db.execute(
+        select(ArchivedAttempt, Exam.title, Exam.results_published)
+        .join(Exam, Exam.id == ArchivedAttempt.exam_id)
+        .where(ArchivedAttempt.student_id == current_user.id)
+    )
+    
+    listed = [
         AttemptListResponse(
             id=a.id,
             exam_id=a.exam_id,
@@ -295,22 +479,161 @@ async def list_attempts(
         )
         for a in attempts
     ]
+    listed.extend(
+        AttemptListResponse(
+            id=a.attempt_id,
+            exam_id=a.exam_id,
+            exam_title=title,
+            started_at=a.started_at,
+            submitted_at=a.submitted_at,
+            is_submitted=a.is_submitted,
+            score=a.score if published else None,
+            max_score=a.max_score if published else None
+        )
+        for a, title, published in archived.all()
+    )
+    listed.sort(key=lambda a: a.started_at, reverse=True)
+    return listed
+
+
+async def _ranked_attempt(
+    db: AsyncSession,
+    student: User,
+    exam_id: UUID,
+    attempt_id: Optional[UUID] = None
+):
+    """
+    (attempt_id, exam_id, score, exam version, archived) of the student's
+    submitted attempt for the exam (that attempt, if given), live or
+    archived; 403 until results are published.
+    """
+    for model, id_column, archived in ((Attempt, Attempt.id, False), (ArchivedAttempt, ArchivedAttempt.attempt_id, True)):
+        query = (
+            select(id_column, model.exam_id, model.score, Exam.version, Exam.results_published)
+            .join(Exam, Exam.id == model.exam_id)
+            .where(model.exam_id == exam_id, model.student_id == student.id, model.is_submitted == True)
+        )
+        if attempt_id is not None:
+            query = query.where(id_column == attempt_id)
+        row = await db.execute(query.limit(1))
+        row = row.one_or_none()
+        if row is not None:
+            if not row.results_published:
+                raise HTTPException(status_code=403, detail="Results not yet published")
+            return row[0], row[1], row[2] or 0, row[3], archived
+    return None
+
+
+@router.get("/exams/{exam_id}/attempts/{attempt_id}/rank", response_model=AttemptRank)
+async def get_attempt_rank(
+    exam_id: UUID,
+    attempt_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("student"))
+):
+    """Rank and percentile of a submitted attempt, once results are published."""
+    found = await _ranked_attempt(db, current_user, exam_id, attempt_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    attempt_id, exam_id, score, version, archived = found
+    
+    index = await ranking.get_index(db, exam_id, version, archived)
+    return AttemptRank(
+        attempt_id=attempt_id,
+        score=score,
+        rank=index.rank(score),
+        percentile=round(index.percentile(score), 2),
+        ranked_attempts=index.total
+    )
+
+
+@router.get("/exams/{exam_id}/leaderboard", response_model=Leaderboard)
+async def get_leaderboard(
+    exam_id: UUID,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("student"))
+):
+    """Top scores of an exam (without names) and your own rank; for students who took it."""
+    found = await _ranked_attempt(db, current_user, exam_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="No submitted attempt for this exam")
+    attempt_id, exam_id, score, version, archived = found
+    
+    index = await ranking.get_index(db, exam_id, version, archived)
+    top = await ranking.top_attempts(db, exam_id, index, limit, archived)
+    return Leaderboard(
+        exam_id=exam_id,
+        ranked_attempts=index.total,
+        entries=[
+            LeaderboardEntry(rank=index.rank(top_score), score=top_score, is_you=top_id == attempt_id)
+            for top_id, _, top_score in top
+        ],
+        you=AttemptRank(
+            attempt_id=attempt_id,
+            score=score,
+            rank=index.rank(score),
+            percentile=round(index.percentile(score), 2),
+            ranked_attempts=index.total
+        )
+    )
 
 
-@router.get("/attempts/{attempt_id}", response_model=AttemptResult)
+@router.get("/exams/{exam_id}/attempts/{attempt_id}", response_model=AttemptResult)
 async def get_attempt_result(
-    attempt_id: str,
+    exam_id: UUID,
+    attempt_id: UUID,
+    request: Request,
+    response: HTTPResponse,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role("student"))
 ):
-    """Get detailed result for a submitted attempt (if results published)."""
+    """
+    Get detailed result for a submitted attempt (if results published).
+    
+    Published results are served from the materialized snapshot when it
+    matches the current exam version: a single indexed row read.
+    """
+    version = await db.execute(
+        select(
+            Attempt.is_submitted, Attempt.score, Attempt.submitted_at, Exam.version,
+            AttemptResultSnapshot.document
+        )
+        .join(Exam, Exam.id == Attempt.exam_id)
+        .outerjoin(
+            AttemptResultSnapshot,
+            and_(
+                AttemptResultSnapshot.attempt_id == Attempt.id,
+                AttemptResultSnapshot.exam_version == Exam.version
+            )
+        )
+        .where(Attempt.exam_id == exam_id, Attempt.id == attempt_id, Attempt.student_id == current_user.id)
+    )
+    version = version.one_or_none()
+    if version is None:
+        return await _archived_attempt_result(exam_id, attempt_id, request, response, db, current_user)
+    
+    etag = make_etag("attempt", attempt_id, *version[:4])
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    document = version[4]
+    if document is not None:
+        return HTTPResponse(
+            content=document,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    
     result = await db.execute(
         select(Attempt)
         .options(
-            selectinload(Attempt.exam).selectinload(Exam.questions).selectinload(Question.options),
-            selectinload(Attempt.responses)
+            selectinload(Attempt.exam).options(noload(Exam.questions), noload(Exam.attempts)),
+            # The partition key, so only this exam's partition of responses is read
+            selectinload(Attempt.responses.and_(Response.exam_id == exam_id))
         )
-        .where(Attempt.id == attempt_id, Attempt.student_id == current_user.id)
+        .where(Attempt.exam_id == exam_id, Attempt.id == attempt_id, Attempt.student_id == current_user.id)
     )
     attempt = result.scalar_one_or_none()
     
@@ -332,31 +655,64 @@ async def get_attempt_result(
             responses=[]
         )
     
-    # Build response details
-    response_map = {r.question_id: r for r in attempt.responses}
-    response_results = []
-    
-    for question in attempt.exam.questions:
-        resp = response_map.get(question.id)
-        correct_option = next((o for o in question.options if o.is_correct), None)
-        
-        response_results.append(ResponseResult(
-            question_id=question.id,
-            question_content=question.content,
-            selected_option_id=resp.selected_option_id if resp else None,
-            correct_option_id=correct_option.id if correct_option else None,
-            is_correct=resp.is_correct if resp else False,
-            points_earned=question.points if (resp and resp.is_correct) else 0,
-            max_points=question.points
-        ))
+    # No current snapshot: build it once and keep it for the next view
+    questions = await load_attempt_questions(db, attempt, attempt.exam)
+    attempt_result = build_attempt_result(
+        attempt, attempt.exam, questions, answers.attempt_responses(attempt, questions)
+    )
+    await store_result(db, attempt, attempt.exam, attempt_result)
+    await db.commit()
     
-    return AttemptResult(
-        attempt_id=attempt.id,
-        exam_title=attempt.exam.title,
-        score=attempt.score or 0,
-        max_score=attempt.max_score or 0,
-        percentage=round((attempt.score / attempt.max_score * 100) if attempt.max_score else 0, 2),
-        started_at=attempt.started_at,
-        submitted_at=attempt.submitted_at,
-        responses=response_results
+    return attempt_result
+
+
+async def _archived_attempt_result(
+    exam_id: UUID,
+    attempt_id: UUID,
+    request: Request,
+    response: HTTPResponse,
+    db: AsyncSession,
+    current_user: User
+):
+    """Result of an attempt whose exam has been archived: one seek into the exam's results file."""
+    row = await db.execute(
+        select(ArchivedAttempt, Exam.title, Exam.results_published, Exam.version)
+        .join(Exam, Exam.id == ArchivedAttempt.exam_id)
+        .where(
+            ArchivedAttempt.exam_id == exam_id,
+            ArchivedAttempt.attempt_id == attempt_id,
+            ArchivedAttempt.student_id == current_user.id
+        )
     )
+    row = row.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    archived, exam_title, results_published, exam_version = row
+    
+    if not archived.is_submitted:
+        raise HTTPException(status_code=400, detail="Exam not yet submitted")
+    
+    etag = make_etag("archived", attempt_id, exam_version)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    if not results_published:
+        return AttemptResult(
+            attempt_id=archived.attempt_id,
+            exam_title=exam_title,
+            score=0,
+            max_score=0,
+            percentage=0,
+            started_at=archived.started_at,
+            submitted_at=archived.submitted_at,
+            responses=[]
+        )
+    
+    member = await archive.read_result(archived)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    # Stored as a gzip member: pass it through untouched when the client takes gzip
+    if accepts(request.headers.get("accept-encoding", ""), "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        return HTTPResponse(content=member, media_type="application/json", headers=headers)
+    return HTTPResponse(content=gzip.decompress(member), media_type="application/json", headers=headers)
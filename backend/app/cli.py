@@ -0,0 +1,107 @@
+"""
+Operational commands.
+
+    python -m app.cli init-db
+    python -m app.cli partitions
+    python -m app.cli partition-create EXAM_ID
+    python -m app.cli partition-detach EXAM_ID [--drop]
+    python -m app.cli roster FILE.csv [--teachers] [--report REPORT.csv]
+"""
+import argparse
+import asyncio
+import csv
+import dataclasses
+import uuid
+
+from app.core.database import init_db, engine, async_session_maker
+from app.core import processes
+import app.models  # noqa: F401 - registers every table on Base.metadata
+from app.models import UserRole
+from app.services import partitions, roster
+
+
+async def _init_db(args: argparse.Namespace) -> None:
+    await init_db()
+    print("Database schema created")
+
+
+async def _list_partitions(args: argparse.Namespace) -> None:
+    async with engine.connect() as conn:
+        for row in await partitions.list_partitions(conn):
+            print(f"{row['parent']:<10} {row['partition']:<50} {row['bytes']:>14,}  {row['bound']}")
+
+
+async def _create_partition(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        moved = await partitions.create_exam_partitions(conn, args.exam_id)
+    print(f"Created partitions for exam {args.exam_id} ({moved} attempts moved)")
+
+
+async def _detach_partition(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        await partitions.detach_exam_partitions(conn, args.exam_id)
+        if args.drop:
+            await partitions.drop_detached_partitions(conn, args.exam_id)
+    print(f"Detached partitions for exam {args.exam_id}" + (" and dropped them" if args.drop else ""))
+
+
+async def _provision_roster(args: argparse.Namespace) -> None:
+    with open(args.file, encoding="utf-8-sig", newline="") as f:
+        text = f.read()
+    roles = (UserRole.STUDENT, UserRole.TEACHER) if args.teachers else (UserRole.STUDENT,)
+    try:
+        async with async_session_maker() as db:
+            rows = await roster.provision(db, text, allowed_roles=roles)
+            await db.commit()
+    finally:
+        processes.shutdown()
+
+    if args.report:
+        with open(args.report, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=[field.name for field in dataclasses.fields(roster.RosterRow)])
+            writer.writeheader()
+            writer.writerows(dataclasses.asdict(row) for row in rows)
+
+    counts = {}
+    for row in rows:
+        counts[row.status] = counts.get(row.status, 0) + 1
+        if row.status in ("invalid", "duplicate"):
+            print(f"line {row.line}: {row.email or '-'}: {row.status} ({row.detail})")
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "Empty roster")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="eTests operations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("init-db", help="Create tables and stamp the schema version").set_defaults(handler=_init_db)
+    commands.add_parser("partitions", help="List attempts/responses partitions").set_defaults(handler=_list_partitions)
+
+    create = commands.add_parser("partition-create", help="Give an exam dedicated partitions")
+    create.add_argument("exam_id", type=uuid.UUID)
+    create.set_defaults(handler=_create_partition)
+
+    detach = commands.add_parser("partition-detach", help="Detach a closed exam's partitions")
+    detach.add_argument("exam_id", type=uuid.UUID)
+    detach.add_argument("--drop", action="store_true", help="Drop the detached tables as well")
+    detach.set_defaults(handler=_detach_partition)
+
+    provision = commands.add_parser("roster", help="Create accounts in bulk from a CSV roster")
+    provision.add_argument("file", help="CSV with email, full_name[, password][, role] columns")
+    provision.add_argument("--teachers", action="store_true", help="Allow rows with role=teacher")
+    provision.add_argument("--report", help="Write the per-row report (incl. generated passwords) here")
+    provision.set_defaults(handler=_provision_roster)
+
+    args = parser.parse_args()
+
+    async def run() -> None:
+        try:
+            await args.handler(args)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from app.core.config import settings
-from app.core.database import Base, get_db, init_db
+from app.core.database import Base, get_db, init_db, check_schema
+from app.core.etag import make_etag, conditional_response
 from app.core.security import (
     verify_password,
     get_password_hash,
@@ -15,6 +16,9 @@ __all__ = [
     "Base",
     "get_db",
     "init_db",
+    "check_schema",
+    "make_etag",
+    "conditional_response",
     "verify_password",
     "get_password_hash",
     "create_access_token",
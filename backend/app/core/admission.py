@@ -0,0 +1,228 @@
+import asyncio
+import ipaddress
+import logging
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.security import decode_token
+
+try:
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # redis is only needed when ADMISSION_REDIS_URL is set
+    aioredis = None
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+_MAX_BUCKETS = 100_000
+
+
+class InMemoryBuckets:
+    """Per-key token buckets held in this process (LRU-bounded)."""
+
+    def __init__(self, max_keys: int = _MAX_BUCKETS):
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._max_keys = max_keys
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(burst), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / rate
+
+
+# KEYS[1] bucket; ARGV rate/s, burst, now (s). Returns wait in milliseconds.
+_REDIS_TAKE = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = math.ceil((1 - tokens) / rate * 1000) end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return wait
+"""
+
+
+class RedisBuckets:
+    """
+    Token buckets shared by every worker through Redis.
+
+    Fails open: while Redis is unreachable, this worker's own in-memory
+    buckets stand in rather than rejecting or erroring every request.
+    """
+
+    def __init__(self, url: str):
+        self._redis = aioredis.from_url(url)
+        self._take = self._redis.register_script(_REDIS_TAKE)
+        self._fallback = InMemoryBuckets()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        try:
+            wait_ms = await self._take(keys=[f"admission:{key}"], args=[rate, burst, time.time()])
+        except (RedisError, OSError):
+            logger.exception("Admission bucket lookup failed; using per-worker buckets")
+            return await self._fallback.take(key, rate, burst)
+        return int(wait_ms) / 1000
+
+
+def _make_backend():
+    if settings.ADMISSION_REDIS_URL:
+        if aioredis is None:
+            raise RuntimeError("ADMISSION_REDIS_URL is set but the redis package is not installed")
+        return RedisBuckets(settings.ADMISSION_REDIS_URL)
+    return InMemoryBuckets()
+
+
+buckets = _make_backend()
+
+
+def _shed(detail: str, retry_after: float, status_code: int) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class ConcurrencyLimiter:
+    """
+    Concurrency cap with a bounded wait queue.
+
+    A request is shed up front when the queue is full or when the expected
+    wait (queue depth x recent service time / slots) already exceeds the
+    deadline, rather than after it has waited and timed out anyway.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_wait: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._service_time = 0.05  # EWMA of seconds per request
+
+    def expected_wait(self) -> float:
+        return (self._waiting + 1) * self._service_time / self.max_concurrent
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue or self.expected_wait() > self.max_wait:
+                raise _shed("Server busy, retry shortly", self.expected_wait(), status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            raise _shed("Server busy, retry shortly", self.expected_wait(), status.HTTP_503_SERVICE_UNAVAILABLE)
+        finally:
+            self._waiting -= 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - started)
+
+
+_trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+
+def _trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> str:
+    """
+    The client's address. X-Forwarded-For is only believed when the peer is
+    one of TRUSTED_PROXIES; the client is then the last hop not among them.
+    """
+    host = request.client.host if request.client else "unknown"
+    if not _trusted(host):
+        return host
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop):
+            return hop
+    return hops[0] if hops else host
+
+
+async def _client_key(request: Request, per: str) -> str:
+    if per == "email":
+        # Login: one bucket per account and address, so clients sharing an
+        # address (a proxy, a campus NAT) don't lock each other out, and
+        # guessing from elsewhere can't lock the account's owner out
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        email = body.get("email") if isinstance(body, dict) else None
+        if isinstance(email, str) and email.strip():
+            return f"email:{email.strip().lower()}:ip:{client_ip(request)}"
+    if per == "user":
+        authorization: Optional[str] = request.headers.get("authorization")
+        if authorization and authorization.lower().startswith("bearer "):
+            try:
+                subject = decode_token(authorization[7:]).get("sub")
+            except HTTPException:
+                subject = None
+            if subject:
+                return f"user:{subject}"
+    return f"ip:{client_ip(request)}"
+
+
+def admission_control(route: str, rate_per_minute: int, burst: int, per: str = "user"):
+    """
+    Dependency guarding an exam-day route: a token bucket per user, per
+    submitted email and IP (per="email", read from the JSON body) or per IP, followed
+    by the route's concurrency cap. Rejections carry Retry-After.
+    """
+    limiter = ConcurrencyLimiter(
+        settings.ADMISSION_MAX_CONCURRENT,
+        settings.ADMISSION_MAX_QUEUE,
+        settings.ADMISSION_MAX_WAIT_SECONDS
+    )
+    rate = rate_per_minute / 60
+
+    async def dependency(request: Request):
+        if not settings.ADMISSION_ENABLED:
+            yield
+            return
+
+        wait = await buckets.take(f"{route}:{await _client_key(request, per)}", rate, burst)
+        if wait > 0:
+            raise _shed("Too many requests", wait, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        async with limiter.slot():
+            yield
+
+    return dependency
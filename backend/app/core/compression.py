@@ -0,0 +1,214 @@
+import gzip
+import zlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+# On-the-fly compression favours speed; precompressed variants are built once
+STREAM_GZIP_LEVEL = 6
+STREAM_BROTLI_QUALITY = 5
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+
+def _weights(accept_encoding: str) -> Dict[str, float]:
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    return weights
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    weights = _weights(accept_encoding)
+    default = weights.get("*", 0.0)
+    candidates = [e for e in SUPPORTED_ENCODINGS if weights.get(e, default) > 0]
+    # max() keeps the first of equal weights, so server preference breaks ties
+    return max(candidates, key=lambda e: weights.get(e, default), default=None)
+
+
+def accepts(accept_encoding: str, encoding: str) -> bool:
+    """Whether the client takes this particular encoding (for bodies stored pre-encoded)."""
+    weights = _weights(accept_encoding)
+    return weights.get(encoding, weights.get("*", 0.0)) > 0
+
+
+def compress(data: bytes, encoding: str, static: bool = True) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=STATIC_BROTLI_QUALITY if static else STREAM_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=STATIC_GZIP_LEVEL if static else STREAM_GZIP_LEVEL, mtime=0)
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class PrecompressedPayload:
+    """
+    A serialized response body whose compressed variants are built at most once.
+
+    Variants are built on the event loop, so only payloads that are actually
+    shared between requests pay for the static levels; per-client bodies
+    (shared=False) use the cheaper streaming levels.
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json", shared: bool = True):
+        self.media_type = media_type
+        self.shared = shared
+        self._variants: Dict[str, bytes] = {"identity": body}
+
+    def variant(self, encoding: str) -> bytes:
+        body = self._variants.get(encoding)
+        if body is None:
+            body = compress(self._variants["identity"], encoding, static=self.shared)
+            self._variants[encoding] = body
+        return body
+
+    def response(self, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+        body = self._variants["identity"]
+        response_headers = {"Vary": "Accept-Encoding", **(headers or {})}
+
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        if encoding and len(body) >= settings.COMPRESSION_MIN_SIZE:
+            body = self.variant(encoding)
+            response_headers["Content-Encoding"] = encoding
+
+        return Response(content=body, media_type=self.media_type, headers=response_headers)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=STREAM_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(STREAM_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        # Flush every chunk so streamed exports reach the client progressively
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + (self._compressor.finish() if final else self._compressor.flush())
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli compression.
+
+    Small single-chunk bodies are passed through untouched, responses that
+    already carry a Content-Encoding (precompressed payloads) are left alone,
+    and streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self.send(self.start_message)
+            self.start_message = None
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            # Hold the start message until the first body chunk decides the encoding
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = _StreamCompressor(self.encoding)
+
+            if not more_body:
+                body = self.compressor.compress(body, final=True)
+                headers["Content-Length"] = str(len(body))
+                await self._flush_start()
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            # Streaming: the compressed length is unknown up front
+            del headers["Content-Length"]
+            await self._flush_start()
+
+        chunk = self.compressor.compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
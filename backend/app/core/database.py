@@ -1,12 +1,30 @@
+import asyncio
+from sqlalchemy import Column, Integer, inspect, select, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
+# Bump whenever the models change in a way that needs DDL
+SCHEMA_VERSION = 12
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    
+    version = Column(Integer, primary_key=True)
+
 
 async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
@@ -17,5 +35,52 @@ async def get_db() -> AsyncSession:
 
 
 async def init_db():
+    """
+    Create all tables and stamp the schema version (DDL; run from the CLI, not
+    on boot). Only an empty database is created and stamped: existing tables
+    must already carry this code's version, since create_all never alters them.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        existing = set(await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names()))
+        if not existing & set(Base.metadata.tables):
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(SchemaVersion.__table__.insert().values(version=SCHEMA_VERSION))
+            return
+
+        version = None
+        if SchemaVersion.__tablename__ in existing:
+            version = await conn.scalar(select(SchemaVersion.version))
+        if version != SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Database already has tables at schema version {version}, expected {SCHEMA_VERSION}; "
+                "migrate it or recreate the database"
+            )
+
+
+async def check_schema():
+    """Verify the database was stamped with this code's schema version, without any DDL."""
+    async with engine.connect() as conn:
+        try:
+            version = await conn.scalar(select(SchemaVersion.version))
+        except DBAPIError as exc:
+            raise RuntimeError("Database schema is missing; run `python -m app.cli init-db`") from exc
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} does not match expected {SCHEMA_VERSION}"
+        )
+
+
+async def warm_pool(connections: int):
+    """Open pool connections up front so first requests don't pay for connecting."""
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return
+    barrier = asyncio.Barrier(connections)
+    
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            # Hold this connection until every ping has its own
+            await barrier.wait()
+    
+    await asyncio.gather(*(ping() for _ in range(connections)))
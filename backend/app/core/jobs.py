@@ -0,0 +1,289 @@
+"""
+Durable background jobs.
+
+Jobs are rows in the jobs table, enqueued in the caller's transaction (so a
+job exists exactly when the change that needs it commits). Workers claim
+them with FOR UPDATE SKIP LOCKED, run the registered handler, and record the
+outcome:
+
+- concurrency: each kind has a cap on running jobs across all workers,
+  enforced under a per-kind advisory lock taken while claiming;
+- progress: handlers report through JobContext.progress; the worker writes
+  it with a heartbeat every JOB_HEARTBEAT_SECONDS;
+- retries: a failing job is requeued with exponential backoff until
+  max_attempts, then marked failed; a job whose worker stopped heartbeating
+  for JOB_STALE_SECONDS is requeued the same way.
+
+Workers run inside the API process (JOBS_IN_APP) or on their own with
+`python -m app.worker`, which keeps heavy work off the exam-taking workers.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Progress callback accepted by long-running services: (done, total=None, message=None)
+Progress = Callable[..., Awaitable[None]]
+
+
+@dataclass
+class JobType:
+    kind: str
+    handler: Callable[..., Awaitable[Any]]
+    concurrency: int
+    max_attempts: int
+
+
+_registry: Dict[str, JobType] = {}
+
+# Matches uq_jobs_pending_key
+_PENDING = and_(Job.status == JobStatus.QUEUED, Job.started_at.is_(None))
+
+
+def job(kind: str, concurrency: int = 1, max_attempts: int = 3):
+    """
+    Register a handler: async def handler(ctx: JobContext, **payload). Its
+    return value (JSON-serializable) is stored as the job's result.
+    """
+    def register(handler):
+        _registry[kind] = JobType(kind, handler, concurrency, max_attempts)
+        return handler
+    return register
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[dict] = None,
+    key: Optional[str] = None,
+    exam_id: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    run_after: Optional[datetime] = None
+) -> uuid.UUID:
+    """
+    Queue a job in the caller's transaction; returns its id. With a key, a
+    job queued under it that has not started yet is returned instead of
+    adding another (a running one may be working from older data). run_after
+    delays the job, e.g. for the next run of a periodic one.
+    """
+    job_type = _registry[kind]
+    job_id = await db.scalar(
+        insert(Job)
+        .values(
+            id=uuid.uuid4(),
+            kind=kind,
+            key=key,
+            payload=payload or {},
+            status=JobStatus.QUEUED,
+            max_attempts=job_type.max_attempts,
+            exam_id=exam_id,
+            created_by=created_by,
+            run_after=run_after or datetime.utcnow(),
+            created_at=datetime.utcnow()
+        )
+        .on_conflict_do_nothing(index_elements=[Job.key], index_where=_PENDING)
+        .returning(Job.id)
+    )
+    if job_id is None:
+        job_id = await db.scalar(select(Job.id).where(Job.key == key, _PENDING))
+    return job_id
+
+
+class JobContext:
+    """Handed to handlers; progress is kept in memory until the next heartbeat."""
+
+    def __init__(self, job_id: uuid.UUID, attempt: int):
+        self.job_id = job_id
+        self.attempt = attempt
+        self.fraction = 0.0
+        self.message: Optional[str] = None
+
+    async def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        if total:
+            self.fraction = min(1.0, done / total)
+        if message is not None:
+            self.message = message[:255]
+
+
+def _backoff(attempt: int) -> timedelta:
+    return timedelta(seconds=settings.JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempt - 1))
+
+
+class Worker:
+    """Claims and runs jobs, up to `concurrency` at once in this process."""
+
+    def __init__(self, kinds=None, concurrency: Optional[int] = None):
+        self.kinds = list(kinds or _registry)
+        unknown = set(self.kinds) - set(_registry)
+        if unknown:
+            raise ValueError(f"Unknown job kind(s): {', '.join(sorted(unknown))}")
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Dict[uuid.UUID, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Poll until stop(); jobs in flight at shutdown go back to the queue."""
+        logger.info("Job worker %s started (%s)", self.name, ", ".join(self.kinds))
+        try:
+            while not self._stopping.is_set():
+                claimed = False
+                try:
+                    await self._requeue_stale()
+                    while len(self._running) < self.concurrency:
+                        claim = await self._claim()
+                        if claim is None:
+                            break
+                        claimed = True
+                        task = asyncio.create_task(self._execute(*claim))
+                        self._running[claim[0]] = task
+                        task.add_done_callback(lambda _, job_id=claim[0]: self._running.pop(job_id, None))
+                except Exception:
+                    # Database unavailable or similar: keep polling
+                    logger.exception("Job worker %s failed to poll", self.name)
+                    claimed = False
+                if claimed and len(self._running) < self.concurrency:
+                    continue
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._running.values()):
+                task.cancel()
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _requeue_stale(self) -> None:
+        """Jobs whose worker died mid-run: retry them, or fail them if they are out of attempts."""
+        stale = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+        async with async_session_maker() as db:
+            abandoned = and_(Job.status == JobStatus.RUNNING, Job.heartbeat_at < stale)
+            await db.execute(
+                update(Job)
+                .where(abandoned, Job.attempts < Job.max_attempts)
+                .values(status=JobStatus.QUEUED, claimed_by=None, error="Worker stopped responding")
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                update(Job)
+                .where(abandoned, Job.attempts >= Job.max_attempts)
+                .values(status=JobStatus.FAILED, error="Worker stopped responding", finished_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        async with async_session_maker() as db:
+            ready = await db.scalars(
+                select(Job.kind)
+                .where(Job.status == JobStatus.QUEUED, Job.run_after <= now, Job.kind.in_(self.kinds))
+                .group_by(Job.kind)
+                .order_by(func.min(Job.run_after))
+            )
+            for kind in ready.all():
+                # Serializes claims of one kind across workers, so the cap holds
+                await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"jobs:{kind}"))))
+                running = await db.scalar(
+                    select(func.count()).where(Job.kind == kind, Job.status == JobStatus.RUNNING)
+                )
+                if running >= _registry[kind].concurrency:
+                    await db.rollback()
+                    continue
+
+                next_job = (
+                    select(Job.id)
+                    .where(Job.kind == kind, Job.status == JobStatus.QUEUED, Job.run_after <= now)
+                    .order_by(Job.run_after, Job.created_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                    .scalar_subquery()
+                )
+                token = f"{self.name}:{uuid.uuid4().hex[:8]}"
+                claimed = (await db.execute(
+                    update(Job)
+                    .where(Job.id == next_job)
+                    .values(
+                        status=JobStatus.RUNNING,
+                        claimed_by=token,
+                        attempts=Job.attempts + 1,
+                        started_at=now,
+                        heartbeat_at=now
+                    )
+                    .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+                    .execution_options(synchronize_session=False)
+                )).one_or_none()
+                await db.commit()
+                if claimed is not None:
+                    return (*claimed, token)
+        return None
+
+    async def _update(self, job_id: uuid.UUID, token: str, **values) -> None:
+        """Write to a job we hold, unless it was requeued and claimed elsewhere meanwhile."""
+        async with async_session_maker() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.claimed_by == token)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def _heartbeat(self, ctx: JobContext, token: str) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                await self._update(
+                    ctx.job_id, token,
+                    heartbeat_at=datetime.utcnow(), progress=ctx.fraction, progress_message=ctx.message
+                )
+            except Exception:
+                # Keep beating: a job that stops heartbeating is requeued and run twice
+                logger.exception("Job worker %s failed to heartbeat job %s", self.name, ctx.job_id)
+
+    async def _execute(self, job_id, kind, payload, attempt, max_attempts, token) -> None:
+        ctx = JobContext(job_id, attempt)
+        heartbeat = asyncio.create_task(self._heartbeat(ctx, token))
+        try:
+            try:
+                result = await _registry[kind].handler(ctx, **payload)
+            finally:
+                heartbeat.cancel()
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back without spending an attempt
+            await asyncio.shield(self._update(
+                job_id, token, status=JobStatus.QUEUED, claimed_by=None, attempts=Job.attempts - 1
+            ))
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed on attempt %s/%s", job_id, kind, attempt, max_attempts)
+            error = f"{type(exc).__name__}: {exc}"[:2000]
+            if attempt < max_attempts:
+                await self._update(
+                    job_id, token, status=JobStatus.QUEUED, claimed_by=None, error=error,
+                    run_after=datetime.utcnow() + _backoff(attempt)
+                )
+            else:
+                await self._update(job_id, token, status=JobStatus.FAILED, error=error, finished_at=datetime.utcnow())
+        else:
+            await self._update(
+                job_id, token, status=JobStatus.SUCCEEDED, result=result, progress=1.0,
+                progress_message=ctx.message, finished_at=datetime.utcnow()
+            )
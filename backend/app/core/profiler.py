@@ -0,0 +1,238 @@
+"""
+On-demand sampling profiler for requests.
+
+ProfilerMiddleware profiles a PROFILER_SAMPLE_RATE fraction of requests, plus
+any request whose X-Profiler-Token header carries PROFILER_TOKEN. While one
+runs, a sampler thread looks at its asyncio task every PROFILER_INTERVAL_MS:
+
+- if the task is running, the event loop thread's stack is a CPU sample
+  (and a wall sample);
+- if it is suspended, its chain of awaiting coroutines is a wall sample that
+  ends in "[await <type>]"; time spent waiting on the database, the thread
+  pool or a lock shows up there.
+
+Finished profiles keep collapsed stacks ("frame;frame;frame count", the input
+of flamegraph.pl and speedscope), the last PROFILER_KEEP per worker. main.py
+only installs the middleware when profiling is configured.
+"""
+import asyncio
+import hmac
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from types import CodeType, FrameType
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+TOKEN_HEADER = "x-profiler-token"
+KINDS = ("wall", "cpu")
+
+_PATH_PREFIXES = sorted(
+    {
+        os.path.join(os.getcwd(), ""),
+        *(os.path.join(p, "") for p in (sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"])),
+        os.path.join(sysconfig.get_paths()["stdlib"], ""),
+    },
+    key=len,
+    reverse=True,
+)
+
+
+@lru_cache(maxsize=8192)
+def _label(code: CodeType) -> str:
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(settings.PROFILER_TOKEN and token) and hmac.compare_digest(token, settings.PROFILER_TOKEN)
+
+
+class Profile:
+    """Samples of one request. Only the sampler thread writes the counters while it runs."""
+
+    def __init__(self, method: str, path: str, task: asyncio.Task, root: FrameType):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.status_code: Optional[int] = None
+        self.duration_ms = 0.0
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+        self._thread_id = threading.get_ident()
+        self._task: Optional[asyncio.Task] = task
+        self._root: Optional[FrameType] = root
+        self._started = time.perf_counter()
+
+    def _running_stack(self, leaf: Optional[FrameType]) -> Optional[List[str]]:
+        """The loop thread's stack from the root frame down, if this request is the one running."""
+        stack = []
+        frame = leaf
+        while frame is not None:
+            stack.append(_label(frame.f_code))
+            if frame is self._root:
+                stack.reverse()
+                return stack
+            frame = frame.f_back
+        return None
+
+    def _awaiting_stack(self) -> List[str]:
+        stack = []
+        recording = False
+        awaitable = self._task.get_coro()
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                stack.append(f"[await {type(awaitable).__name__}]")
+                break
+            recording = recording or frame is self._root
+            if recording:
+                stack.append(_label(frame.f_code))
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+        return stack
+
+    def sample(self, frames: Dict[int, FrameType]) -> None:
+        if self._task is None or self._task.done():
+            return
+        stack = self._running_stack(frames.get(self._thread_id))
+        if stack is not None:
+            collapsed = ";".join(stack)
+            self.cpu[collapsed] += 1
+            self.wall[collapsed] += 1
+            return
+        stack = self._awaiting_stack()
+        if stack:
+            self.wall[";".join(stack)] += 1
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        self._task = None
+        self._root = None
+
+    def collapsed(self, kind: str = "wall") -> str:
+        samples: Counter = getattr(self, kind)
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "wall_samples": sum(self.wall.values()),
+            "cpu_samples": sum(self.cpu.values()),
+        }
+
+
+class _Sampler:
+    """One daemon thread per worker, idle unless a profiled request is in flight."""
+
+    def __init__(self):
+        self._active: Dict[str, Profile] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def remove(self, profile: Profile) -> None:
+        with self._lock:
+            self._active.pop(profile.id, None)
+
+    def _run(self) -> None:
+        interval = settings.PROFILER_INTERVAL_MS / 1000
+        while True:
+            self._wake.wait()
+            with self._lock:
+                profiles = list(self._active.values())
+                if not profiles:
+                    self._wake.clear()
+                    continue
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            del frames
+            time.sleep(interval)
+
+
+_sampler = _Sampler()
+_profiles: "OrderedDict[str, Profile]" = OrderedDict()
+
+
+def recent_profiles() -> List[Profile]:
+    """Finished profiles of this worker, newest first."""
+    return list(reversed(_profiles.values()))
+
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    return _profiles.get(profile_id)
+
+
+def merged_collapsed(profiles: List[Profile], kind: str = "wall") -> str:
+    samples: Counter = Counter()
+    for profile in profiles:
+        samples.update(getattr(profile, kind))
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class ProfilerMiddleware:
+    """
+    Profile sampled or explicitly requested requests; the response carries
+    X-Profile-Id. Requests that are not picked cost one random() call.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 0.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        return settings.PROFILER_TOKEN is not None and is_authorized(Headers(scope=scope).get(TOKEN_HEADER))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"], asyncio.current_task(), sys._getframe())
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        _sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _sampler.remove(profile)
+            profile.finish()
+            _profiles[profile.id] = profile
+            while len(_profiles) > settings.PROFILER_KEEP:
+                _profiles.popitem(last=False)
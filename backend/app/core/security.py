@@ -1,17 +1,26 @@
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import noload
 
 from app.core.config import settings
 from app.core.database import get_db
 
 security = HTTPBearer()
 
+# Verified claims by token digest, so clients reusing an access token skip the
+# signature check. Entries expire with the token; session revocation is still
+# checked against the user row on every request (get_current_user).
+_token_cache: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
@@ -35,16 +44,49 @@ def create_refresh_token(data: dict) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def decode_token(token: str) -> dict:
+    key = _token_key(token)
+    cached = _token_cache.get(key)
+    if cached is not None:
+        claims, expires_at = cached
+        if time.time() < expires_at:
+            _token_cache.move_to_end(key)
+            return dict(claims)
+        del _token_cache[key]
+        raise _invalid_token()
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _invalid_token()
+
+    expires_at = payload.get("exp")
+    if settings.TOKEN_CACHE_SIZE > 0 and isinstance(expires_at, (int, float)):
+        _token_cache[key] = (dict(payload), float(expires_at))
+        if len(_token_cache) > settings.TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return payload
+
+
+def forget_token(token: str) -> None:
+    """Drop a token's cached claims (it still verifies until it expires)."""
+    _token_cache.pop(_token_key(token), None)
+
+
+def clear_token_cache() -> None:
+    _token_cache.clear()
 
 
 async def get_current_user(
@@ -61,12 +103,22 @@ async def get_current_user(
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    result = await db.execute(select(User).where(User.id == user_id))
+    # Skip the user's exam/attempt collections: routes query what they need
+    result = await db.execute(
+        select(User)
+        .options(noload(User.exams_created), noload(User.attempts))
+        .where(User.id == user_id)
+    )
     user = result.scalar_one_or_none()
     
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
+    # Logout and logins elsewhere replace the session; its tokens stop working
+    if user.current_session_id is None or user.current_session_id != payload.get("session_id"):
+        forget_token(credentials.credentials)
+        raise HTTPException(status_code=401, detail="Session invalidated - logged in elsewhere")
+    
     return user
 
 
@@ -1,6 +1,11 @@
 from app.models.user import User, UserRole
 from app.models.exam import Exam, Question, Option
-from app.models.attempt import Attempt, Response
+from app.models.attempt import Attempt, Response, AttemptResultSnapshot
+from app.models.idempotency import IdempotencyRecord
+from app.models.archive import ArchivedAttempt
+from app.models.collusion import CollusionPair
+from app.models.job import Job, JobStatus
+from app.models.media import Media
 
 __all__ = [
     "User",
@@ -9,5 +14,12 @@ __all__ = [
     "Question",
     "Option",
     "Attempt",
-    "Response"
+    "Response",
+    "AttemptResultSnapshot",
+    "IdempotencyRecord",
+    "ArchivedAttempt",
+    "CollusionPair",
+    "Job",
+    "JobStatus",
+    "Media"
 ]
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, BigInteger, Boolean, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class ArchivedAttempt(Base):
+    """Index row left behind for an archived attempt; the data lives in the exam's archive files"""
+    __tablename__ = "archived_attempts"
+    
+    attempt_id = Column(UUID(as_uuid=True), primary_key=True)
+    exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE"), nullable=False, index=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    started_at = Column(DateTime, nullable=True)
+    submitted_at = Column(DateTime, nullable=True)
+    is_submitted = Column(Boolean, default=False)
+    force_submitted = Column(Boolean, default=False)
+    score = Column(Integer, nullable=True)
+    max_score = Column(Integer, nullable=True)
+    
+    # Location of this attempt's gzip member in results.bin
+    result_offset = Column(BigInteger, nullable=True)  # None for attempts never submitted
+    result_length = Column(Integer, nullable=True)
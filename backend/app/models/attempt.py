@@ -1,24 +1,39 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean
+from sqlalchemy import (
+    Column, Integer, BigInteger, DateTime, ForeignKey, ForeignKeyConstraint, Boolean, LargeBinary, Index, DDL, event, text
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
 
+# attempts and responses are LIST-partitioned by exam_id. Rows land in the
+# DEFAULT partition unless an exam has its own (see app.services.partitions);
+# exam_id is part of both primary keys so lookups can prune partitions.
+
 class Attempt(Base):
     __tablename__ = "attempts"
+    __table_args__ = (
+        Index("ix_attempts_exam_submitted_at", "exam_id", "submitted_at"),
+        Index("ix_attempts_exam_score", "exam_id", text("score DESC NULLS LAST")),  # Leaderboards
+        {"postgresql_partition_by": "LIST (exam_id)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id"), nullable=False)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id"), primary_key=True)
     started_at = Column(DateTime, default=datetime.utcnow)
     submitted_at = Column(DateTime, nullable=True)
     score = Column(Integer, nullable=True)
     max_score = Column(Integer, nullable=True)
     is_submitted = Column(Boolean, default=False)
     force_submitted = Column(Boolean, default=False)  # True if auto-submitted due to timeout
+    question_indices = Column(LargeBinary, nullable=True)  # Packed indices into Exam.question_pool, in delivery order
+    # Packed answers (exams with packed_answers; see app.services.answers): no Response rows
+    answers = Column(LargeBinary, nullable=True)  # Per question: option position + 1 (0 = unanswered) or selection mask
+    correct_mask = Column(LargeBinary, nullable=True)  # Bit i set when question i is correct
     
     # Relationships
     student = relationship("User", back_populates="attempts")
@@ -28,13 +43,46 @@ class Attempt(Base):
 
 class Response(Base):
     __tablename__ = "responses"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["attempt_id", "exam_id"], ["attempts.id", "attempts.exam_id"], ondelete="CASCADE"
+        ),
+        Index("ix_responses_exam_attempt", "exam_id", "attempt_id"),
+        {"postgresql_partition_by": "LIST (exam_id)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    attempt_id = Column(UUID(as_uuid=True), ForeignKey("attempts.id", ondelete="CASCADE"), nullable=False)
+    attempt_id = Column(UUID(as_uuid=True), nullable=False)
+    exam_id = Column(UUID(as_uuid=True), primary_key=True)  # Partition key, copied from the attempt
     question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id"), nullable=False)
     selected_option_id = Column(UUID(as_uuid=True), ForeignKey("options.id"), nullable=True)
+    selected_mask = Column(BigInteger, nullable=True)  # Multi-select questions: bit i = i-th option chosen
     is_correct = Column(Boolean, nullable=True)  # Calculated on submission
     answered_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     attempt = relationship("Attempt", back_populates="responses")
+
+
+for _table in (Attempt.__table__, Response.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL(f"CREATE TABLE IF NOT EXISTS {_table.name}_default PARTITION OF {_table.name} DEFAULT")
+    )
+
+
+class AttemptResultSnapshot(Base):
+    """Materialized AttemptResult JSON, valid while exam_version matches Exam.version"""
+    __tablename__ = "attempt_results"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["attempt_id", "exam_id"], ["attempts.id", "attempts.exam_id"], ondelete="CASCADE"
+        ),
+    )
+    
+    attempt_id = Column(UUID(as_uuid=True), primary_key=True)
+    exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE"), nullable=False, index=True)
+    exam_version = Column(Integer, nullable=False)
+    document = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,23 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class CollusionPair(Base):
+    """A pair of attempts with suspiciously similar wrong answers (see services.collusion)"""
+    __tablename__ = "collusion_pairs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE"), nullable=False, index=True)
+    attempt_a = Column(UUID(as_uuid=True), nullable=False)
+    attempt_b = Column(UUID(as_uuid=True), nullable=False)
+    student_a = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    student_b = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    shared_incorrect = Column(Integer, nullable=False)  # Identical wrong answers
+    expected_shared = Column(Float, nullable=False)  # Under independent answering
+    jaccard = Column(Float, nullable=False)  # Of the two sets of wrong answers
+    score = Column(Float, nullable=False)  # (shared - expected) / sqrt(expected); ranking key
+    computed_at = Column(DateTime, default=datetime.utcnow)
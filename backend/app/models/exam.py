@@ -1,17 +1,22 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, String, Integer, BigInteger, Boolean, DateTime, Text, ForeignKey, LargeBinary, Index, Computed
+)
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
 from app.core.database import Base
 
+# Text search configuration of the generated search vectors (see services.search)
+SEARCH_CONFIG = "english"
+
 
 class Exam(Base):
     __tablename__ = "exams"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    teacher_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    teacher_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     time_limit_minutes = Column(Integer, nullable=False, default=60)
@@ -21,8 +26,19 @@ class Exam(Base):
     randomize_options = Column(Boolean, default=False)
     is_published = Column(Boolean, default=False)
     results_published = Column(Boolean, default=False)
+    
+    # Question pool: each attempt draws questions_per_attempt of the pool (all if NULL),
+    # optionally stratified by question tag or points
+    questions_per_attempt = Column(Integer, nullable=True)
+    pool_strata = Column(String(16), nullable=True)
+    question_pool = Column(LargeBinary, nullable=True)  # Append-only packed question ids
+    page_size = Column(Integer, nullable=True)  # Opt-in paged delivery (questions per page)
+    packed_answers = Column(Boolean, default=False)  # Store answers on the attempt row, not as Responses
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every change; drives ETags
+    archived_at = Column(DateTime, nullable=True)  # Attempts moved to cold storage (see services.archive)
     
     # Relationships
     teacher = relationship("User", back_populates="exams_created")
@@ -32,27 +48,54 @@ class Exam(Base):
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_exam_order", "exam_id", "order"),
+        Index("ix_questions_search", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
-    order = Column(Integer, nullable=False, default=0)
+    order = Column(Integer, nullable=False, default=0)  # Sparse key (see services.ordering)
     points = Column(Integer, nullable=False, default=1)
+    tag = Column(String(100), nullable=True)
+    # Multi-select: any number of correct options, all-or-nothing or partial credit
+    multi_select = Column(Boolean, nullable=False, default=False)
+    partial_credit = Column(Boolean, nullable=False, default=False)
+    key_mask = Column(BigInteger, nullable=True)  # Multi-select: bit i set when the i-th option is correct
+    media_digest = Column(String(64), ForeignKey("media.digest"), nullable=True)  # Attached image (see services.media)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Maintained by Postgres; content ranks above tag. Deferred: only search reads it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', content), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(tag, '')), 'B')",
+            persisted=True
+        )
+    ))
     
     # Relationships
     exam = relationship("Exam", back_populates="questions")
-    options = relationship("Option", back_populates="question", lazy="selectin", order_by="Option.order")
+    # Option positions (bits of key_mask, packed answers) follow this order
+    options = relationship(
+        "Option", back_populates="question", lazy="selectin", order_by="(Option.order, Option.id)"
+    )
 
 
 class Option(Base):
     __tablename__ = "options"
+    __table_args__ = (
+        Index("ix_options_question_order", "question_id", "order"),
+        Index("ix_options_search", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
     is_correct = Column(Boolean, nullable=False, default=False)  # NEVER sent to client!
     order = Column(Integer, nullable=False, default=0)
+    search_vector = deferred(Column(TSVECTOR, Computed(f"to_tsvector('{SEARCH_CONFIG}', content)", persisted=True)))
     
     # Relationships
     question = relationship("Question", back_populates="options")
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class IdempotencyRecord(Base):
+    """First response to a request carrying an Idempotency-Key, replayed on retries"""
+    __tablename__ = "idempotency_keys"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    scope = Column(String(255), nullable=False)  # Route and target the key was first used for
+    status_code = Column(Integer, nullable=False)
+    body = Column(LargeBinary, nullable=False)  # zlib-compressed response body
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
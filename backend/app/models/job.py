@@ -0,0 +1,50 @@
+import uuid
+import enum
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, Index, Enum as SQLEnum, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.core.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    """A unit of background work, claimed by workers with FOR UPDATE SKIP LOCKED (see core.jobs)"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers only ever scan ready jobs
+        Index("ix_jobs_ready", "kind", "run_after", postgresql_where=text("status = 'QUEUED'")),
+        Index("ix_jobs_running", "kind", postgresql_where=text("status = 'RUNNING'")),
+        # At most one not-yet-started job per key, so repeated requests collapse into one
+        Index(
+            "uq_jobs_pending_key", "key", unique=True,
+            postgresql_where=text("status = 'QUEUED' AND started_at IS NULL")
+        ),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(50), nullable=False)
+    key = Column(String(255), nullable=True)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    progress = Column(Float, nullable=False, default=0.0)  # 0..1
+    progress_message = Column(String(255), nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)  # Last failure, kept across retries
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # Retries back off
+    claimed_by = Column(String(255), nullable=True)  # Worker claim token of the current run
+    exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE"), nullable=True, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
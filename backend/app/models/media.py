@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class Media(Base):
+    """An uploaded file, stored once per content under MEDIA_DIR (see services.media)"""
+    __tablename__ = "media"
+    
+    digest = Column(String(64), primary_key=True)  # sha256 of the content, hex
+    content_type = Column(String(100), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
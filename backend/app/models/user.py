@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Index, Enum as SQLEnum, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -28,6 +28,10 @@ class User(Base):
     # Session management for single-login enforcement
     current_session_id = Column(String(255), nullable=True)
     
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email)),  # Case-insensitive login and roster lookups
+    )
+    
     # Relationships
     exams_created = relationship("Exam", back_populates="teacher", lazy="selectin")
     attempts = relationship("Attempt", back_populates="student", lazy="selectin")
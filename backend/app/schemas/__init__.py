@@ -3,29 +3,47 @@ from app.schemas.user import (
     UserLogin,
     TokenResponse,
     TokenRefresh,
-    UserResponse
+    UserResponse,
+    RosterRowResult,
+    RosterReport
 )
 from app.schemas.exam import (
     OptionCreate,
+    OptionInsert,
     OptionResponse,
     OptionSecure,
     QuestionCreate,
     QuestionResponse,
     QuestionSecure,
+    MoveRequest,
     ExamCreate,
     ExamUpdate,
+    ExamClone,
     ExamResponse,
     ExamListResponse,
-    ExamSecure
+    ExamSecure,
+    RegradeRequest,
+    RegradeResult,
+    ExamMonitor,
+    CollusionPairResponse,
+    QuestionSearchHit,
+    QuestionSearchPage
 )
 from app.schemas.attempt import (
     ResponseSubmit,
     AttemptSubmit,
     AttemptStart,
+    QuestionPage,
     ResponseResult,
     AttemptResult,
-    AttemptListResponse
+    AttemptListResponse,
+    AttemptRank,
+    LeaderboardEntry,
+    Leaderboard
 )
+from app.schemas.job import JobResponse, JobAccepted
+from app.schemas.debug import ProfileSummary
+from app.schemas.media import MediaResponse
 
 __all__ = [
     # User
@@ -34,23 +52,45 @@ __all__ = [
     "TokenResponse",
     "TokenRefresh",
     "UserResponse",
+    "RosterRowResult",
+    "RosterReport",
     # Exam
     "OptionCreate",
+    "OptionInsert",
     "OptionResponse",
     "OptionSecure",
     "QuestionCreate",
     "QuestionResponse",
     "QuestionSecure",
+    "MoveRequest",
     "ExamCreate",
     "ExamUpdate",
+    "ExamClone",
     "ExamResponse",
     "ExamListResponse",
     "ExamSecure",
+    "RegradeRequest",
+    "RegradeResult",
+    "ExamMonitor",
+    "CollusionPairResponse",
+    "QuestionSearchHit",
+    "QuestionSearchPage",
     # Attempt
     "ResponseSubmit",
     "AttemptSubmit",
     "AttemptStart",
+    "QuestionPage",
     "ResponseResult",
     "AttemptResult",
-    "AttemptListResponse"
+    "AttemptListResponse",
+    "AttemptRank",
+    "LeaderboardEntry",
+    "Leaderboard",
+    # Job
+    "JobResponse",
+    "JobAccepted",
+    # Debug
+    "ProfileSummary",
+    # Media
+    "MediaResponse"
 ]
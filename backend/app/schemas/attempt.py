@@ -7,7 +7,8 @@ from uuid import UUID
 class ResponseSubmit(BaseModel):
     """Single answer submission"""
     question_id: UUID
-    selected_option_id: UUID
+    selected_option_id: Optional[UUID] = None  # Single-choice questions
+    selected_option_ids: Optional[List[UUID]] = None  # Multi-select questions
 
 
 class AttemptSubmit(BaseModel):
@@ -18,23 +19,34 @@ class AttemptSubmit(BaseModel):
 class AttemptStart(BaseModel):
     """Response when starting an exam"""
     attempt_id: UUID
-    exam: "ExamSecure"  # Forward reference
+    exam: "ExamSecure"  # Forward reference (first page only in paged mode)
     server_time: datetime
     expires_at: datetime
+    question_order: List[UUID] = []
+    next_cursor: Optional[str] = None
     
     class Config:
         from_attributes = True
 
 
+class QuestionPage(BaseModel):
+    """A page of questions for paged delivery"""
+    questions: List["QuestionSecure"]
+    next_cursor: Optional[str] = None
+
+
 class ResponseResult(BaseModel):
     """Individual question result (only after results published)"""
     question_id: UUID
     question_content: str
     selected_option_id: Optional[UUID]
-    correct_option_id: UUID
+    correct_option_id: Optional[UUID]
     is_correct: bool
     points_earned: int
     max_points: int
+    # Multi-select questions
+    selected_option_ids: Optional[List[UUID]] = None
+    correct_option_ids: Optional[List[UUID]] = None
 
 
 class AttemptResult(BaseModel):
@@ -68,5 +80,29 @@ class AttemptListResponse(BaseModel):
 
 
 # Import for forward reference
-from app.schemas.exam import ExamSecure
+from app.schemas.exam import ExamSecure, QuestionSecure
 AttemptStart.model_rebuild()
+QuestionPage.model_rebuild()
+
+
+class AttemptRank(BaseModel):
+    """Where an attempt's score stands among the exam's submitted attempts"""
+    attempt_id: UUID
+    score: int
+    rank: int  # 1 = best; tied scores share a rank
+    percentile: float  # Attempts scoring lower, plus half the ties, in percent
+    ranked_attempts: int
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    score: int
+    is_you: bool = False
+    student_name: Optional[str] = None  # Teachers only
+
+
+class Leaderboard(BaseModel):
+    exam_id: UUID
+    ranked_attempts: int
+    entries: List[LeaderboardEntry]
+    you: Optional[AttemptRank] = None
@@ -1,8 +1,11 @@
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel
+from typing import Optional, List, Literal
+from pydantic import BaseModel, Field
 from uuid import UUID
 
+# Scores are indexed by value for ranking (services.ranking), so keep them small
+MAX_QUESTION_POINTS = 100
+
 
 # Option schemas
 class OptionCreate(BaseModel):
@@ -10,6 +13,12 @@ class OptionCreate(BaseModel):
     is_correct: bool = False
 
 
+class OptionInsert(OptionCreate):
+    """Add an option after after_id or before before_id (last if neither)"""
+    before_id: Optional[UUID] = None
+    after_id: Optional[UUID] = None
+
+
 class OptionResponse(BaseModel):
     """Response for teachers - includes is_correct"""
     id: UUID
@@ -34,8 +43,14 @@ class OptionSecure(BaseModel):
 # Question schemas
 class QuestionCreate(BaseModel):
     content: str
-    points: int = 1
+    points: int = Field(1, ge=0, le=MAX_QUESTION_POINTS)
+    tag: Optional[str] = None
+    multi_select: bool = False  # Any number of correct options
+    partial_credit: bool = False  # Multi-select only; otherwise all-or-nothing
+    media_digest: Optional[str] = None  # From POST /media
     options: List[OptionCreate]
+    before_id: Optional[UUID] = None  # Insert before/after a question instead of last
+    after_id: Optional[UUID] = None
 
 
 class QuestionResponse(BaseModel):
@@ -44,6 +59,10 @@ class QuestionResponse(BaseModel):
     content: str
     order: int
     points: int
+    tag: Optional[str] = None
+    multi_select: bool = False
+    partial_credit: bool = False
+    media_digest: Optional[str] = None
     options: List[OptionResponse]
     
     class Config:
@@ -56,12 +75,20 @@ class QuestionSecure(BaseModel):
     content: str
     order: int
     points: int
+    multi_select: bool = False
+    media_digest: Optional[str] = None  # GET /media/{digest}
     options: List[OptionSecure]
     
     class Config:
         from_attributes = True
 
 
+class MoveRequest(BaseModel):
+    """Move a question or option after after_id or before before_id (last if neither)"""
+    before_id: Optional[UUID] = None
+    after_id: Optional[UUID] = None
+
+
 # Exam schemas
 class ExamCreate(BaseModel):
     title: str
@@ -71,6 +98,10 @@ class ExamCreate(BaseModel):
     end_date: Optional[datetime] = None
     randomize_questions: bool = False
     randomize_options: bool = False
+    questions_per_attempt: Optional[int] = Field(None, gt=0)
+    pool_strata: Optional[Literal["tag", "points"]] = None
+    page_size: Optional[int] = Field(None, gt=0)
+    packed_answers: bool = False
 
 
 class ExamUpdate(BaseModel):
@@ -81,10 +112,19 @@ class ExamUpdate(BaseModel):
     end_date: Optional[datetime] = None
     randomize_questions: Optional[bool] = None
     randomize_options: Optional[bool] = None
+    questions_per_attempt: Optional[int] = Field(None, gt=0)
+    pool_strata: Optional[Literal["tag", "points"]] = None
+    page_size: Optional[int] = Field(None, gt=0)
+    packed_answers: Optional[bool] = None
     is_published: Optional[bool] = None
     results_published: Optional[bool] = None
 
 
+class ExamClone(BaseModel):
+    """Copy an exam with its questions; the copy is an unpublished draft"""
+    title: Optional[str] = Field(None, min_length=1, max_length=255)  # Defaults to "<title> (copy)"
+
+
 class ExamResponse(BaseModel):
     """Response for teachers - includes everything"""
     id: UUID
@@ -96,6 +136,10 @@ class ExamResponse(BaseModel):
     end_date: Optional[datetime]
     randomize_questions: bool
     randomize_options: bool
+    questions_per_attempt: Optional[int] = Field(None, gt=0)
+    pool_strata: Optional[str] = None
+    page_size: Optional[int] = Field(None, gt=0)
+    packed_answers: bool = False
     is_published: bool
     results_published: bool
     created_at: datetime
@@ -130,3 +174,67 @@ class ExamSecure(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+# Regrade schemas
+class RegradeRequest(BaseModel):
+    """Regrade a whole exam, or one question; optionally correct its key first"""
+    question_id: Optional[UUID] = None
+    correct_option_id: Optional[UUID] = None
+    correct_option_ids: Optional[List[UUID]] = None  # Multi-select questions
+
+
+class RegradeResult(BaseModel):
+    exam_id: UUID
+    question_id: Optional[UUID]
+    key_options_changed: int = 0
+    responses_updated: int
+    attempts_rescored: int
+    scores_increased: int
+    scores_decreased: int
+
+
+class ExamMonitor(BaseModel):
+    """Live counters for a running exam"""
+    exam_id: UUID
+    started: int
+    in_progress: int
+    submitted: int
+    force_submitted: int
+    submissions_last_minute: int
+    submissions_per_minute: List[int]  # Most recent minute first
+    reconciled_at: Optional[datetime]
+    server_time: datetime
+
+
+class CollusionPairResponse(BaseModel):
+    """Two attempts ranked by how far their shared wrong answers exceed chance"""
+    attempt_a: UUID
+    attempt_b: UUID
+    student_a: UUID
+    student_b: UUID
+    student_a_name: str
+    student_b_name: str
+    shared_incorrect: int
+    expected_shared: float
+    jaccard: float
+    score: float
+    computed_at: datetime
+
+
+class QuestionSearchHit(BaseModel):
+    """A question matching a search, with the matched words highlighted"""
+    question_id: UUID
+    exam_id: UUID
+    exam_title: str
+    content: str
+    headline: str  # Matches wrapped in <b>...</b>
+    tag: Optional[str] = None
+    points: int
+    multi_select: bool = False
+    rank: float
+
+
+class QuestionSearchPage(BaseModel):
+    results: List[QuestionSearchHit]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
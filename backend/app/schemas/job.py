@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+from app.models.job import JobStatus
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: JobStatus
+    progress: float  # 0..1, updated every few seconds while running
+    progress_message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None  # Last failure; set on retried jobs too
+    attempts: int
+    max_attempts: int
+    exam_id: Optional[UUID] = None
+    created_at: datetime
+    run_after: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class JobAccepted(BaseModel):
+    """Returned by endpoints that hand their work to a background job"""
+    job_id: UUID
+    exam_id: UUID
+    status: str
@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class MediaResponse(BaseModel):
+    digest: str  # Reference it from a question as media_digest
+    content_type: str
+    size: int
+    url: str
+    created_at: Optional[datetime] = None
@@ -1,11 +1,16 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, field_validator
 from uuid import UUID
 
 from app.models.user import UserRole
 
 
+def _normalize_email(email: str) -> str:
+    # Accounts are matched case-insensitively, as roster imports are
+    return email.strip().lower()
+
+
 # Auth schemas
 class UserRegister(BaseModel):
     email: EmailStr
@@ -13,11 +18,15 @@ class UserRegister(BaseModel):
     full_name: str
     role: UserRole = UserRole.STUDENT
 
+    _normalize_email = field_validator("email")(_normalize_email)
+
 
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+    _normalize_email = field_validator("email")(_normalize_email)
+
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -40,3 +49,23 @@ class UserResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+# Bulk roster provisioning
+class RosterRowResult(BaseModel):
+    line: int
+    email: str
+    status: str  # created | exists | duplicate | invalid
+    detail: Optional[str] = None
+    user_id: Optional[UUID] = None
+    temporary_password: Optional[str] = None  # Generated when the roster row had none
+    
+    class Config:
+        from_attributes = True
+
+
+class RosterReport(BaseModel):
+    created: int
+    skipped: int
+    failed: int
+    rows: List[RosterRowResult]
@@ -0,0 +1,135 @@
+"""
+Packed per-attempt answer storage.
+
+Exams with packed_answers keep an attempt's answers on the attempt row
+itself instead of one Response row per question:
+
+- Attempt.answers: per question in the attempt's delivery order, one byte
+  holding the selected option's position within the question (by
+  Option.order) plus one, 0 meaning unanswered; multi-select questions take
+  MASK_BYTES holding the selection mask (see services.grading).
+- Attempt.correct_mask: little-endian bitmap, bit i set when question i was
+  answered correctly.
+
+Helpers here convert between that form and Response-like objects, so result
+building and regrading work the same for both storage modes.
+"""
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.models import Attempt, Question
+from app.services.grading import score_mask
+
+UNANSWERED = 0
+MAX_OPTIONS = 255
+MASK_BYTES = 8
+
+
+@dataclass
+class PackedResponse:
+    """Read-only stand-in for a Response row, decoded from packed answers."""
+    question_id: uuid.UUID
+    selected_option_id: Optional[uuid.UUID]
+    is_correct: bool
+    selected_mask: Optional[int] = None
+
+
+def _width(question: Question) -> int:
+    return MASK_BYTES if question.multi_select else 1
+
+
+def pack_answers(questions: Sequence[Question], values: Sequence[int]) -> bytes:
+    return b"".join(value.to_bytes(_width(q), "little") for q, value in zip(questions, values))
+
+
+def unpack_answers(data: bytes, questions: Sequence[Question]) -> List[int]:
+    """One value per question: position + 1 (single choice) or selection mask (multi-select)."""
+    values = []
+    offset = 0
+    for question in questions:
+        width = _width(question)
+        if offset + width > len(data):
+            break
+        values.append(int.from_bytes(data[offset:offset + width], "little"))
+        offset += width
+    return values
+
+
+def pack_bitmap(flags: Iterable[bool]) -> bytes:
+    flags = list(flags)
+    mask = 0
+    for i, flag in enumerate(flags):
+        if flag:
+            mask |= 1 << i
+    return mask.to_bytes((len(flags) + 7) // 8, "little")
+
+
+def unpack_bitmap(data: bytes, count: int) -> List[bool]:
+    mask = int.from_bytes(data, "little")
+    return [bool(mask >> i & 1) for i in range(count)]
+
+
+def grade(questions: Sequence[Question], values: Sequence[int]) -> Tuple[bytes, int]:
+    """Correctness bitmap and score of packed answers against the current key."""
+    flags = []
+    score = 0
+    for question, value in zip(questions, values):
+        if question.multi_select:
+            correct, points = score_mask(question, value)
+        else:
+            option = question.options[value - 1] if UNANSWERED < value <= len(question.options) else None
+            correct = bool(option and option.is_correct)
+            points = question.points if correct else 0
+        flags.append(correct)
+        score += points
+    return pack_bitmap(flags), score
+
+
+def encode(
+    questions: Sequence[Question],
+    selections: Dict[uuid.UUID, object]
+) -> Tuple[bytes, bytes, int]:
+    """
+    Pack question_id -> selection in the attempt's question order: the
+    option id for single-choice questions, the selection mask for
+    multi-select ones. Returns (answers, correct_mask, score). An option
+    that does not belong to its question is stored as unanswered.
+    """
+    values = []
+    for question in questions:
+        selected = selections.get(question.id)
+        if question.multi_select:
+            values.append(selected or UNANSWERED)
+            continue
+        position = UNANSWERED
+        for i, option in enumerate(question.options):
+            if option.id == selected:
+                position = i + 1
+                break
+        values.append(position)
+    correct_mask, score = grade(questions, values)
+    return pack_answers(questions, values), correct_mask, score
+
+
+def decode(attempt: Attempt, questions: Sequence[Question]) -> List[PackedResponse]:
+    """Response-like objects for an attempt's answered questions."""
+    values = unpack_answers(attempt.answers, questions)
+    flags = unpack_bitmap(attempt.correct_mask or b"", len(values))
+    decoded = []
+    for question, value, correct in zip(questions, values, flags):
+        if value == UNANSWERED:
+            continue
+        if question.multi_select:
+            decoded.append(PackedResponse(question.id, None, correct, selected_mask=value))
+        else:
+            option_id = question.options[value - 1].id if value <= len(question.options) else None
+            decoded.append(PackedResponse(question.id, option_id, correct))
+    return decoded
+
+
+def attempt_responses(attempt: Attempt, questions: Sequence[Question]):
+    """An attempt's responses in whichever mode they were stored."""
+    if attempt.answers is not None:
+        return decode(attempt, questions)
+    return attempt.responses
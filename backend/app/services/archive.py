@@ -0,0 +1,270 @@
+"""
+Archival of closed exams to compressed cold storage.
+
+archive_exam writes an exam's attempts and responses to gzip-compressed
+NDJSON files under ARCHIVE_DIR/<exam_id>/, plus every attempt's full
+AttemptResult as an independent gzip member of results.bin. A small
+ArchivedAttempt row per attempt keeps the owner, summary and the byte range
+of its result, so a student's result is one indexed read and one seek; the
+member can be sent to gzip-capable clients as-is. The live rows are then
+removed (dedicated partitions are detached and dropped instead).
+"""
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import shutil
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import selectinload, noload
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.jobs import Progress
+from app.models import Exam, Attempt, Response, AttemptResultSnapshot, ArchivedAttempt
+from app.services import partitions
+from app.services.answers import attempt_responses
+from app.services.results import build_attempt_result, load_exam_questions, attempt_questions
+
+FORMAT_VERSION = 1
+BATCH_SIZE = 500
+RESULTS_FILE = "results.bin"
+
+
+class AttemptsChanged(RuntimeError):
+    """Attempts were started or submitted while the archive was being written."""
+
+
+def archive_path(exam_id: uuid.UUID) -> Path:
+    return Path(settings.ARCHIVE_DIR) / str(exam_id)
+
+
+def _encode(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def _ndjson_row(obj) -> bytes:
+    row = {column.key: _encode(getattr(obj, column.key)) for column in obj.__table__.columns}
+    return json.dumps(row, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class _ArchiveFile:
+    """Append-only file; writes run in a worker thread and are checksummed."""
+
+    def __init__(self, path: Path):
+        self.name = path.name
+        self._file = open(path, "wb")
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    async def write(self, data: bytes) -> None:
+        if data:
+            await asyncio.to_thread(self._file.write, data)
+            self._sha256.update(data)
+            self.size += len(data)
+
+    async def close(self) -> dict:
+        await asyncio.to_thread(self._file.close)
+        return {"bytes": self.size, "sha256": self._sha256.hexdigest()}
+
+
+class _GzipNdjson:
+    """One gzip stream of NDJSON rows, compressed a batch at a time."""
+
+    def __init__(self, path: Path):
+        self.file = _ArchiveFile(path)
+        self.rows = 0
+        self._compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+
+    async def write_rows(self, rows: List[bytes]) -> None:
+        self.rows += len(rows)
+        await self.file.write(self._compressor.compress(b"".join(rows)))
+
+    async def close(self) -> dict:
+        await self.file.write(self._compressor.flush())
+        return {"rows": self.rows, **await self.file.close()}
+
+
+async def _has_dedicated_partitions(db, exam_id: uuid.UUID) -> bool:
+    return bool(await db.scalar(
+        text("""
+            SELECT 1 FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE child.relname = :name
+        """),
+        {"name": partitions.partition_name("attempts", exam_id)}
+    ))
+
+
+async def archive_exam(exam_id: uuid.UUID, progress: Optional[Progress] = None) -> int:
+    """
+    Background job: move a closed exam's attempts to cold storage. Returns
+    the number of attempts archived (0 if there was nothing to do).
+
+    Files are written to a temporary directory and renamed into place before
+    the live rows are removed in one transaction. If attempts changed while
+    the files were being written (a late submission), nothing is removed and
+    AttemptsChanged is raised, so the job is retried.
+    """
+    async with async_session_maker() as db:
+        exam = await db.scalar(
+            select(Exam)
+            .options(noload(Exam.questions), noload(Exam.attempts))
+            .where(Exam.id == exam_id)
+        )
+        if not exam or exam.archived_at is not None:
+            return 0
+
+        questions = await load_exam_questions(db, exam_id)
+        by_id = {q.id: q for q in questions}
+        total = await db.scalar(
+            select(func.count()).where(Attempt.exam_id == exam_id)
+        ) if progress else None
+
+        target = archive_path(exam_id)
+        staging = target.with_name(f".{exam_id}.tmp")
+        await asyncio.to_thread(shutil.rmtree, staging, True)
+        await asyncio.to_thread(staging.mkdir, parents=True)
+
+        attempts_file = _GzipNdjson(staging / "attempts.ndjson.gz")
+        responses_file = _GzipNdjson(staging / "responses.ndjson.gz")
+        results_file = _ArchiveFile(staging / RESULTS_FILE)
+        archived: List[dict] = []
+        submitted = 0
+
+        last_id = None
+        while True:
+            query = (
+                select(Attempt)
+                .options(selectinload(Attempt.responses.and_(Response.exam_id == exam_id)))
+                .where(Attempt.exam_id == exam_id)
+                .order_by(Attempt.id)
+                .limit(BATCH_SIZE)
+            )
+            if last_id is not None:
+                query = query.where(Attempt.id > last_id)
+            attempts = (await db.scalars(query)).all()
+            if not attempts:
+                break
+
+            await attempts_file.write_rows([_ndjson_row(a) for a in attempts])
+            await responses_file.write_rows([_ndjson_row(r) for a in attempts for r in a.responses])
+
+            members = []
+            offset = results_file.size
+            for attempt in attempts:
+                member_offset = member_length = None
+                if attempt.is_submitted:
+                    submitted += 1
+                    drawn = attempt_questions(attempt, exam, by_id, questions)
+                    result = build_attempt_result(attempt, exam, drawn, attempt_responses(attempt, drawn))
+                    member = gzip.compress(result.model_dump_json().encode("utf-8"), compresslevel=9, mtime=0)
+                    members.append(member)
+                    member_offset, member_length = offset, len(member)
+                    offset += len(member)
+                archived.append({
+                    "attempt_id": attempt.id,
+                    "exam_id": exam_id,
+                    "student_id": attempt.student_id,
+                    "started_at": attempt.started_at,
+                    "submitted_at": attempt.submitted_at,
+                    "is_submitted": attempt.is_submitted,
+                    "force_submitted": attempt.force_submitted,
+                    "score": attempt.score,
+                    "max_score": attempt.max_score,
+                    "result_offset": member_offset,
+                    "result_length": member_length
+                })
+            await results_file.write(b"".join(members))
+
+            last_id = attempts[-1].id
+            for attempt in attempts:
+                for resp in attempt.responses:
+                    db.expunge(resp)
+                db.expunge(attempt)
+            if progress:
+                await progress(len(archived), total, "writing archive")
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "exam_id": str(exam_id),
+            "exam_version": exam.version,
+            "archived_at": datetime.utcnow().isoformat(),
+            "attempts": len(archived),
+            "submitted": submitted,
+            "files": {
+                "attempts.ndjson.gz": await attempts_file.close(),
+                "responses.ndjson.gz": await responses_file.close(),
+                RESULTS_FILE: await results_file.close()
+            }
+        }
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+        # Nothing may have been started or submitted since the files were written;
+        # the row locks hold off late submissions until the rows are gone
+        live = (await db.scalars(
+            select(Attempt.is_submitted).where(Attempt.exam_id == exam_id).with_for_update()
+        )).all()
+        if (len(live), sum(1 for s in live if s)) != (len(archived), submitted):
+            await db.rollback()
+            await asyncio.to_thread(shutil.rmtree, staging, True)
+            raise AttemptsChanged(f"Attempts of exam {exam_id} changed while archiving")
+
+        if progress:
+            await progress(len(archived), total, "removing live rows")
+        await asyncio.to_thread(shutil.rmtree, target, True)
+        await asyncio.to_thread(staging.rename, target)
+
+        for start in range(0, len(archived), BATCH_SIZE):
+            await db.execute(
+                insert(ArchivedAttempt)
+                .values(archived[start:start + BATCH_SIZE])
+                .on_conflict_do_nothing(index_elements=[ArchivedAttempt.attempt_id])
+            )
+
+        if await _has_dedicated_partitions(db, exam_id):
+            conn = await db.connection()
+            await partitions.detach_exam_partitions(conn, exam_id)
+            await partitions.drop_detached_partitions(conn, exam_id)
+        else:
+            for model in (AttemptResultSnapshot, Response, Attempt):
+                await db.execute(delete(model).where(model.exam_id == exam_id))
+
+        exam.archived_at = datetime.utcnow()
+        exam.version = Exam.version + 1
+        await db.commit()
+        return len(archived)
+
+
+def _read_range(path: Path, offset: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+async def read_result(archived: ArchivedAttempt) -> Optional[bytes]:
+    """The attempt's AttemptResult JSON as a gzip member, or None if it has none."""
+    if archived.result_offset is None:
+        return None
+    return await asyncio.to_thread(
+        _read_range,
+        archive_path(archived.exam_id) / RESULTS_FILE,
+        archived.result_offset,
+        archived.result_length
+    )
+
+
+async def remove_archive(exam_id: uuid.UUID) -> None:
+    await asyncio.to_thread(shutil.rmtree, archive_path(exam_id), True)
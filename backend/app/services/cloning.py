@@ -0,0 +1,78 @@
+"""
+Server-side exam cloning.
+
+An exam, its questions and their options are copied with INSERT ... SELECT
+inside the caller's transaction; nothing is loaded into Python. New question
+ids come from gen_random_uuid() in a CTE that both the question and the
+option inserts read, so options land on their copied question.
+"""
+import uuid
+from typing import Optional
+
+from sqlalchemy import select, insert, literal, func, false, null, text, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Exam
+
+COPY_SUFFIX = " (copy)"
+
+_CLONE_QUESTIONS = text("""
+    WITH qmap AS (
+        SELECT id AS old_id, gen_random_uuid() AS new_id, "order" AS ord, created_at
+        FROM questions
+        WHERE exam_id = :source_id
+    ),
+    new_questions AS (
+        INSERT INTO questions (id, exam_id, content, "order", points, tag,
+                               multi_select, partial_credit, key_mask, media_digest, created_at)
+        SELECT qmap.new_id, :exam_id, q.content, q."order", q.points, q.tag,
+               q.multi_select, q.partial_credit, q.key_mask, q.media_digest, now() AT TIME ZONE 'utc'
+        FROM questions q JOIN qmap ON qmap.old_id = q.id
+    ),
+    pool AS (
+        UPDATE exams
+        SET question_pool = (
+            SELECT string_agg(uuid_send(new_id), ''::bytea ORDER BY ord, created_at, old_id) FROM qmap
+        )
+        WHERE id = :exam_id
+    )
+    INSERT INTO options (id, question_id, content, is_correct, "order")
+    SELECT gen_random_uuid(), qmap.new_id, o.content, o.is_correct, o."order"
+    FROM options o JOIN qmap ON qmap.old_id = o.question_id
+""")
+
+
+async def clone_exam(
+    db: AsyncSession,
+    source_id: uuid.UUID,
+    teacher_id: uuid.UUID,
+    title: Optional[str] = None
+) -> uuid.UUID:
+    """
+    Copy an exam with its questions and options; returns the new exam's id.
+    The copy is an unpublished draft with no dates, attempts or pool history.
+    """
+    exam_id = uuid.uuid4()
+    # Shorten long titles so the suffix still fits the column
+    default_title = func.left(Exam.title, Exam.title.type.length - len(COPY_SUFFIX)) + COPY_SUFFIX
+    copied = (
+        Exam.description, Exam.time_limit_minutes, Exam.randomize_questions, Exam.randomize_options,
+        Exam.questions_per_attempt, Exam.pool_strata, Exam.page_size, Exam.packed_answers
+    )
+    await db.execute(
+        insert(Exam).from_select(
+            ["id", "teacher_id", "title", *(c.key for c in copied),
+             "start_date", "end_date", "is_published", "results_published", "version", "created_at", "updated_at"],
+            select(
+                literal(exam_id, UUID(as_uuid=True)),
+                literal(teacher_id, UUID(as_uuid=True)),
+                func.coalesce(literal(title, String), default_title),
+                *copied,
+                null(), null(), false(), false(), literal(1),
+                func.timezone("utc", func.now()), func.timezone("utc", func.now())
+            ).where(Exam.id == source_id)
+        )
+    )
+    await db.execute(_CLONE_QUESTIONS, {"source_id": source_id, "exam_id": exam_id})
+    return exam_id
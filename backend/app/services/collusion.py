@@ -0,0 +1,216 @@
+"""
+Answer-similarity (collusion) analysis.
+
+Each submitted attempt is a row of bits over every option of the exam, set
+for each wrong option it chose; the rows travel to the worker process packed
+(numpy.packbits, one bit per option). There every pair is compared exactly:
+identical wrong answers are the 0/1 matrix times its own transpose, computed
+a block of rows at a time so memory stays bounded, with the BLAS doing the
+popcounts. 10k attempts x 200 questions take seconds on a single core.
+
+The score is the number of identical wrong answers (shared incorrect
+answers) against what independent students would share: for every question
+both got wrong, the chance two wrong answerers pick the same distractor,
+estimated from the whole exam. Pairs are ranked by
+(shared - expected) / sqrt(expected).
+
+Only pairs sharing at least MIN_SHARED wrong answers and MIN_JACCARD of
+their wrong answers overall are kept. Among millions of pairs some always
+look unusual by chance, so the ranking alone would flag MAX_PAIRS pairs even
+in an exam where nobody copied.
+"""
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, delete
+from sqlalchemy.orm import noload
+
+from app.core.database import async_session_maker
+from app.core.jobs import Progress
+from app.core.processes import run_in_process
+from app.models import Exam, Attempt, Response, CollusionPair
+from app.services.answers import UNANSWERED, unpack_answers
+from app.services.results import load_exam_questions, attempt_questions
+
+MIN_SHARED = 5  # Fewer identical wrong answers than this are never flagged
+MIN_JACCARD = 0.4  # Shared / all wrong answers of the pair; chance pairs stay well below
+MAX_PAIRS = 500  # Kept per exam, best first
+BLOCK_ROWS = 512  # Attempts compared against all others per matrix product
+
+
+def _bits(value: int):
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+def _distractors(question, selected_mask: int, option_bit: Dict[uuid.UUID, int]) -> List[int]:
+    """Exam-wide bits of the wrong options within a multi-select selection."""
+    wrong = selected_mask & ~(question.key_mask or 0)
+    return [
+        option_bit[question.options[position].id]
+        for position in _bits(wrong)
+        if position < len(question.options)
+    ]
+
+
+def find_similar_pairs(
+    wrong_options: np.ndarray,
+    option_question: Sequence[int],
+    same_choice: Sequence[float],
+    min_shared: int = MIN_SHARED,
+    min_jaccard: float = MIN_JACCARD,
+    limit: int = MAX_PAIRS,
+    block: int = BLOCK_ROWS
+) -> List[Tuple[int, int, int, float, float, float]]:
+    """
+    Rank pairs of attempts by shared wrong answers.
+
+    wrong_options is np.packbits of the (attempts x options) matrix of wrong
+    options chosen; option_question maps option bits to question indices;
+    same_choice[q] is the chance two wrong answerers of question q chose the
+    same option. Returns (i, j, shared, expected, jaccard, score), best first.
+
+    Pure function over arrays so it can run in a worker process.
+    """
+    option_question = np.asarray(option_question, dtype=np.intp)
+    same_choice = np.asarray(same_choice, dtype=np.float32)
+    # float32 so the products go through BLAS; counts stay exact below 2**24
+    chosen = np.unpackbits(wrong_options, axis=1, count=len(option_question)).astype(np.float32)
+    counts = chosen.sum(axis=1)
+    # Questions each attempt got wrong (with a chosen distractor)
+    option_of = np.zeros((len(option_question), len(same_choice)), dtype=np.float32)
+    option_of[np.arange(len(option_question)), option_question] = 1
+    wrong_questions = np.minimum(chosen @ option_of, 1)
+
+    found_i, found_j, found_shared = [], [], []
+    for start in range(0, len(chosen), block):
+        rows = chosen[start:start + block]
+        # Against this block and every later attempt: the upper triangle only
+        shared = rows @ chosen[start:].T
+        # shared / (a + b - shared) >= min_jaccard, without dividing
+        union = counts[start:start + block, None] + counts[None, start:]
+        similar = (shared >= min_shared) & (shared * (1 + min_jaccard) >= min_jaccard * union)
+        i, j = np.nonzero(np.triu(similar, k=1))
+        found_i.append(i + start)
+        found_j.append(j + start)
+        found_shared.append(shared[i, j])
+
+    i = np.concatenate(found_i) if found_i else np.zeros(0, dtype=np.intp)
+    j = np.concatenate(found_j) if found_j else np.zeros(0, dtype=np.intp)
+    shared = np.concatenate(found_shared) if found_shared else np.zeros(0, dtype=np.float32)
+
+    expected = np.einsum("pq,pq,q->p", wrong_questions[i], wrong_questions[j], same_choice)
+    jaccard = shared / (counts[i] + counts[j] - shared)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(expected > 0, (shared - expected) / np.sqrt(expected), shared)
+
+    best = np.lexsort((-shared, -score))[:limit]
+    return [
+        (int(i[k]), int(j[k]), int(shared[k]), float(expected[k]), float(jaccard[k]), float(score[k]))
+        for k in best
+    ]
+
+
+async def analyze_exam(exam_id: uuid.UUID, progress: Optional[Progress] = None) -> int:
+    """
+    Background job: recompute an exam's collusion pairs (replacing the last
+    run's). Returns the number of pairs stored.
+    """
+    async with async_session_maker() as db:
+        exam = await db.scalar(
+            select(Exam)
+            .options(noload(Exam.questions), noload(Exam.attempts))
+            .where(Exam.id == exam_id)
+        )
+        if not exam:
+            return 0
+
+        questions = await load_exam_questions(db, exam_id)
+        by_id = {q.id: q for q in questions}
+        option_bit: Dict[uuid.UUID, int] = {}
+        option_question: List[int] = []
+        for qi, question in enumerate(questions):
+            for option in question.options:
+                option_bit[option.id] = len(option_question)
+                option_question.append(qi)
+
+        attempts = (await db.execute(
+            select(Attempt.id, Attempt.student_id, Attempt.question_indices, Attempt.answers, Attempt.correct_mask)
+            .where(Attempt.exam_id == exam_id, Attempt.is_submitted == True)
+            .order_by(Attempt.id)
+        )).all()
+        position = {row.id: i for i, row in enumerate(attempts)}
+        wrong_options = np.zeros((len(attempts), len(option_question)), dtype=bool)
+
+        # Packed attempts decode in place
+        for i, row in enumerate(attempts):
+            if row.answers is None:
+                continue
+            drawn = attempt_questions(row, exam, by_id, questions)
+            correct = int.from_bytes(row.correct_mask or b"", "little")
+            for k, (question, choice) in enumerate(zip(drawn, unpack_answers(row.answers, drawn))):
+                if choice == UNANSWERED or correct >> k & 1:
+                    continue
+                if question.multi_select:
+                    wrong_options[i, _distractors(question, choice, option_bit)] = True
+                elif choice <= len(question.options):
+                    wrong_options[i, option_bit[question.options[choice - 1].id]] = True
+
+        # Row-mode attempts: only their wrong answers are read
+        wrong = await db.stream(
+            select(Response.attempt_id, Response.question_id, Response.selected_option_id, Response.selected_mask)
+            .where(
+                Response.exam_id == exam_id,
+                Response.is_correct == False,
+                (Response.selected_option_id != None) | (Response.selected_mask != 0)
+            )
+            .execution_options(yield_per=10_000)
+        )
+        async for attempt_id, question_id, option_id, selected_mask in wrong:
+            i = position.get(attempt_id)
+            if i is None:
+                continue
+            if selected_mask:
+                question = by_id.get(question_id)
+                if question is not None:
+                    wrong_options[i, _distractors(question, selected_mask, option_bit)] = True
+            elif option_bit.get(option_id) is not None:
+                wrong_options[i, option_bit[option_id]] = True
+
+        # Chance that two wrong answerers of a question chose the same option
+        chosen = wrong_options.sum(axis=0)
+        total = np.bincount(option_question, weights=chosen, minlength=len(questions))
+        squares = np.bincount(option_question, weights=chosen.astype(np.float64) ** 2, minlength=len(questions))
+        same_choice = np.divide(squares, total ** 2, out=np.zeros_like(total), where=total > 0)
+
+        if progress:
+            await progress(1, 3, f"matching {len(attempts)} attempts")
+        pairs = await run_in_process(
+            find_similar_pairs, np.packbits(wrong_options, axis=1), option_question, same_choice
+        )
+        if progress:
+            await progress(2, 3, f"storing {len(pairs)} pairs")
+
+        now = datetime.utcnow()
+        await db.execute(delete(CollusionPair).where(CollusionPair.exam_id == exam_id))
+        db.add_all([
+            CollusionPair(
+                exam_id=exam_id,
+                attempt_a=attempts[i].id,
+                attempt_b=attempts[j].id,
+                student_a=attempts[i].student_id,
+                student_b=attempts[j].student_id,
+                shared_incorrect=shared,
+                expected_shared=round(expected, 4),
+                jaccard=round(jaccard, 4),
+                score=round(score, 4),
+                computed_at=now
+            )
+            for i, j, shared, expected, jaccard, score in pairs
+        ])
+        await db.commit()
+        return len(pairs)
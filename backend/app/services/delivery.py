@@ -0,0 +1,235 @@
+"""
+Question delivery snapshots.
+
+When an attempt starts, its question order is frozen into a snapshot held in
+process memory. Question content is cached once per question and shared by
+every attempt, so a snapshot itself is only the attempt's ordered id list.
+Pages are rendered from the snapshot on demand; option order is shuffled with
+a per-attempt seed so it stays stable across pages, restarts and workers.
+Serialized pages are cached with their compressed variants, so a page that is
+identical for many attempts (no option shuffling) is encoded and compressed once.
+
+Cached content and pages are tagged with the exam version, which every edit
+bumps. Each worker re-reads an exam's version at most every
+DELIVERY_VERSION_CHECK_SECONDS, so edits made through another worker are
+served within that window; the editing worker drops its copy at once.
+"""
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.compression import PrecompressedPayload
+from app.core.config import settings
+from app.models import Exam, Question
+from app.schemas import QuestionSecure, OptionSecure, QuestionPage
+
+_SNAPSHOT_CACHE_SIZE = 20000
+_QUESTION_CACHE_SIZE = 50000
+_PAGE_CACHE_SIZE = 5000
+
+
+@dataclass
+class DeliverySnapshot:
+    attempt_id: uuid.UUID
+    student_id: uuid.UUID
+    exam_id: uuid.UUID
+    expires_at: datetime
+    randomize_options: bool
+    page_size: int
+    question_ids: List[uuid.UUID]
+    per_attempt_order: bool = False  # Shuffled or sampled, so pages are rarely shared
+
+    @property
+    def per_attempt_pages(self) -> bool:
+        return self.randomize_options or self.per_attempt_order
+
+
+@dataclass
+class CachedQuestion:
+    id: uuid.UUID
+    content: str
+    points: int
+    options: List[Tuple[uuid.UUID, str]]  # Stored order; is_correct is never cached
+    multi_select: bool = False
+    media_digest: Optional[str] = None
+
+
+_snapshots: "OrderedDict[uuid.UUID, DeliverySnapshot]" = OrderedDict()
+_questions: "OrderedDict[uuid.UUID, Tuple[int, CachedQuestion]]" = OrderedDict()  # -> (exam version, content)
+_pages: "OrderedDict[tuple, PrecompressedPayload]" = OrderedDict()
+_exam_versions: Dict[uuid.UUID, Tuple[int, float]] = {}  # -> (version, monotonic time read)
+
+
+def store_snapshot(snapshot: DeliverySnapshot) -> None:
+    _snapshots[snapshot.attempt_id] = snapshot
+    _snapshots.move_to_end(snapshot.attempt_id)
+    if len(_snapshots) > _SNAPSHOT_CACHE_SIZE:
+        _snapshots.popitem(last=False)
+
+
+def get_snapshot(attempt_id: uuid.UUID) -> Optional[DeliverySnapshot]:
+    snapshot = _snapshots.get(attempt_id)
+    if snapshot is not None:
+        _snapshots.move_to_end(attempt_id)
+    return snapshot
+
+
+def discard_snapshot(attempt_id: uuid.UUID) -> None:
+    _snapshots.pop(attempt_id, None)
+
+
+def invalidate_questions(question_ids: Sequence[uuid.UUID]) -> None:
+    """
+    Drop this worker's cached content after a question or its options change;
+    other workers notice the bumped exam version on their next check.
+    """
+    for question_id in question_ids:
+        _questions.pop(question_id, None)
+    _exam_versions.clear()
+
+
+def _remember_version(exam_id: uuid.UUID, version: int) -> None:
+    _exam_versions[exam_id] = (version, time.monotonic())
+
+
+async def _exam_version(db: AsyncSession, exam_id: uuid.UUID) -> int:
+    """The exam's version, read again once DELIVERY_VERSION_CHECK_SECONDS have passed."""
+    known = _exam_versions.get(exam_id)
+    if known is not None and time.monotonic() - known[1] < settings.DELIVERY_VERSION_CHECK_SECONDS:
+        return known[0]
+    version = await db.scalar(select(Exam.version).where(Exam.id == exam_id)) or 0
+    _remember_version(exam_id, version)
+    return version
+
+
+async def _load_questions(
+    db: AsyncSession,
+    question_ids: Sequence[uuid.UUID],
+    version: int
+) -> Dict[uuid.UUID, CachedQuestion]:
+    found = {}
+    missing = []
+    for question_id in question_ids:
+        cached = _questions.get(question_id)
+        if cached is None or cached[0] != version:
+            missing.append(question_id)
+        else:
+            found[question_id] = cached[1]
+
+    if missing:
+        result = await db.execute(
+            select(Question)
+            .options(selectinload(Question.options))
+            .where(Question.id.in_(missing))
+        )
+        for q in result.scalars().all():
+            cached = CachedQuestion(
+                id=q.id,
+                content=q.content,
+                points=q.points,
+                options=[(o.id, o.content) for o in q.options],
+                multi_select=q.multi_select,
+                media_digest=q.media_digest
+            )
+            _questions[q.id] = (version, cached)
+            _questions.move_to_end(q.id)
+            found[q.id] = cached
+        while len(_questions) > _QUESTION_CACHE_SIZE:
+            _questions.popitem(last=False)
+
+    return found
+
+
+def secure_question(q: CachedQuestion, position: int, attempt_id: uuid.UUID, randomize_options: bool) -> QuestionSecure:
+    """One question as a student sees it; options shuffled with the attempt's seed if enabled."""
+    options = list(q.options)
+    if randomize_options:
+        random.Random(attempt_id.int ^ q.id.int).shuffle(options)
+
+    # CRITICAL: Secure schema WITHOUT is_correct
+    return QuestionSecure(
+        id=q.id,
+        content=q.content,
+        order=position,
+        points=q.points,
+        multi_select=q.multi_select,
+        media_digest=q.media_digest,
+        options=[
+            OptionSecure(id=option_id, content=option_content, order=i)
+            for i, (option_id, option_content) in enumerate(options)
+        ]
+    )
+
+
+async def render_page(
+    db: AsyncSession,
+    snapshot: DeliverySnapshot,
+    offset: int,
+    limit: int
+) -> Tuple[List[QuestionSecure], Optional[str]]:
+    """
+    Render questions [offset, offset + limit) of a snapshot.
+
+    Returns the secure questions and the cursor of the next page (None at the end).
+    """
+    page_ids = snapshot.question_ids[offset:offset + limit]
+    content = await _load_questions(db, page_ids, await _exam_version(db, snapshot.exam_id))
+
+    secure_questions = []
+    for position, question_id in enumerate(page_ids, start=offset):
+        q = content.get(question_id)
+        if q is not None:
+            secure_questions.append(secure_question(q, position, snapshot.attempt_id, snapshot.randomize_options))
+
+    end = offset + limit
+    next_cursor = str(end) if end < len(snapshot.question_ids) else None
+    return secure_questions, next_cursor
+
+
+async def page_payload(db: AsyncSession, snapshot: DeliverySnapshot, offset: int) -> PrecompressedPayload:
+    """Serialized page [offset, offset + page_size), shared by attempts that render it identically."""
+    page_ids = tuple(snapshot.question_ids[offset:offset + snapshot.page_size])
+    key = (
+        snapshot.exam_id,
+        await _exam_version(db, snapshot.exam_id),
+        offset,
+        snapshot.page_size,
+        len(snapshot.question_ids),
+        page_ids,
+        snapshot.attempt_id if snapshot.randomize_options else None
+    )
+    payload = _pages.get(key)
+    if payload is not None:
+        _pages.move_to_end(key)
+        return payload
+
+    questions, next_cursor = await render_page(db, snapshot, offset, snapshot.page_size)
+    body = QuestionPage(questions=questions, next_cursor=next_cursor).model_dump_json()
+    payload = PrecompressedPayload(body.encode("utf-8"), shared=not snapshot.per_attempt_pages)
+
+    _pages[key] = payload
+    if len(_pages) > _PAGE_CACHE_SIZE:
+        _pages.popitem(last=False)
+    return payload
+
+
+async def preload_questions(
+    db: AsyncSession,
+    exam: Exam,
+    question_ids: Sequence[uuid.UUID],
+    chunk_size: int = 1000
+) -> int:
+    """Fill the shared content cache with an exam's questions ahead of traffic (used by worker warm-up)."""
+    _remember_version(exam.id, exam.version)
+    loaded = 0
+    for start in range(0, len(question_ids), chunk_size):
+        loaded += len(await _load_questions(db, question_ids[start:start + chunk_size], exam.version))
+    return loaded
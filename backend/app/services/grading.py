@@ -0,0 +1,136 @@
+"""
+Server-side grading of a submission.
+
+Pure function over the attempt's questions (with options) and the submitted
+responses; submit_attempt persists the outcome.
+
+Multi-select questions are graded on bitmasks over option positions (the
+question's options in order): Question.key_mask holds the correct options,
+a response's selection is turned into a mask the same way, and grading is an
+XOR for all-or-nothing or two popcounts for partial credit.
+"""
+import uuid
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.models import Question
+from app.schemas import ResponseSubmit
+
+MAX_MULTI_OPTIONS = 63  # Keys and selections fit a BIGINT
+
+
+@dataclass
+class GradedResponse:
+    question: Question
+    selected_option_id: Optional[uuid.UUID]
+    correct_option_id: Optional[uuid.UUID]
+    is_correct: bool
+    points_earned: int
+    selected_mask: Optional[int] = None  # Multi-select questions only
+    correct_mask: Optional[int] = None
+
+
+@dataclass
+class GradedSubmission:
+    responses: List[GradedResponse]
+    score: int
+    max_score: int
+
+
+def key_mask(correct_flags: Iterable[bool]) -> int:
+    """Bitmask of the correct options, given is_correct in option order."""
+    mask = 0
+    for i, correct in enumerate(correct_flags):
+        if correct:
+            mask |= 1 << i
+    return mask
+
+
+def selection_mask(question: Question, option_ids: Iterable[uuid.UUID]) -> int:
+    """Bitmask of the chosen options; ids of other questions' options are ignored."""
+    chosen = set(option_ids)
+    mask = 0
+    for i, option in enumerate(question.options):
+        if option.id in chosen:
+            mask |= 1 << i
+    return mask
+
+
+def mask_option_ids(question: Question, mask: Optional[int]) -> List[uuid.UUID]:
+    return [option.id for i, option in enumerate(question.options) if mask and mask >> i & 1]
+
+
+def score_mask(question: Question, selected: int) -> Tuple[bool, int]:
+    """
+    (is_correct, points) of a multi-select selection. Exactly the key earns
+    full points; with partial credit, each correct choice earns a share of
+    the points and each wrong choice cancels one, never below zero.
+    """
+    key = question.key_mask or 0
+    if key and selected == key:
+        return True, question.points
+    if not question.partial_credit or not key:
+        return False, 0
+    net = (selected & key).bit_count() - (selected & ~key).bit_count()
+    return False, question.points * max(0, net) // key.bit_count()
+
+
+def grade_submission(questions: Sequence[Question], submitted: Iterable[ResponseSubmit]) -> GradedSubmission:
+    """Grade responses against the attempt's questions; responses to other questions are ignored."""
+    question_map = {q.id: q for q in questions}
+    option_map = {}
+    for q in questions:
+        for o in q.options:
+            option_map[o.id] = o
+
+    graded = []
+    total_score = 0
+    for resp in submitted:
+        question = question_map.get(resp.question_id)
+        if not question:
+            continue
+
+        if question.multi_select:
+            chosen = list(resp.selected_option_ids or [])
+            if resp.selected_option_id is not None:
+                chosen.append(resp.selected_option_id)
+            selected = selection_mask(question, chosen)
+            is_correct, points_earned = score_mask(question, selected)
+            total_score += points_earned
+            graded.append(GradedResponse(
+                question=question,
+                selected_option_id=None,
+                correct_option_id=None,
+                is_correct=is_correct,
+                points_earned=points_earned,
+                selected_mask=selected,
+                correct_mask=question.key_mask or 0
+            ))
+            continue
+
+        selected_option = option_map.get(resp.selected_option_id)
+        correct_option = next((o for o in question.options if o.is_correct), None)
+
+        # SERVER-SIDE grading - this is where we check the answer!
+        # (an option from another question never counts, matching regrade)
+        is_correct = bool(
+            selected_option
+            and selected_option.question_id == question.id
+            and selected_option.is_correct
+        )
+        points_earned = question.points if is_correct else 0
+        total_score += points_earned
+
+        graded.append(GradedResponse(
+            question=question,
+            selected_option_id=resp.selected_option_id,
+            correct_option_id=correct_option.id if correct_option else None,
+            is_correct=is_correct,
+            points_earned=points_earned
+        ))
+
+    return GradedSubmission(
+        responses=graded,
+        score=total_score,
+        max_score=sum(q.points for q in questions)
+    )
@@ -0,0 +1,92 @@
+"""
+Idempotency-Key support.
+
+The first response to a keyed request is stored (zlib-compressed) under
+(user, key), normally in the same transaction as the work it describes.
+Retries with the same key are answered from that row byte-for-byte with a
+primary-key lookup, without repeating the work. Rows past KEY_TTL are
+deleted by a periodic job (services.tasks).
+"""
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_maker
+from app.models import IdempotencyRecord
+
+KEY_TTL = timedelta(hours=24)
+MAX_KEY_LENGTH = 255
+PURGE_BATCH_SIZE = 5000  # Rows deleted per transaction, so locks stay short
+
+
+def validate_key(key: Optional[str]) -> Optional[str]:
+    if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+    return key
+
+
+def _replay(record: IdempotencyRecord) -> Response:
+    return Response(
+        content=zlib.decompress(record.body),
+        status_code=record.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+async def replay(db: AsyncSession, user_id: uuid.UUID, key: Optional[str], scope: str) -> Optional[Response]:
+    """Return the stored response for this key, or None if the request is new."""
+    if key is None:
+        return None
+
+    record = await db.get(IdempotencyRecord, (user_id, key))
+    if record is None:
+        return None
+    if record.created_at < datetime.utcnow() - KEY_TTL:
+        # Expired: the key may be reused; the new record replaces this row
+        await db.delete(record)
+        return None
+    if record.scope != scope:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was used for a different request")
+    return _replay(record)
+
+
+def remember(db: AsyncSession, user_id: uuid.UUID, key: Optional[str], scope: str, body: bytes, status_code: int = 200) -> None:
+    """Stage the response for this key; it commits with the caller's transaction."""
+    if key is None:
+        return
+    db.add(IdempotencyRecord(
+        user_id=user_id,
+        key=key,
+        scope=scope,
+        status_code=status_code,
+        body=zlib.compress(body),
+        created_at=datetime.utcnow()
+    ))
+
+
+async def purge_expired() -> int:
+    """Delete records older than KEY_TTL, a batch per transaction; returns how many."""
+    cutoff = datetime.utcnow() - KEY_TTL
+    purged = 0
+    async with async_session_maker() as db:
+        while True:
+            batch = (
+                select(IdempotencyRecord.user_id, IdempotencyRecord.key)
+                .where(IdempotencyRecord.created_at < cutoff)
+                .limit(PURGE_BATCH_SIZE)
+            )
+            result = await db.execute(
+                delete(IdempotencyRecord)
+                .where(tuple_(IdempotencyRecord.user_id, IdempotencyRecord.key).in_(batch))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            purged += result.rowcount
+            if result.rowcount < PURGE_BATCH_SIZE:
+                return purged
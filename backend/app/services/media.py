@@ -0,0 +1,199 @@
+"""
+Content-addressed media.
+
+An upload is streamed to a temporary file while it is hashed, then renamed
+to MEDIA_DIR/<first two hex digits>/<sha256>; uploading the same bytes
+again reuses the file and its Media row. Questions reference media by
+digest, so exam payloads carry 64 characters instead of inline base64.
+
+A digest names one immutable file forever, so responses are cacheable by
+browsers and proxies for a year without revalidation. The content type is
+sniffed from the file's first bytes, never taken from the client.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.models import Media
+
+CHUNK_SIZE = 64 * 1024
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+# (magic bytes at offset, content type)
+_SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+)
+
+_TYPE_CACHE_SIZE = 4096
+_types: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+
+
+class MediaRejected(ValueError):
+    """The upload is not an accepted media type."""
+
+
+class MediaTooLarge(ValueError):
+    """The upload exceeds MEDIA_MAX_BYTES."""
+
+
+def media_path(digest: str) -> Path:
+    return Path(settings.MEDIA_DIR) / digest[:2] / digest
+
+
+def sniff(head: bytes) -> Optional[str]:
+    for offset, magic, content_type in _SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return content_type
+    return None
+
+
+def _place(staged: str, target: Path) -> None:
+    """Move a staged upload to its content address, unless that content is already stored."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        os.unlink(staged)
+    else:
+        os.replace(staged, target)
+
+
+async def store_upload(db: AsyncSession, upload: UploadFile, uploaded_by=None) -> Media:
+    """
+    Store an upload (in the caller's transaction) and return its Media row.
+    Raises MediaRejected or MediaTooLarge.
+    """
+    staging = Path(settings.MEDIA_DIR) / "tmp"
+    await asyncio.to_thread(staging.mkdir, parents=True, exist_ok=True)
+    fd, staged = await asyncio.to_thread(tempfile.mkstemp, dir=staging)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.MEDIA_MAX_BYTES:
+                    raise MediaTooLarge(f"Files are limited to {settings.MEDIA_MAX_BYTES} bytes")
+                if len(head) < 16:
+                    head += chunk[:16]
+                sha256.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+
+        content_type = sniff(head)
+        if content_type is None or content_type not in settings.MEDIA_TYPES:
+            raise MediaRejected(f"Accepted types: {', '.join(settings.MEDIA_TYPES)}")
+
+        digest = sha256.hexdigest()
+        await asyncio.to_thread(_place, staged, media_path(digest))
+    finally:
+        if os.path.exists(staged):
+            await asyncio.to_thread(os.unlink, staged)
+
+    await db.execute(
+        insert(Media)
+        .values(digest=digest, content_type=content_type, size=size, uploaded_by=uploaded_by)
+        .on_conflict_do_nothing(index_elements=[Media.digest])
+    )
+    return await db.scalar(select(Media).where(Media.digest == digest))
+
+
+async def lookup(db: AsyncSession, digest: str) -> Optional[Tuple[str, int]]:
+    """(content_type, size) of stored media; cached per worker, since media never changes."""
+    found = _types.get(digest)
+    if found is not None:
+        return found
+    row = (await db.execute(select(Media.content_type, Media.size).where(Media.digest == digest))).one_or_none()
+    if row is None:
+        return None
+    _types[digest] = found = (row.content_type, row.size)
+    while len(_types) > _TYPE_CACHE_SIZE:
+        _types.popitem(last=False)
+    return found
+
+
+def parse_range(header: Optional[str], size: int):
+    """
+    The (start, end) inclusive byte range asked for by a single-range Range
+    header; None to send the whole file (no header, several ranges, or a unit
+    other than bytes). Raises ValueError if the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    if start < 0 or start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+class MediaFileResponse(FileResponse):
+    """
+    FileResponse for a byte range of a file. Uses the ASGI zero-copy send
+    extension when the server offers it, otherwise streams from a thread.
+    """
+
+    def __init__(self, path, start: int = 0, length: Optional[int] = None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.start = start
+        self.length = length
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.length is None:
+            self.length = (await anyio.to_thread.run_sync(os.stat, self.path)).st_size - self.start
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.length
+            while True:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                remaining -= len(chunk)
+                more_body = bool(chunk) and remaining > 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                if not more_body:
+                    break
@@ -0,0 +1,118 @@
+"""
+Live exam monitoring.
+
+start_exam and submit_attempt bump in-memory per-exam counters after they
+commit. Reads are served from those counters; while someone is watching an
+exam, the counters are reconciled with the database at most once every
+MONITOR_RECONCILE_SECONDS (picking up other workers' traffic), so watching
+costs nothing proportional to the number of attempts.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Attempt
+
+RATE_WINDOW_MINUTES = 10
+_KEEP_MINUTES = 60
+
+
+@dataclass
+class _ExamCounters:
+    started: int = 0
+    submitted: int = 0
+    force_submitted: int = 0
+    per_minute: Dict[datetime, int] = field(default_factory=dict)  # minute -> submissions
+    reconciled_at: Optional[datetime] = None
+    version: int = 0
+
+
+_counters: Dict[uuid.UUID, _ExamCounters] = {}
+
+
+def _minute(moment: datetime) -> datetime:
+    return moment.replace(second=0, microsecond=0)
+
+
+def _get(exam_id: uuid.UUID) -> _ExamCounters:
+    counters = _counters.get(exam_id)
+    if counters is None:
+        counters = _counters[exam_id] = _ExamCounters()
+    return counters
+
+
+def record_start(exam_id: uuid.UUID) -> None:
+    counters = _get(exam_id)
+    counters.started += 1
+    counters.version += 1
+
+
+def record_submit(exam_id: uuid.UUID, forced: bool = False, at: Optional[datetime] = None) -> None:
+    counters = _get(exam_id)
+    counters.submitted += 1
+    if forced:
+        counters.force_submitted += 1
+    minute = _minute(at or datetime.utcnow())
+    counters.per_minute[minute] = counters.per_minute.get(minute, 0) + 1
+    counters.version += 1
+
+
+async def reconcile(db: AsyncSession, exam_id: uuid.UUID) -> None:
+    """Replace the counters with database truth (two aggregates over the exam_id index)."""
+    now = datetime.utcnow()
+    totals = (await db.execute(
+        select(
+            func.count(),
+            func.count().filter(Attempt.is_submitted == True),
+            func.count().filter(Attempt.force_submitted == True)
+        ).where(Attempt.exam_id == exam_id)
+    )).one()
+
+    minute = func.date_trunc("minute", Attempt.submitted_at)
+    recent = await db.execute(
+        select(minute, func.count())
+        .where(Attempt.exam_id == exam_id, Attempt.submitted_at >= now - timedelta(minutes=_KEEP_MINUTES))
+        .group_by(minute)
+    )
+
+    counters = _get(exam_id)
+    counters.started, counters.submitted, counters.force_submitted = totals
+    counters.per_minute = {m: c for m, c in recent.all()}
+    counters.reconciled_at = now
+    counters.version += 1
+
+
+async def snapshot(db: AsyncSession, exam_id: uuid.UUID) -> dict:
+    now = datetime.utcnow()
+    counters = _get(exam_id)
+    if (
+        counters.reconciled_at is None
+        or now - counters.reconciled_at > timedelta(seconds=settings.MONITOR_RECONCILE_SECONDS)
+    ):
+        await reconcile(db, exam_id)
+
+    current = _minute(now)
+    for minute in [m for m in counters.per_minute if m < current - timedelta(minutes=_KEEP_MINUTES)]:
+        del counters.per_minute[minute]
+    per_minute: List[int] = [
+        counters.per_minute.get(current - timedelta(minutes=i), 0)
+        for i in range(RATE_WINDOW_MINUTES)
+    ]
+
+    return {
+        "exam_id": exam_id,
+        "started": counters.started,
+        "in_progress": max(0, counters.started - counters.submitted),
+        "submitted": counters.submitted,
+        "force_submitted": counters.force_submitted,
+        "submissions_last_minute": per_minute[0],
+        "submissions_per_minute": per_minute,
+        "reconciled_at": counters.reconciled_at,
+        "server_time": now,
+        "version": counters.version
+    }
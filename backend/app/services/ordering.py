@@ -0,0 +1,132 @@
+"""
+Sparse ordering keys for questions and options.
+
+Siblings are spaced GAP apart, so inserting or moving one item takes the
+midpoint of its new neighbours' keys and writes a single row. When a gap
+runs out the siblings are renumbered in one UPDATE; edits that leave a gap
+below MIN_GAP schedule that renumbering in the background so the next edit
+at the same spot stays O(1). Only the relative order of keys is meaningful.
+"""
+import uuid
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_maker
+from app.models import Exam, Question, Option
+from app.services import delivery
+
+GAP = 1024
+MIN_GAP = 8
+
+# model -> column holding the parent id
+_PARENTS = {Question: Question.exam_id, Option: Option.question_id}
+
+
+def key_between(lower: Optional[int], upper: Optional[int]) -> Optional[int]:
+    """A key strictly between two neighbours (None = open end), or None if none fits."""
+    if lower is None and upper is None:
+        return 0
+    if lower is None:
+        return upper - GAP
+    if upper is None:
+        return lower + GAP
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+
+async def _sibling_key(db: AsyncSession, model, parent_id: uuid.UUID, sibling_id: uuid.UUID) -> int:
+    key = await db.scalar(
+        select(model.order).where(model.id == sibling_id, _PARENTS[model] == parent_id)
+    )
+    if key is None:
+        raise LookupError(f"{model.__name__} {sibling_id} not found")
+    return key
+
+
+async def _neighbours(
+    db: AsyncSession,
+    model,
+    parent_id: uuid.UUID,
+    before_id: Optional[uuid.UUID],
+    after_id: Optional[uuid.UUID],
+    exclude_id: Optional[uuid.UUID]
+) -> Tuple[Optional[int], Optional[int]]:
+    siblings = select(model.order).where(_PARENTS[model] == parent_id)
+    if exclude_id is not None:
+        siblings = siblings.where(model.id != exclude_id)
+
+    if after_id is not None:
+        lower = await _sibling_key(db, model, parent_id, after_id)
+        upper = await db.scalar(siblings.where(model.order > lower).order_by(model.order).limit(1))
+    elif before_id is not None:
+        upper = await _sibling_key(db, model, parent_id, before_id)
+        lower = await db.scalar(siblings.where(model.order < upper).order_by(model.order.desc()).limit(1))
+    else:
+        lower = await db.scalar(siblings.order_by(model.order.desc()).limit(1))
+        upper = None
+    return lower, upper
+
+
+async def position_key(
+    db: AsyncSession,
+    model,
+    parent_id: uuid.UUID,
+    before_id: Optional[uuid.UUID] = None,
+    after_id: Optional[uuid.UUID] = None,
+    exclude_id: Optional[uuid.UUID] = None
+) -> Tuple[int, bool]:
+    """
+    Key for placing a row right after after_id, right before before_id, or
+    last. exclude_id is the row being moved. Returns (key, crowded): crowded
+    means the neighbours are close enough that a rebalance is worthwhile.
+    Raises LookupError if the anchor is not a sibling.
+    """
+    if exclude_id is not None and exclude_id in (before_id, after_id):
+        raise LookupError("Cannot position an item relative to itself")
+
+    lower, upper = await _neighbours(db, model, parent_id, before_id, after_id, exclude_id)
+    key = key_between(lower, upper)
+    if key is None:
+        # Gap exhausted: renumber the siblings now, then place the row
+        await rebalance(db, model, parent_id)
+        lower, upper = await _neighbours(db, model, parent_id, before_id, after_id, exclude_id)
+        key = key_between(lower, upper)
+
+    crowded = lower is not None and upper is not None and upper - lower < 2 * MIN_GAP
+    return key, crowded
+
+
+async def rebalance(db: AsyncSession, model, parent_id: uuid.UUID) -> list:
+    """Respace all siblings GAP apart in their current order; returns the ids that moved."""
+    ranked = (
+        select(model.id, (func.row_number().over(order_by=(model.order, model.id)) * GAP).label("key"))
+        .where(_PARENTS[model] == parent_id)
+        .subquery()
+    )
+    result = await db.execute(
+        update(model)
+        .where(model.id == ranked.c.id, model.order != ranked.c.key)
+        .values(order=ranked.c.key)
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars().all())
+
+
+async def rebalance_in_background(model, parent_id: uuid.UUID, exam_id: uuid.UUID) -> None:
+    """Background task: respace one exam's questions, or one question's options."""
+    async with async_session_maker() as db:
+        moved = await rebalance(db, model, parent_id)
+        if not moved:
+            return
+        await db.execute(
+            update(Exam)
+            .where(Exam.id == exam_id)
+            .values(version=Exam.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    delivery.invalidate_questions(moved if model is Question else [parent_id])
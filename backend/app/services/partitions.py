@@ -0,0 +1,94 @@
+"""
+Partition management for attempts and responses.
+
+Both tables are LIST-partitioned by exam_id with a DEFAULT partition. Large
+exams get dedicated partitions (ideally before they open), so their queries
+prune down to their own rows and indexes; once an exam is closed its
+partitions can be detached and archived or dropped without touching today's
+data. Keep dedicated partitions for the exams that need them: lookups by
+attempt id alone (no exam_id) probe each partition's primary-key index.
+"""
+import uuid
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+PARTITIONED_TABLES = ("attempts", "responses")
+
+
+def partition_name(table: str, exam_id: uuid.UUID) -> str:
+    return f"{table}_e_{exam_id.hex}"
+
+
+async def list_partitions(conn: AsyncConnection) -> List[dict]:
+    result = await conn.execute(text("""
+        SELECT parent.relname AS parent, child.relname AS partition,
+               pg_get_expr(child.relpartbound, child.oid) AS bound,
+               pg_total_relation_size(child.oid) AS bytes
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname IN ('attempts', 'responses')
+        ORDER BY parent.relname, child.relname
+    """))
+    return [dict(row._mapping) for row in result]
+
+
+async def create_exam_partitions(conn: AsyncConnection, exam_id: uuid.UUID) -> int:
+    """
+    Give an exam its own attempts/responses partitions, moving any rows it
+    already has out of the DEFAULT partitions. Returns the attempts moved.
+
+    Runs in the caller's transaction; writes to the default partitions are
+    blocked for the duration of the move.
+    """
+    await conn.execute(text("LOCK TABLE attempts_default, responses_default IN EXCLUSIVE MODE"))
+
+    for table in PARTITIONED_TABLES:
+        name = partition_name(table, exam_id)
+        await conn.execute(text(
+            f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        await conn.execute(
+            text(f"INSERT INTO {name} SELECT * FROM {table}_default WHERE exam_id = :exam_id"),
+            {"exam_id": exam_id}
+        )
+
+    # Responses first, so deleting the attempts has nothing left to cascade to.
+    # Materialized result snapshots of moved attempts cascade away and are rebuilt on demand.
+    await conn.execute(text("DELETE FROM responses_default WHERE exam_id = :exam_id"), {"exam_id": exam_id})
+    moved = await conn.execute(text("DELETE FROM attempts_default WHERE exam_id = :exam_id"), {"exam_id": exam_id})
+
+    for table in PARTITIONED_TABLES:
+        await conn.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {partition_name(table, exam_id)} "
+            f"FOR VALUES IN ('{exam_id}')"
+        ))
+    return moved.rowcount
+
+
+async def detach_exam_partitions(conn: AsyncConnection, exam_id: uuid.UUID) -> None:
+    """
+    Detach an exam's partitions; they stay behind as standalone tables for
+    archiving or dropping. The exam's rows disappear from attempts/responses.
+    """
+    # attempt_results references attempts; snapshots of detached attempts go with them
+    await conn.execute(text("DELETE FROM attempt_results WHERE exam_id = :exam_id"), {"exam_id": exam_id})
+    for table in ("responses", "attempts"):
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition_name(table, exam_id)}"))
+
+
+async def drop_detached_partitions(conn: AsyncConnection, exam_id: uuid.UUID) -> None:
+    for table in ("responses", "attempts"):
+        name = partition_name(table, exam_id)
+        attached = await conn.scalar(
+            text("""
+                SELECT 1 FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE child.relname = :name
+            """),
+            {"name": name}
+        )
+        if attached:
+            raise ValueError(f"{name} is still attached; detach it first")
+        await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
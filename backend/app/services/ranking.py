@@ -0,0 +1,194 @@
+"""
+Percentile ranks from a per-exam score index.
+
+A ScoreIndex is a Fenwick tree of attempt counts by integer score, built
+from one GROUP BY over the exam's submitted attempts (or archived attempt
+rows). Rank, percentile and the score needed to reach the top N are then
+O(log max_score) in memory, however many students ask at once.
+
+Each worker keeps the indexes it has built (LRU-bounded), tagged with the exam version:
+regrading or republishing bumps the version and forces a rebuild. Its own
+submissions are added as they commit; other workers' are picked up by
+rebuilding at most every RANKING_REFRESH_SECONDS. Concurrent requests for
+a stale index wait for one rebuild instead of each running it.
+"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Attempt, ArchivedAttempt
+
+
+class ScoreIndex:
+    """Fenwick tree over scores 0..size-1; tree[i] covers counts of a range ending at score i-1."""
+
+    def __init__(self, counts: Iterable[Tuple[int, int]] = (), size: int = 64):
+        counts = [(max(0, score), count) for score, count in counts]
+        while size <= max((score for score, _ in counts), default=0):
+            size *= 2
+        self.size = size
+        self.total = 0
+        self._tree = [0] * (size + 1)
+        for score, count in counts:
+            self.add(score, count)
+
+    def _grow(self, score: int) -> None:
+        counts = [(s, self.count_at(s)) for s in range(self.size)]
+        size = self.size
+        while size <= score:
+            size *= 2
+        self.__init__([(s, c) for s, c in counts if c], size)
+
+    def add(self, score: int, count: int = 1) -> None:
+        score = max(0, score)
+        if score >= self.size:
+            self._grow(score)
+        self.total += count
+        i = score + 1
+        while i <= self.size:
+            self._tree[i] += count
+            i += i & -i
+
+    def count_below(self, score: int) -> int:
+        """Attempts scoring strictly less than score."""
+        i = min(max(0, score), self.size)
+        count = 0
+        while i > 0:
+            count += self._tree[i]
+            i -= i & -i
+        return count
+
+    def count_at(self, score: int) -> int:
+        return self.count_below(score + 1) - self.count_below(score)
+
+    def rank(self, score: int) -> int:
+        """1 + attempts scoring higher (ties share a rank)."""
+        return self.total - self.count_below(score + 1) + 1
+
+    def percentile(self, score: int) -> float:
+        """Percentile rank: attempts below, plus half of the ties, out of all attempts."""
+        if not self.total:
+            return 0.0
+        return 100.0 * (self.count_below(score) + self.count_at(score) / 2) / self.total
+
+    def nth_highest(self, n: int) -> Optional[int]:
+        """The score of the n-th best attempt (1-based), or None if there are fewer."""
+        if n < 1 or n > self.total:
+            return None
+        # k-th smallest with k = total - n + 1: descend the tree by powers of two
+        k = self.total - n + 1
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self._tree[nxt] < k:
+                position = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return position
+
+
+@dataclass
+class _Entry:
+    index: ScoreIndex
+    exam_version: int
+    built_at: datetime
+
+
+_INDEX_CACHE_SIZE = 256
+
+_indexes: "OrderedDict[uuid.UUID, _Entry]" = OrderedDict()
+_locks: "OrderedDict[uuid.UUID, asyncio.Lock]" = OrderedDict()
+
+
+def _lock(exam_id: uuid.UUID) -> asyncio.Lock:
+    lock = _locks.get(exam_id)
+    if lock is None:
+        lock = _locks[exam_id] = asyncio.Lock()
+        # Only evict idle locks; a held one still guards a rebuild in progress
+        for stale_id in list(_locks)[:max(0, len(_locks) - _INDEX_CACHE_SIZE)]:
+            if not _locks[stale_id].locked():
+                del _locks[stale_id]
+    else:
+        _locks.move_to_end(exam_id)
+    return lock
+
+
+async def _load(db: AsyncSession, exam_id: uuid.UUID, archived: bool) -> ScoreIndex:
+    model = ArchivedAttempt if archived else Attempt
+    rows = await db.execute(
+        select(model.score, func.count())
+        .where(model.exam_id == exam_id, model.is_submitted == True)
+        .group_by(model.score)
+    )
+    # Attempts submitted without grading (timed out before submitting) count as 0
+    return ScoreIndex((score or 0, count) for score, count in rows.all())
+
+
+async def get_index(db: AsyncSession, exam_id: uuid.UUID, exam_version: int, archived: bool = False) -> ScoreIndex:
+    """The exam's score index, rebuilt if the exam changed or it is older than RANKING_REFRESH_SECONDS."""
+    def fresh(entry: Optional[_Entry]) -> bool:
+        return (
+            entry is not None
+            and entry.exam_version == exam_version
+            and datetime.utcnow() - entry.built_at < timedelta(seconds=settings.RANKING_REFRESH_SECONDS)
+        )
+
+    entry = _indexes.get(exam_id)
+    if fresh(entry):
+        _indexes.move_to_end(exam_id)
+        return entry.index
+
+    async with _lock(exam_id):
+        entry = _indexes.get(exam_id)
+        if not fresh(entry):
+            entry = _indexes[exam_id] = _Entry(await _load(db, exam_id, archived), exam_version, datetime.utcnow())
+            if len(_indexes) > _INDEX_CACHE_SIZE:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(exam_id)
+    return entry.index
+
+
+def record_submit(exam_id: uuid.UUID, score: Optional[int]) -> None:
+    """Count a submission committed by this worker in the exam's index, if one is loaded."""
+    entry = _indexes.get(exam_id)
+    if entry is not None:
+        entry.index.add(score or 0)
+
+
+def invalidate(exam_id: uuid.UUID) -> None:
+    _indexes.pop(exam_id, None)
+
+
+async def top_attempts(
+    db: AsyncSession,
+    exam_id: uuid.UUID,
+    index: ScoreIndex,
+    limit: int,
+    archived: bool = False
+) -> List[tuple]:
+    """
+    (attempt_id, student_id, score) of the best attempts, best first. The
+    index gives the cutoff score, so only rows at or above it are read.
+    """
+    cutoff = index.nth_highest(min(limit, index.total))
+    if cutoff is None:
+        return []
+    model = ArchivedAttempt if archived else Attempt
+    attempt_id = model.attempt_id if archived else model.id
+    query = select(attempt_id, model.student_id, func.coalesce(model.score, 0)).where(
+        model.exam_id == exam_id, model.is_submitted == True
+    )
+    if cutoff > 0:
+        query = query.where(model.score >= cutoff)
+    rows = await db.execute(
+        query.order_by(model.score.desc().nulls_last(), model.submitted_at, attempt_id).limit(limit)
+    )
+    return [tuple(row) for row in rows.all()]
@@ -0,0 +1,232 @@
+"""
+Set-based regrading.
+
+After an answer key changes, response correctness and attempt scores are
+recomputed with two UPDATE statements inside the caller's transaction; no
+attempt or response is loaded into Python; multi-select responses compare
+their selection mask with the question's key_mask, and partial credit is
+two popcounts in SQL. Attempts with packed answers (app.services.answers)
+are regraded in keyset batches of narrow rows and written back with one
+executemany per batch.
+"""
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import select, update, func, case, cast, bindparam
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, noload
+
+from app.models import Exam, Question, Option, Attempt, Response
+from app.services.answers import grade, unpack_answers
+from app.services.grading import key_mask
+from app.services.results import load_exam_questions, attempt_questions
+
+BATCH_SIZE = 1000
+
+
+@dataclass
+class RegradeSummary:
+    responses_updated: int
+    attempts_rescored: int
+    scores_increased: int
+    scores_decreased: int
+
+
+async def set_correct_option(db: AsyncSession, question_id: uuid.UUID, option_id: uuid.UUID) -> int:
+    """Make option_id the only correct option of its question. Returns rows changed."""
+    result = await db.execute(
+        update(Option)
+        .where(Option.question_id == question_id, Option.is_correct != (Option.id == option_id))
+        .values(is_correct=(Option.id == option_id))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def set_correct_options(
+    db: AsyncSession,
+    question_id: uuid.UUID,
+    option_ids: Sequence[uuid.UUID]
+) -> int:
+    """Make exactly option_ids correct (multi-select) and refresh the key mask. Returns rows changed."""
+    correct = Option.id.in_(list(option_ids))
+    result = await db.execute(
+        update(Option)
+        .where(Option.question_id == question_id, Option.is_correct != correct)
+        .values(is_correct=correct)
+        .execution_options(synchronize_session=False)
+    )
+    await refresh_key_mask(db, question_id)
+    return result.rowcount
+
+
+async def refresh_key_mask(db: AsyncSession, question_id: uuid.UUID) -> None:
+    """Recompute a multi-select question's key_mask after its options or key changed."""
+    flags = await db.scalars(
+        select(Option.is_correct).where(Option.question_id == question_id).order_by(Option.order, Option.id)
+    )
+    await db.execute(
+        update(Question)
+        .where(Question.id == question_id, Question.multi_select == True)
+        .values(key_mask=key_mask(flags.all()))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _popcount(mask):
+    return func.bit_count(cast(mask, BIT(64)))
+
+
+async def regrade(
+    db: AsyncSession,
+    exam_id: uuid.UUID,
+    question_id: Optional[uuid.UUID] = None
+) -> RegradeSummary:
+    """Recompute Response.is_correct (optionally for one question) and every Attempt.score of an exam."""
+    # 1. Response correctness from the current key; a missing or foreign option is wrong,
+    # a multi-select selection must equal the key mask
+    key = (
+        select(Option.is_correct)
+        .where(Option.id == Response.selected_option_id, Option.question_id == Response.question_id)
+        .scalar_subquery()
+    )
+    mask_key = (
+        select(Question.key_mask == Response.selected_mask)
+        .where(Question.id == Response.question_id)
+        .scalar_subquery()
+    )
+    is_correct = func.coalesce(case((Response.selected_mask != None, mask_key), else_=key), False)
+    responses = (
+        update(Response)
+        .where(
+            Response.exam_id == exam_id,
+            Response.is_correct.is_distinct_from(is_correct)
+        )
+        .values(is_correct=is_correct)
+        .execution_options(synchronize_session=False)
+    )
+    if question_id is not None:
+        responses = responses.where(Response.question_id == question_id)
+    responses_updated = (await db.execute(responses)).rowcount
+
+    # 2. Attempt scores re-aggregated from responses, reporting old vs new
+    selected, key_bits = Response.selected_mask, Question.key_mask
+    partial = (
+        Question.points
+        * func.greatest(
+            0,
+            _popcount(selected.bitwise_and(key_bits)) - _popcount(selected.bitwise_and(key_bits.bitwise_not()))
+        )
+        // func.nullif(_popcount(key_bits), 0)
+    )
+    points = case(
+        (Response.is_correct == True, Question.points),
+        (Question.partial_credit & (selected != None), func.coalesce(partial, 0)),
+        else_=0
+    )
+    scores = (
+        select(
+            Response.attempt_id.label("attempt_id"),
+            func.coalesce(func.sum(points), 0).label("score")
+        )
+        .join(Question, Question.id == Response.question_id)
+        .join(Attempt, (Attempt.id == Response.attempt_id) & (Attempt.exam_id == Response.exam_id))
+        .where(Response.exam_id == exam_id, Attempt.is_submitted == True)
+        .group_by(Response.attempt_id)
+        .cte("scores")
+    )
+    previous = aliased(Attempt)
+    changed = (
+        update(Attempt)
+        .where(
+            Attempt.exam_id == exam_id,
+            Attempt.id == scores.c.attempt_id,
+            previous.exam_id == exam_id,
+            previous.id == Attempt.id,
+            Attempt.score.is_distinct_from(scores.c.score)
+        )
+        .values(score=scores.c.score)
+        .returning(
+            func.coalesce(previous.score, 0).label("old_score"),
+            scores.c.score.label("new_score")
+        )
+        .cte("changed")
+    )
+    summary = (await db.execute(
+        select(
+            func.count(),
+            func.count().filter(changed.c.new_score > changed.c.old_score),
+            func.count().filter(changed.c.new_score < changed.c.old_score)
+        ).select_from(changed)
+    )).one()
+
+    packed = await _regrade_packed(db, exam_id)
+    
+    # Cached reads of this exam (ETags) must see the new scores
+    await db.execute(
+        update(Exam)
+        .where(Exam.id == exam_id)
+        .values(version=Exam.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+    return RegradeSummary(
+        responses_updated=responses_updated + packed.responses_updated,
+        attempts_rescored=summary[0] + packed.attempts_rescored,
+        scores_increased=summary[1] + packed.scores_increased,
+        scores_decreased=summary[2] + packed.scores_decreased
+    )
+
+
+async def _regrade_packed(db: AsyncSession, exam_id: uuid.UUID) -> RegradeSummary:
+    """Recompute correct_mask and score of the exam's submitted attempts with packed answers."""
+    summary = RegradeSummary(0, 0, 0, 0)
+    exam = await db.scalar(
+        select(Exam)
+        .options(noload(Exam.questions), noload(Exam.attempts))
+        .where(Exam.id == exam_id)
+    )
+    questions = None
+    
+    store = (
+        update(Attempt.__table__)
+        .where(Attempt.__table__.c.id == bindparam("b_id"), Attempt.__table__.c.exam_id == exam_id)
+        .values(correct_mask=bindparam("b_mask"), score=bindparam("b_score"))
+    )
+    last_id = None
+    while True:
+        query = (
+            select(Attempt.id, Attempt.question_indices, Attempt.answers, Attempt.correct_mask, Attempt.score)
+            .where(Attempt.exam_id == exam_id, Attempt.is_submitted == True, Attempt.answers != None)
+            .order_by(Attempt.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(Attempt.id > last_id)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        if questions is None:
+            questions = await load_exam_questions(db, exam_id)
+            by_id = {q.id: q for q in questions}
+        
+        changed = []
+        for row in rows:
+            drawn = attempt_questions(row, exam, by_id, questions)
+            mask, score = grade(drawn, unpack_answers(row.answers, drawn))
+            old_mask = int.from_bytes(row.correct_mask or b"", "little")
+            flipped = (old_mask ^ int.from_bytes(mask, "little")).bit_count()
+            old_score = row.score or 0
+            if flipped or score != old_score:
+                summary.responses_updated += flipped
+                summary.attempts_rescored += 1
+                summary.scores_increased += score > old_score
+                summary.scores_decreased += score < old_score
+                changed.append({"b_id": row.id, "b_mask": mask, "b_score": score})
+        if changed:
+            await db.execute(store, changed)
+        last_id = rows[-1].id
+    
+    return summary
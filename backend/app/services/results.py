@@ -0,0 +1,189 @@
+"""
+Materialized attempt results.
+
+The published AttemptResult of an attempt is serialized once and stored in
+``attempt_results``, tagged with the exam version it was built from. Viewing
+a result is then a single primary-key read; a snapshot whose version no longer
+matches the exam is ignored and rebuilt.
+"""
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, noload
+
+from app.core.database import async_session_maker
+from app.core.jobs import Progress
+from app.models import Exam, Question, Attempt, Response, AttemptResultSnapshot
+from app.schemas import AttemptResult, ResponseResult
+from app.services.answers import attempt_responses
+from app.services.grading import mask_option_ids, score_mask
+from app.services.sampling import resolve_ids, unpack_indices
+
+BATCH_SIZE = 500
+
+
+def build_attempt_result(
+    attempt: Attempt,
+    exam: Exam,
+    questions: Sequence[Question],
+    responses: Iterable[Response]
+) -> AttemptResult:
+    """Full published result: one entry per question drawn for the attempt."""
+    response_map = {r.question_id: r for r in responses}
+    response_results = []
+
+    for question in questions:
+        resp = response_map.get(question.id)
+
+        if question.multi_select:
+            selected = resp.selected_mask if resp else None
+            is_correct, points = score_mask(question, selected) if selected is not None else (False, 0)
+            response_results.append(ResponseResult(
+                question_id=question.id,
+                question_content=question.content,
+                selected_option_id=None,
+                correct_option_id=None,
+                selected_option_ids=mask_option_ids(question, selected),
+                correct_option_ids=mask_option_ids(question, question.key_mask),
+                is_correct=is_correct,
+                points_earned=points,
+                max_points=question.points
+            ))
+            continue
+
+        correct_option = next((o for o in question.options if o.is_correct), None)
+        response_results.append(ResponseResult(
+            question_id=question.id,
+            question_content=question.content,
+            selected_option_id=resp.selected_option_id if resp else None,
+            correct_option_id=correct_option.id if correct_option else None,
+            is_correct=bool(resp and resp.is_correct),
+            points_earned=question.points if (resp and resp.is_correct) else 0,
+            max_points=question.points
+        ))
+
+    return AttemptResult(
+        attempt_id=attempt.id,
+        exam_title=exam.title,
+        score=attempt.score or 0,
+        max_score=attempt.max_score or 0,
+        percentage=round((attempt.score / attempt.max_score * 100) if attempt.max_score else 0, 2),
+        started_at=attempt.started_at,
+        submitted_at=attempt.submitted_at,
+        responses=response_results
+    )
+
+
+def _snapshot_row(attempt: Attempt, exam: Exam, result: AttemptResult) -> dict:
+    return {
+        "attempt_id": attempt.id,
+        "exam_id": exam.id,
+        "exam_version": exam.version,
+        "document": result.model_dump_json().encode("utf-8"),
+        "created_at": datetime.utcnow()
+    }
+
+
+async def _upsert(db: AsyncSession, rows: List[dict]) -> None:
+    stmt = insert(AttemptResultSnapshot).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AttemptResultSnapshot.attempt_id],
+        set_={
+            "exam_version": stmt.excluded.exam_version,
+            "document": stmt.excluded.document,
+            "created_at": stmt.excluded.created_at
+        }
+    )
+    await db.execute(stmt)
+
+
+async def store_result(db: AsyncSession, attempt: Attempt, exam: Exam, result: AttemptResult) -> bytes:
+    """Materialize one attempt's result in the caller's transaction; returns the document."""
+    row = _snapshot_row(attempt, exam, result)
+    await _upsert(db, [row])
+    return row["document"]
+
+
+async def load_exam_questions(db: AsyncSession, exam_id: uuid.UUID) -> List[Question]:
+    result = await db.scalars(
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.exam_id == exam_id)
+        .order_by(Question.order)
+    )
+    return list(result.all())
+
+
+def attempt_questions(
+    attempt: Attempt,
+    exam: Exam,
+    by_id: Dict[uuid.UUID, Question],
+    in_order: Sequence[Question]
+) -> List[Question]:
+    """An attempt's questions in delivery order, picked from the preloaded exam questions."""
+    if attempt.question_indices is None:
+        return list(in_order)
+    ids = resolve_ids(exam.question_pool, unpack_indices(attempt.question_indices))
+    return [by_id[qid] for qid in ids if qid in by_id]
+
+
+async def materialize_exam_results(exam_id: uuid.UUID, progress: Optional[Progress] = None) -> int:
+    """
+    Batch job run when results are published (or regraded): builds every
+    submitted attempt's document in keyset-paged batches. Returns the count.
+    """
+    async with async_session_maker() as db:
+        exam = await db.scalar(
+            select(Exam)
+            .options(noload(Exam.questions), noload(Exam.attempts))
+            .where(Exam.id == exam_id)
+        )
+        if not exam or not exam.results_published:
+            return 0
+
+        # The whole pool once; every attempt's document draws from it
+        questions = await load_exam_questions(db, exam_id)
+        by_id = {q.id: q for q in questions}
+        total = await db.scalar(
+            select(func.count()).where(Attempt.exam_id == exam_id, Attempt.is_submitted == True)
+        ) if progress else None
+
+        count = 0
+        last_id = None
+        while True:
+            query = (
+                select(Attempt)
+                .options(selectinload(Attempt.responses.and_(Response.exam_id == exam_id)))
+                .where(Attempt.exam_id == exam_id, Attempt.is_submitted == True)
+                .order_by(Attempt.id)
+                .limit(BATCH_SIZE)
+            )
+            if last_id is not None:
+                query = query.where(Attempt.id > last_id)
+            attempts = (await db.scalars(query)).all()
+            if not attempts:
+                break
+
+            rows = []
+            for attempt in attempts:
+                drawn = attempt_questions(attempt, exam, by_id, questions)
+                result = build_attempt_result(attempt, exam, drawn, attempt_responses(attempt, drawn))
+                rows.append(_snapshot_row(attempt, exam, result))
+            await _upsert(db, rows)
+            await db.commit()
+
+            last_id = attempts[-1].id
+            count += len(attempts)
+            if progress:
+                await progress(count, total)
+            # Keep memory flat: drop this batch's attempts and responses
+            for attempt in attempts:
+                for resp in attempt.responses:
+                    db.expunge(resp)
+                db.expunge(attempt)
+
+        return count
@@ -0,0 +1,144 @@
+"""
+Bulk roster provisioning.
+
+A CSV roster (email, full_name and optional password and role columns) is
+validated row by row, deduplicated within the file, hashed in the process
+pool, checked against existing accounts (case-insensitively) with a single
+query, and inserted with multi-row INSERTs. Every input row gets an entry in
+the report.
+
+Hashing happens before the first query, so the caller's transaction is not
+left idle in a connection while bcrypt runs.
+"""
+import asyncio
+import csv
+import io
+import secrets
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import bcrypt
+from pydantic import ValidationError
+from sqlalchemy import select, func, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.processes import run_in_process, worker_count
+from app.models import User, UserRole
+from app.schemas import UserRegister
+
+INSERT_BATCH_SIZE = 1000  # 5 columns per row stays well under asyncpg's bind parameter limit
+REQUIRED_COLUMNS = ("email", "full_name")
+
+
+@dataclass
+class RosterRow:
+    line: int
+    email: str
+    status: str  # created | exists | duplicate | invalid
+    detail: Optional[str] = None
+    user_id: Optional[str] = None
+    temporary_password: Optional[str] = None  # Only when the roster did not set one
+
+
+def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    """Runs in a worker process; bcrypt is deliberately slow."""
+    return [bcrypt.hashpw(p.encode("utf-8"), bcrypt.gensalt()).decode("utf-8") for p in passwords]
+
+
+async def _hash_all(passwords: List[str]) -> List[str]:
+    if not passwords:
+        return []
+    workers = worker_count()
+    size = -(-len(passwords) // workers)
+    chunks = await asyncio.gather(*(
+        run_in_process(hash_passwords, passwords[start:start + size])
+        for start in range(0, len(passwords), size)
+    ))
+    return [hashed for chunk in chunks for hashed in chunk]
+
+
+async def provision(
+    db: AsyncSession,
+    csv_text: str,
+    allowed_roles: Sequence[UserRole] = (UserRole.STUDENT,)
+) -> List[RosterRow]:
+    """Create the roster's new accounts in the caller's transaction; returns one row per CSV line."""
+    reader = csv.DictReader(io.StringIO(csv_text))
+    columns = [c.strip().lower() for c in reader.fieldnames or []]
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    reader.fieldnames = columns
+
+    report: List[RosterRow] = []
+    pending: Dict[str, tuple] = {}  # email -> (report row, validated user)
+    for record in reader:
+        line = reader.line_num
+        values = {k: (v or "").strip() for k, v in record.items() if k}
+        email = values.get("email", "").lower()
+        generated = None
+        if not values.get("password"):
+            generated = values["password"] = secrets.token_urlsafe(9)
+
+        try:
+            user = UserRegister(
+                email=email,
+                password=values["password"],
+                full_name=values.get("full_name", ""),
+                role=values.get("role") or UserRole.STUDENT
+            )
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            report.append(RosterRow(line, email, "invalid", f"{error['loc'][0]}: {error['msg']}"))
+            continue
+        if not user.full_name:
+            report.append(RosterRow(line, email, "invalid", "full_name: required"))
+            continue
+        if user.role not in allowed_roles:
+            report.append(RosterRow(line, email, "invalid", f"role: {user.role.value} not allowed"))
+            continue
+        if email in pending:
+            report.append(RosterRow(line, email, "duplicate", f"same email as line {pending[email][0].line}"))
+            continue
+
+        row = RosterRow(line, email, "created", temporary_password=generated)
+        report.append(row)
+        pending[email] = (row, user)
+
+    # Before touching the database: no transaction is open while this runs
+    hashes = dict(zip(pending, await _hash_all([user.password for _, user in pending.values()])))
+
+    # Existing accounts, in one round trip
+    if pending:
+        existing = await db.scalars(
+            select(func.lower(User.email)).where(
+                func.lower(User.email) == any_(bindparam("emails", list(pending), type_=ARRAY(String)))
+            )
+        )
+        for email in existing.all():
+            row, _ = pending.pop(email)
+            row.status, row.detail, row.temporary_password = "exists", "email already registered", None
+
+    values = [
+        {
+            "email": email, "password_hash": hashes[email], "full_name": user.full_name,
+            "role": user.role, "is_active": True
+        }
+        for email, (_, user) in pending.items()
+    ]
+    for start in range(0, len(values), INSERT_BATCH_SIZE):
+        created = await db.execute(
+            insert(User)
+            .values(values[start:start + INSERT_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.email, User.id)
+        )
+        for email, user_id in created.all():
+            pending.pop(email)[0].user_id = str(user_id)
+
+    # Registered concurrently between the lookup and the insert
+    for row, _ in pending.values():
+        row.status, row.detail, row.temporary_password = "exists", "email already registered", None
+
+    return report
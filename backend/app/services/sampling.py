@@ -0,0 +1,221 @@
+"""
+Question pool sampling.
+
+Every exam keeps its question ids in an append-only packed array
+(``Exam.question_pool``, 16 bytes per id). An attempt records the questions it
+drew as a packed array of indices into that pool, in delivery order, instead of
+one row per question. Drawing K questions only touches K slots of the pool.
+
+The pool's order is only the order questions were added. Exams that do not
+randomize deliver a draw in Question.order, so inserts and moves show up
+for attempts started afterwards.
+"""
+import random
+import struct
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import Exam, Question, Attempt
+
+UUID_SIZE = 16
+INDEX_SIZE = 4
+
+# (exam_id, strata, pool size) -> {stratum value: [pool indices]}
+_STRATA_CACHE_SIZE = 256
+_strata_cache: "OrderedDict[tuple, Dict[object, List[int]]]" = OrderedDict()
+
+# (exam_id, exam version) -> {question id: position in Question.order}
+_ORDER_CACHE_SIZE = 256
+_order_cache: "OrderedDict[tuple, Dict[uuid.UUID, int]]" = OrderedDict()
+
+
+def pool_size(pool: Optional[bytes]) -> int:
+    return len(pool or b"") // UUID_SIZE
+
+
+def append_to_pool(pool: Optional[bytes], question_id: uuid.UUID) -> bytes:
+    return (pool or b"") + question_id.bytes
+
+
+def remove_from_pool(pool: Optional[bytes], question_id: uuid.UUID) -> Optional[bytes]:
+    """Drop a question from the pool; shifts later indices, so only for exams without attempts."""
+    if pool is None:
+        return None
+    for index in range(pool_size(pool)):
+        if pool_id_at(pool, index) == question_id:
+            offset = index * UUID_SIZE
+            return pool[:offset] + pool[offset + UUID_SIZE:]
+    return pool
+
+
+def pool_id_at(pool: bytes, index: int) -> uuid.UUID:
+    offset = index * UUID_SIZE
+    return uuid.UUID(bytes=bytes(pool[offset:offset + UUID_SIZE]))
+
+
+def pack_indices(indices: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(indices)}I", *indices)
+
+
+def unpack_indices(data: bytes) -> List[int]:
+    return list(struct.unpack(f"<{len(data) // INDEX_SIZE}I", data))
+
+
+def resolve_ids(pool: bytes, indices: Sequence[int]) -> List[uuid.UUID]:
+    return [pool_id_at(pool, i) for i in indices]
+
+
+def _allocate(buckets: Dict[object, List[int]], k: int) -> Dict[object, int]:
+    """Split k draws across strata proportionally (largest remainder)."""
+    total = sum(len(b) for b in buckets.values())
+    k = min(k, total)
+    quotas = {}
+    remainders = []
+    for value, bucket in buckets.items():
+        exact = k * len(bucket) / total
+        quotas[value] = int(exact)
+        remainders.append((exact - int(exact), value))
+
+    short = k - sum(quotas.values())
+    for _, value in sorted(remainders, key=lambda r: r[0], reverse=True)[:short]:
+        quotas[value] += 1
+    return quotas
+
+
+async def _load_strata(db: AsyncSession, exam: Exam) -> Dict[object, List[int]]:
+    key = (exam.id, exam.pool_strata, pool_size(exam.question_pool))
+    buckets = _strata_cache.get(key)
+    if buckets is not None:
+        _strata_cache.move_to_end(key)
+        return buckets
+
+    # Built once per pool version: only ids and the stratum column are read
+    column = Question.tag if exam.pool_strata == "tag" else Question.points
+    rows = await db.execute(
+        select(Question.id, column).where(Question.exam_id == exam.id)
+    )
+    pool = exam.question_pool or b""
+    position = {pool_id_at(pool, i): i for i in range(pool_size(pool))}
+
+    buckets = {}
+    for question_id, value in rows.all():
+        index = position.get(question_id)
+        if index is not None:
+            buckets.setdefault(value, []).append(index)
+    for bucket in buckets.values():
+        bucket.sort()
+
+    _strata_cache[key] = buckets
+    if len(_strata_cache) > _STRATA_CACHE_SIZE:
+        _strata_cache.popitem(last=False)
+    return buckets
+
+
+def invalidate_strata(exam_id: uuid.UUID) -> None:
+    for key in [k for k in _strata_cache if k[0] == exam_id]:
+        del _strata_cache[key]
+
+
+async def _question_positions(db: AsyncSession, exam: Exam) -> Dict[uuid.UUID, int]:
+    """Each question's position in the exam's teacher-defined order; edits bump the version, so it is the key."""
+    key = (exam.id, exam.version)
+    positions = _order_cache.get(key)
+    if positions is not None:
+        _order_cache.move_to_end(key)
+        return positions
+
+    ids = await db.scalars(
+        select(Question.id).where(Question.exam_id == exam.id).order_by(Question.order, Question.id)
+    )
+    positions = {question_id: i for i, question_id in enumerate(ids)}
+    _order_cache[key] = positions
+    if len(_order_cache) > _ORDER_CACHE_SIZE:
+        _order_cache.popitem(last=False)
+    return positions
+
+
+async def preload_strata(db: AsyncSession, exam: Exam) -> None:
+    """Build an exam's strata index and question order ahead of traffic (used by worker warm-up)."""
+    if exam.pool_strata and exam.question_pool:
+        await _load_strata(db, exam)
+    if not exam.randomize_questions:
+        await _question_positions(db, exam)
+
+
+def order_varies_per_attempt(exam: Exam) -> bool:
+    """Whether attempts get their own question order (shuffled or a partial draw)."""
+    if exam.randomize_questions:
+        return True
+    return exam.questions_per_attempt is not None and exam.questions_per_attempt < pool_size(exam.question_pool)
+
+
+async def sample_questions(db: AsyncSession, exam: Exam) -> List[int]:
+    """Draw this attempt's questions as pool indices, in delivery order."""
+    if exam.question_pool is None:
+        # Exams created before pooling: build the pool once from question order
+        ids = await db.scalars(
+            select(Question.id).where(Question.exam_id == exam.id).order_by(Question.order)
+        )
+        exam.question_pool = b"".join(qid.bytes for qid in ids)
+
+    n = pool_size(exam.question_pool)
+    k = min(exam.questions_per_attempt or n, n)
+
+    if k < n and exam.pool_strata:
+        buckets = await _load_strata(db, exam)
+        indices = []
+        for value, quota in _allocate(buckets, k).items():
+            indices.extend(random.sample(buckets[value], quota))
+    elif k < n:
+        indices = random.sample(range(n), k)
+    else:
+        indices = list(range(n))
+
+    if exam.randomize_questions:
+        random.shuffle(indices)
+    else:
+        positions = await _question_positions(db, exam)
+        pool = exam.question_pool
+        indices.sort(key=lambda i: (positions.get(pool_id_at(pool, i), n), i))
+    return indices
+
+
+async def load_attempt_questions(db: AsyncSession, attempt: Attempt, exam: Exam) -> List[Question]:
+    """Load only the questions drawn for an attempt (with options), in delivery order."""
+    if attempt.question_indices is None:
+        # Attempts started before pooling was introduced get the whole exam
+        result = await db.execute(
+            select(Question)
+            .options(selectinload(Question.options))
+            .where(Question.exam_id == exam.id)
+            .order_by(Question.order)
+        )
+        return list(result.scalars().all())
+
+    ids = resolve_ids(exam.question_pool, unpack_indices(attempt.question_indices))
+    result = await db.execute(
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.id.in_(ids))
+    )
+    by_id = {q.id: q for q in result.scalars().all()}
+    return [by_id[qid] for qid in ids if qid in by_id]
+
+
+async def attempt_question_ids(db: AsyncSession, attempt: Attempt, exam: Exam) -> List[uuid.UUID]:
+    """Resolve an attempt's question ids in delivery order without loading content."""
+    if attempt.question_indices is None:
+        ids = await db.scalars(
+            select(Question.id).where(Question.exam_id == exam.id).order_by(Question.order)
+        )
+        ids = list(ids)
+        if exam.randomize_questions:
+            # Seeded by the attempt, so a snapshot rebuilt on any worker keeps the same order
+            random.Random(attempt.id.int).shuffle(ids)
+        return ids
+    return resolve_ids(exam.question_pool, unpack_indices(attempt.question_indices))
@@ -0,0 +1,104 @@
+"""
+Full-text search over a teacher's questions.
+
+Questions and options carry a generated tsvector (search_vector) with a GIN
+index, so matching is two index scans whose question ids are unioned; only
+matches are ranked. A question's own text ranks first, its options add
+OPTION_WEIGHT of their best rank. Pages are keyset-paginated on
+(rank, id), so later pages cost the same as the first.
+"""
+import uuid
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, func, union, cast, tuple_, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Exam, Question, Option
+from app.models.exam import SEARCH_CONFIG
+from app.schemas import QuestionSearchHit
+
+OPTION_WEIGHT = 0.5
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def encode_cursor(rank: float, question_id: uuid.UUID) -> str:
+    return f"{rank!r}:{question_id.hex}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    """Raises ValueError for a malformed cursor."""
+    rank, _, question_id = cursor.partition(":")
+    return float(rank), uuid.UUID(question_id)
+
+
+async def search_questions(
+    db: AsyncSession,
+    teacher_id: uuid.UUID,
+    text: str,
+    exam_id: Optional[uuid.UUID] = None,
+    tag: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[QuestionSearchHit], Optional[str]]:
+    """
+    One page of the teacher's questions matching a web-style query
+    ("quoted phrases", -excluded, or). Returns the hits, best first, and
+    the cursor of the next page (None at the end).
+    """
+    config = cast(SEARCH_CONFIG, REGCONFIG)
+    query = func.websearch_to_tsquery(config, text)
+
+    matched = union(
+        select(Question.id.label("id")).where(Question.search_vector.op("@@")(query)),
+        select(Option.question_id).where(Option.search_vector.op("@@")(query))
+    ).subquery()
+    option_rank = (
+        select(func.max(func.ts_rank(Option.search_vector, query)))
+        .where(Option.question_id == Question.id, Option.search_vector.op("@@")(query))
+        .scalar_subquery()
+    )
+    rank = func.ts_rank(Question.search_vector, query) + literal(OPTION_WEIGHT) * func.coalesce(option_rank, 0)
+
+    ranked = (
+        select(Question.id.label("id"), rank.label("rank"))
+        .join(matched, matched.c.id == Question.id)
+        .join(Exam, Exam.id == Question.exam_id)
+        .where(Exam.teacher_id == teacher_id)
+    )
+    if exam_id is not None:
+        ranked = ranked.where(Question.exam_id == exam_id)
+    if tag is not None:
+        ranked = ranked.where(Question.tag == tag)
+    ranked = ranked.subquery()
+
+    page = select(ranked)
+    if cursor is not None:
+        after_rank, after_id = decode_cursor(cursor)
+        page = page.where(tuple_(ranked.c.rank, ranked.c.id) < tuple_(after_rank, after_id))
+    page = page.order_by(ranked.c.rank.desc(), ranked.c.id.desc()).limit(limit + 1).subquery()
+
+    # Headlines only for the rows of this page
+    rows = await db.execute(
+        select(
+            Question.id, Question.exam_id, Exam.title, Question.content,
+            func.ts_headline(config, Question.content, query, HEADLINE_OPTIONS),
+            Question.tag, Question.points, Question.multi_select, page.c.rank
+        )
+        .join(page, page.c.id == Question.id)
+        .join(Exam, Exam.id == Question.exam_id)
+        .order_by(page.c.rank.desc(), page.c.id.desc())
+    )
+    hits = [
+        QuestionSearchHit(
+            question_id=question_id, exam_id=exam, exam_title=title, content=content, headline=headline,
+            tag=question_tag, points=points, multi_select=multi_select, rank=hit_rank
+        )
+        for question_id, exam, title, content, headline, question_tag, points, multi_select, hit_rank in rows.all()
+    ]
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_cursor(hits[-1].rank, hits[-1].question_id)
+    return hits, next_cursor
@@ -0,0 +1,69 @@
+"""
+Background job kinds.
+
+Thin handlers registering the heavy teacher operations with app.core.jobs;
+importing this module is what makes a worker able to run them. Payloads are
+JSON, so ids travel as strings. Keys collapse repeated requests for the same
+exam into one queued job.
+
+Maintenance jobs are periodic: each run queues the next one, and every worker
+schedules them when it starts (the key keeps a single one queued).
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import jobs
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.services import archive, collusion, idempotency
+from app.services.results import materialize_exam_results
+
+MATERIALIZE_RESULTS = "materialize_results"
+ARCHIVE_EXAM = "archive_exam"
+ANALYZE_COLLUSION = "analyze_collusion"
+PURGE_IDEMPOTENCY_KEYS = "purge_idempotency_keys"
+
+
+@jobs.job(MATERIALIZE_RESULTS, concurrency=2)
+async def _materialize_results(ctx: jobs.JobContext, exam_id: str) -> dict:
+    return {"results": await materialize_exam_results(uuid.UUID(exam_id), ctx.progress)}
+
+
+@jobs.job(ARCHIVE_EXAM, concurrency=1, max_attempts=5)
+async def _archive_exam(ctx: jobs.JobContext, exam_id: str) -> dict:
+    return {"attempts": await archive.archive_exam(uuid.UUID(exam_id), ctx.progress)}
+
+
+@jobs.job(ANALYZE_COLLUSION, concurrency=1)
+async def _analyze_collusion(ctx: jobs.JobContext, exam_id: str) -> dict:
+    return {"pairs": await collusion.analyze_exam(uuid.UUID(exam_id), ctx.progress)}
+
+
+@jobs.job(PURGE_IDEMPOTENCY_KEYS, concurrency=1)
+async def _purge_idempotency_keys(ctx: jobs.JobContext) -> dict:
+    purged = await idempotency.purge_expired()
+    await schedule_maintenance(datetime.utcnow() + timedelta(minutes=settings.IDEMPOTENCY_PURGE_MINUTES))
+    return {"purged": purged}
+
+
+async def schedule_maintenance(run_after: Optional[datetime] = None) -> None:
+    """Queue the periodic maintenance jobs, unless they are queued already."""
+    async with async_session_maker() as db:
+        await jobs.enqueue(db, PURGE_IDEMPOTENCY_KEYS, key=PURGE_IDEMPOTENCY_KEYS, run_after=run_after)
+        await db.commit()
+
+
+async def enqueue_for_exam(
+    db: AsyncSession,
+    kind: str,
+    exam_id: uuid.UUID,
+    created_by: Optional[uuid.UUID] = None
+) -> uuid.UUID:
+    """Queue one of the per-exam jobs in the caller's transaction; returns the job id."""
+    return await jobs.enqueue(
+        db, kind, {"exam_id": str(exam_id)},
+        key=f"{kind}:{exam_id}", exam_id=exam_id, created_by=created_by
+    )
@@ -0,0 +1,113 @@
+"""
+Worker warm-up.
+
+Runs in the background after the schema check so /health answers at once,
+while /ready only passes once the pool is open, the delivery caches hold
+every exam that is open or about to open, and the response serializers have
+been exercised.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import noload
+
+from app.core.config import settings
+from app.core.compression import PrecompressedPayload, SUPPORTED_ENCODINGS
+from app.core.database import async_session_maker, warm_pool
+from app.models import Exam, Question
+from app.schemas import (
+    AttemptStart, AttemptResult, ResponseResult, ExamSecure, QuestionSecure, OptionSecure, QuestionPage
+)
+from app.services import delivery, sampling
+
+logger = logging.getLogger(__name__)
+
+RETRY_SECONDS = 5
+
+_ready = False
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+async def preload_exams() -> int:
+    """Load questions of published exams whose window is open or opens soon."""
+    now = datetime.utcnow()
+    horizon = now + timedelta(minutes=settings.WARMUP_LOOKAHEAD_MINUTES)
+
+    async with async_session_maker() as db:
+        exams = (await db.scalars(
+            select(Exam)
+            .options(noload(Exam.questions), noload(Exam.attempts))
+            .where(
+                Exam.is_published == True,
+                (Exam.start_date == None) | (Exam.start_date <= horizon),
+                (Exam.end_date == None) | (Exam.end_date >= now)
+            )
+        )).all()
+
+        for exam in exams:
+            question_ids = list(await db.scalars(
+                select(Question.id).where(Question.exam_id == exam.id)
+            ))
+            await delivery.preload_questions(db, exam, question_ids)
+            await sampling.preload_strata(db, exam)
+
+    return len(exams)
+
+
+def warm_serializers() -> None:
+    """Exercise the hot response models once so first requests skip lazy setup."""
+    now = datetime.utcnow()
+    question = QuestionSecure(
+        id=uuid.uuid4(),
+        content="warm-up",
+        order=0,
+        points=1,
+        options=[OptionSecure(id=uuid.uuid4(), content="warm-up", order=i) for i in range(4)]
+    )
+    exam = ExamSecure(id=uuid.uuid4(), title="warm-up", description=None, time_limit_minutes=60, questions=[question])
+    start = AttemptStart(attempt_id=uuid.uuid4(), exam=exam, server_time=now, expires_at=now)
+    result = AttemptResult(
+        attempt_id=uuid.uuid4(),
+        exam_title="warm-up",
+        score=1,
+        max_score=1,
+        percentage=100.0,
+        started_at=now,
+        submitted_at=now,
+        responses=[ResponseResult(
+            question_id=question.id,
+            question_content=question.content,
+            selected_option_id=question.options[0].id,
+            correct_option_id=question.options[0].id,
+            is_correct=True,
+            points_earned=1,
+            max_points=1
+        )]
+    )
+    for model in (start, result, QuestionPage(questions=[question])):
+        payload = PrecompressedPayload(model.model_dump_json().encode("utf-8"))
+        for encoding in SUPPORTED_ENCODINGS:
+            payload.variant(encoding)
+
+
+async def warm_up() -> None:
+    """Warm this worker, retrying until it succeeds, then mark it ready."""
+    global _ready
+    while True:
+        try:
+            await warm_pool(settings.DB_POOL_WARM)
+            exams = await preload_exams()
+            warm_serializers()
+        except Exception:
+            logger.exception("Warm-up failed; retrying in %s seconds", RETRY_SECONDS)
+            await asyncio.sleep(RETRY_SECONDS)
+            continue
+        _ready = True
+        logger.info("Worker warm: %d exams preloaded", exams)
+        return
@@ -0,0 +1,45 @@
+"""
+Standalone job worker.
+
+    python -m app.worker [--kinds archive_exam,analyze_collusion] [--concurrency N]
+
+Runs the background jobs (app.services.tasks) outside the API processes, so
+exports, archival and analysis never share an event loop or connection pool
+with exam-taking requests. API processes only run jobs with JOBS_IN_APP=true.
+SIGINT/SIGTERM stop it; jobs in flight are handed back to the queue.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core import jobs, processes
+from app.core.database import engine, check_schema
+from app.services import tasks  # also registers the job kinds
+
+
+async def _run(args: argparse.Namespace) -> None:
+    await check_schema()
+    worker = jobs.Worker(kinds=args.kinds.split(",") if args.kinds else None, concurrency=args.concurrency)
+    await tasks.schedule_maintenance()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        processes.shutdown()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="eTests background job worker")
+    parser.add_argument("--kinds", help="Comma-separated job kinds to run (default: all)")
+    parser.add_argument("--concurrency", type=int, help="Jobs at once (default: JOB_WORKER_CONCURRENCY)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
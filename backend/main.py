@@ -1,17 +1,37 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.core import settings, init_db
+from app.core import settings, init_db, check_schema
+from app.core.compression import CompressionMiddleware
+from app.core.profiler import ProfilerMiddleware
+from app.core.database import engine
+from app.core import jobs, processes
 from app.api import api_router
+from app.services import tasks, warmup
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    await init_db()
+    # Startup: verify the schema (no DDL unless DB_AUTO_CREATE), then warm in the background
+    if settings.DB_AUTO_CREATE:
+        await init_db()
+    await check_schema()
+    warmup_task = asyncio.create_task(warmup.warm_up())
+    worker = jobs.Worker() if settings.JOBS_IN_APP else None
+    if worker:
+        await tasks.schedule_maintenance()
+    worker_task = asyncio.create_task(worker.run()) if worker else None
     yield
-    # Shutdown
+    # Shutdown: running jobs are handed back to the queue
+    warmup_task.cancel()
+    if worker:
+        worker.stop()
+        await worker_task
+    processes.shutdown()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -30,6 +50,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Profiling (outermost, so it times the whole stack; not installed when off)
+if settings.PROFILER_SAMPLE_RATE > 0 or settings.PROFILER_TOKEN:
+    app.add_middleware(ProfilerMiddleware, sample_rate=settings.PROFILER_SAMPLE_RATE)
+
 # Routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -37,3 +64,11 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "app": settings.APP_NAME}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Passes only once this worker is warm; point load balancer readiness probes here."""
+    if not warmup.is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming", "app": settings.APP_NAME})
+    return {"status": "ready", "app": settings.APP_NAME}
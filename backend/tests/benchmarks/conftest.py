@@ -0,0 +1,102 @@
+"""
+Fixtures for the micro-benchmarks: realistic exams built in memory (no database).
+
+Run from backend/:
+
+    pytest tests/benchmarks --benchmark-only                          # measure
+    pytest tests/benchmarks --benchmark-only --benchmark-save=baseline  # store a new baseline
+    pytest tests/benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=min:30%
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Attempt, Exam, Option, Question, Response
+from app.schemas import ResponseSubmit
+from app.services.delivery import CachedQuestion
+
+SIZES = [50, 200, 1000]
+OPTIONS_PER_QUESTION = 4
+_CONTENT = "Which of the following statements about the given scenario is correct? " * 3
+
+
+def make_questions(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        question = Question(id=uuid.UUID(int=rng.getrandbits(128)), content=_CONTENT, order=i * 1024, points=rng.randint(1, 5))
+        correct = rng.randrange(OPTIONS_PER_QUESTION)
+        question.options = [
+            Option(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                question_id=question.id,
+                content=f"Option {j}: a plausible answer of moderate length",
+                is_correct=j == correct,
+                order=j * 1024
+            )
+            for j in range(OPTIONS_PER_QUESTION)
+        ]
+        questions.append(question)
+    return questions
+
+
+def make_submission(questions: list, seed: int = 11) -> list:
+    """One answer per question, roughly 70% correct."""
+    rng = random.Random(seed)
+    submitted = []
+    for question in questions:
+        correct = next(o for o in question.options if o.is_correct)
+        wrong = [o for o in question.options if not o.is_correct]
+        option = correct if rng.random() < 0.7 else rng.choice(wrong)
+        submitted.append(ResponseSubmit(question_id=question.id, selected_option_id=option.id))
+    return submitted
+
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"{n}q")
+def questions(request):
+    return make_questions(request.param)
+
+
+@pytest.fixture
+def submission(questions):
+    return make_submission(questions)
+
+
+@pytest.fixture
+def cached_questions(questions):
+    return [
+        CachedQuestion(id=q.id, content=q.content, points=q.points, options=[(o.id, o.content) for o in q.options])
+        for q in questions
+    ]
+
+
+@pytest.fixture
+def exam():
+    return Exam(id=uuid.uuid4(), title="Benchmark exam", description="Synthetic", time_limit_minutes=60, version=1)
+
+
+@pytest.fixture
+def submitted_attempt(exam, questions, submission):
+    started = datetime(2024, 1, 1, 9, 0)
+    attempt = Attempt(
+        id=uuid.uuid4(),
+        exam_id=exam.id,
+        student_id=uuid.uuid4(),
+        started_at=started,
+        submitted_at=started + timedelta(minutes=45),
+        is_submitted=True
+    )
+    options = {o.id: o for q in questions for o in q.options}
+    responses = [
+        Response(
+            question_id=s.question_id,
+            selected_option_id=s.selected_option_id,
+            is_correct=options[s.selected_option_id].is_correct
+        )
+        for s in submission
+    ]
+    attempt.max_score = sum(q.points for q in questions)
+    attempt.score = sum(q.points for q, r in zip(questions, responses) if r.is_correct)
+    return attempt, responses
@@ -0,0 +1,26 @@
+import uuid
+
+import pytest
+
+from app.schemas import ExamSecure
+from app.services.delivery import secure_question
+
+
+def _secure_exam(exam, cached_questions, attempt_id, randomize_options):
+    return ExamSecure(
+        id=exam.id,
+        title=exam.title,
+        description=exam.description,
+        time_limit_minutes=exam.time_limit_minutes,
+        questions=[
+            secure_question(q, position, attempt_id, randomize_options)
+            for position, q in enumerate(cached_questions)
+        ]
+    )
+
+
+@pytest.mark.parametrize("randomize_options", [False, True], ids=["fixed", "shuffled"])
+def test_secure_payload(benchmark, exam, cached_questions, randomize_options):
+    secure = benchmark(_secure_exam, exam, cached_questions, uuid.uuid4(), randomize_options)
+    assert len(secure.questions) == len(cached_questions)
+    assert "is_correct" not in secure.questions[0].options[0].model_dump()
@@ -0,0 +1,7 @@
+from app.services.grading import grade_submission
+
+
+def test_grade_submission(benchmark, questions, submission):
+    graded = benchmark(grade_submission, questions, submission)
+    assert len(graded.responses) == len(questions)
+    assert 0 < graded.score < graded.max_score
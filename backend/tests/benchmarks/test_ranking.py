@@ -0,0 +1,28 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.ranking import ScoreIndex
+
+ATTEMPTS = [1000, 100_000]
+# A single lookup takes about a microsecond, too little to time reliably; time a sweep
+SCORES = range(0, 101)
+RANKS = range(1, 101)
+
+
+@pytest.fixture(params=ATTEMPTS, ids=lambda n: f"{n}a")
+def score_index(request):
+    rng = random.Random(7)
+    scores = Counter(min(100, max(0, int(rng.gauss(60, 15)))) for _ in range(request.param))
+    return ScoreIndex(scores.items())
+
+
+def test_percentile(benchmark, score_index):
+    percentiles = benchmark(lambda: [score_index.percentile(score) for score in SCORES])
+    assert percentiles == sorted(percentiles) and 0 < percentiles[60] < 100
+
+
+def test_nth_highest(benchmark, score_index):
+    cutoffs = benchmark(lambda: [score_index.nth_highest(n) for n in RANKS])
+    assert cutoffs == sorted(cutoffs, reverse=True) and score_index.rank(cutoffs[9]) <= 10
@@ -0,0 +1,30 @@
+import uuid
+
+from app.schemas import ExamSecure
+from app.services.delivery import secure_question
+from app.services.results import build_attempt_result
+
+
+def test_exam_secure_json(benchmark, exam, cached_questions):
+    secure = ExamSecure(
+        id=exam.id,
+        title=exam.title,
+        description=exam.description,
+        time_limit_minutes=exam.time_limit_minutes,
+        questions=[secure_question(q, i, uuid.uuid4(), False) for i, q in enumerate(cached_questions)]
+    )
+    body = benchmark(secure.model_dump_json)
+    assert body.startswith("{")
+
+
+def test_build_attempt_result(benchmark, exam, questions, submitted_attempt):
+    attempt, responses = submitted_attempt
+    result = benchmark(build_attempt_result, attempt, exam, questions, responses)
+    assert len(result.responses) == len(questions)
+
+
+def test_attempt_result_json(benchmark, exam, questions, submitted_attempt):
+    attempt, responses = submitted_attempt
+    result = build_attempt_result(attempt, exam, questions, responses)
+    body = benchmark(result.model_dump_json)
+    assert body.startswith("{")
@@ -0,0 +1,24 @@
+import uuid
+
+from app.core.security import create_access_token, decode_token, clear_token_cache
+
+TOKEN_DATA = {"sub": str(uuid.uuid4()), "role": "student", "session_id": str(uuid.uuid4())}
+
+
+def test_create_access_token(benchmark):
+    token = benchmark(create_access_token, TOKEN_DATA)
+    assert token.count(".") == 2
+
+
+def test_decode_token(benchmark):
+    token = create_access_token(TOKEN_DATA)
+    payload = benchmark(decode_token, token)
+    assert payload["sub"] == TOKEN_DATA["sub"]
+
+
+def test_decode_token_uncached(benchmark):
+    token = create_access_token(TOKEN_DATA)
+    payload = benchmark.pedantic(
+        decode_token, args=(token,), setup=clear_token_cache, rounds=200, warmup_rounds=5
+    )
+    assert payload["sub"] == TOKEN_DATA["sub"]
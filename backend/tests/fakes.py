@@ -0,0 +1,100 @@
+"""
+In-memory stand-in for AsyncSession, for unit tests without Postgres.
+
+It evaluates the simple statements the ordering, sampling and delivery
+services issue (one table, comparisons and IN joined by AND, ORDER BY, LIMIT) against model
+instances. An UPDATE is treated as ordering.rebalance: siblings are
+respaced GAP apart in their current order.
+"""
+import operator
+from collections import defaultdict
+
+from sqlalchemy import Column
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.dml import Update
+from sqlalchemy.sql.elements import BindParameter, BooleanClauseList, UnaryExpression, Grouping
+
+from app.services.ordering import GAP, _PARENTS
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+    def scalars(self):
+        return _Result([row[0] for row in self._rows])
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class FakeSession:
+    def __init__(self, *objects):
+        self.objects = list(objects)
+
+    def add(self, obj):
+        self.objects.append(obj)
+
+    def _value(self, expr, obj):
+        if isinstance(expr, BindParameter):
+            return expr.value
+        if isinstance(expr, Grouping):
+            return self._value(expr.element, obj)
+        if isinstance(expr, Column):
+            return getattr(obj, expr.key)
+        return getattr(obj, expr.key)
+
+    def _matches(self, criterion, obj) -> bool:
+        if isinstance(criterion, BooleanClauseList):
+            return all(self._matches(c, obj) for c in criterion.clauses)
+        left, right = self._value(criterion.left, obj), self._value(criterion.right, obj)
+        if criterion.operator is operators.in_op:
+            return left in right
+        return criterion.operator(left, right)
+
+    def _select(self, stmt):
+        table = stmt.get_final_froms()[0]
+        rows = [o for o in self.objects if o.__table__ is table]
+        for criterion in stmt._where_criteria:
+            rows = [o for o in rows if self._matches(criterion, o)]
+        for clause in reversed(stmt._order_by_clauses):
+            descending = isinstance(clause, UnaryExpression) and clause.modifier is operators.desc_op
+            column = clause.element if isinstance(clause, UnaryExpression) else clause
+            rows.sort(key=lambda o: self._value(column, o), reverse=descending)
+        if stmt._limit is not None:
+            rows = rows[:stmt._limit]
+        described = stmt.column_descriptions
+        if len(described) == 1 and described[0]["expr"] is described[0]["entity"]:
+            return [(o,) for o in rows]  # select(Model)
+        return [tuple(self._value(c, o) for c in stmt.selected_columns) for o in rows]
+
+    def _rebalance(self, stmt):
+        model = stmt.entity_description["entity"]
+        parent = _PARENTS[model].key
+        siblings = defaultdict(list)
+        for obj in self.objects:
+            if obj.__table__ is model.__table__:
+                siblings[getattr(obj, parent)].append(obj)
+        moved = []
+        for group in siblings.values():
+            group.sort(key=operator.attrgetter("order", "id"))
+            for i, obj in enumerate(group, start=1):
+                if obj.order != i * GAP:
+                    obj.order = i * GAP
+                    moved.append((obj.id,))
+        return moved
+
+    async def execute(self, stmt):
+        if isinstance(stmt, Update):
+            return _Result(self._rebalance(stmt))
+        return _Result(self._select(stmt))
+
+    async def scalars(self, stmt):
+        return (await self.execute(stmt)).scalars()
+
+    async def scalar(self, stmt):
+        rows = self._select(stmt)
+        return rows[0][0] if rows else None
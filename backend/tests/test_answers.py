@@ -0,0 +1,61 @@
+import uuid
+
+from app.models import Attempt, Option, Question
+from app.services import answers
+from app.services.grading import key_mask, selection_mask
+
+
+def _question(correct, multi_select=False, partial_credit=False, points=2) -> Question:
+    question = Question(
+        id=uuid.uuid4(), content="?", points=points,
+        multi_select=multi_select, partial_credit=partial_credit, key_mask=key_mask(correct)
+    )
+    question.options = [
+        Option(id=uuid.uuid4(), content=str(i), is_correct=flag, order=i)
+        for i, flag in enumerate(correct)
+    ]
+    return question
+
+
+def test_single_and_multi_select_answers_round_trip():
+    single = _question([False, True, False])
+    multi = _question([True, False, True, False], multi_select=True)
+    skipped = _question([True, False])
+    questions = [single, multi, skipped]
+    chosen = selection_mask(multi, [multi.options[0].id, multi.options[2].id])
+
+    data, correct_mask, score = answers.encode(questions, {single.id: single.options[1].id, multi.id: chosen})
+
+    assert len(data) == 1 + answers.MASK_BYTES + 1
+    assert answers.unpack_answers(data, questions) == [2, chosen, answers.UNANSWERED]
+    assert answers.unpack_bitmap(correct_mask, 3) == [True, True, False]
+    assert score == 4
+
+    attempt = Attempt(answers=data, correct_mask=correct_mask)
+    decoded = answers.decode(attempt, questions)
+    assert [(r.question_id, r.selected_option_id, r.selected_mask, r.is_correct) for r in decoded] == [
+        (single.id, single.options[1].id, None, True),
+        (multi.id, None, chosen, True),
+    ]
+
+
+def test_foreign_option_is_stored_unanswered():
+    question, other = _question([True, False]), _question([True, False])
+
+    data, correct_mask, score = answers.encode([question], {question.id: other.options[0].id})
+
+    assert answers.unpack_answers(data, [question]) == [answers.UNANSWERED]
+    assert (answers.unpack_bitmap(correct_mask, 1), score) == ([False], 0)
+
+
+def test_partial_credit_selection_is_graded_from_the_mask():
+    question = _question([True, True, False, False], multi_select=True, partial_credit=True, points=4)
+    # One correct and one wrong choice cancel out; two correct earn everything
+    assert answers.grade([question], [0b0101])[1] == 0
+    assert answers.grade([question], [0b0001])[1] == 2
+    assert answers.grade([question], [0b0011]) == (b"\x01", 4)
+
+
+def test_short_data_unpacks_the_questions_it_covers():
+    questions = [_question([True, False]), _question([True, False], multi_select=True)]
+    assert answers.unpack_answers(b"\x01\x03", questions) == [1]
@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.services.collusion import find_similar_pairs
+
+QUESTIONS, OPTIONS = 60, 4
+OPTION_QUESTION = [q for q in range(QUESTIONS) for _ in range(OPTIONS)]
+
+
+def _random_exam(students: int, seed: int = 7) -> np.ndarray:
+    """Wrong options chosen by students answering at random (option 0 is correct)."""
+    rng = np.random.default_rng(seed)
+    choices = rng.integers(0, OPTIONS, size=(students, QUESTIONS))
+    wrong = np.zeros((students, QUESTIONS * OPTIONS), dtype=bool)
+    rows, questions = np.nonzero(choices)
+    wrong[rows, questions * OPTIONS + choices[rows, questions]] = True
+    return wrong
+
+
+def _same_choice(wrong: np.ndarray) -> np.ndarray:
+    chosen = wrong.sum(axis=0)
+    total = np.bincount(OPTION_QUESTION, weights=chosen, minlength=QUESTIONS)
+    squares = np.bincount(OPTION_QUESTION, weights=chosen.astype(np.float64) ** 2, minlength=QUESTIONS)
+    return np.divide(squares, total ** 2, out=np.zeros_like(total), where=total > 0)
+
+
+def _pairs(wrong: np.ndarray, **kwargs):
+    return find_similar_pairs(np.packbits(wrong, axis=1), OPTION_QUESTION, _same_choice(wrong), **kwargs)
+
+
+def test_independent_students_are_not_flagged():
+    assert _pairs(_random_exam(300)) == []
+
+
+def test_copied_wrong_answers_are_flagged_across_blocks():
+    wrong = _random_exam(300)
+    wrong[250] = wrong[3]
+    wrong[120, :100] = wrong[40, :100]  # Copied the first 25 questions
+
+    pairs = _pairs(wrong, block=32)
+
+    assert [(i, j) for i, j, *_ in pairs] == [(3, 250), (40, 120)]
+    i, j, shared, expected, jaccard, score = pairs[0]
+    assert shared == wrong[3].sum() and jaccard == 1.0
+    assert 0 < expected < shared and score > 0
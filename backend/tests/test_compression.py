@@ -0,0 +1,37 @@
+import gzip
+
+from app.core import compression
+from app.core.compression import accepts, negotiate
+
+
+def test_negotiate_prefers_the_server_order_on_equal_weights():
+    assert negotiate("gzip, br") == compression.SUPPORTED_ENCODINGS[0]
+    assert negotiate("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate("*") == compression.SUPPORTED_ENCODINGS[0]
+
+
+def test_negotiate_honours_refusals():
+    assert negotiate("") is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("*;q=0, gzip;q=0.1") == "gzip"
+    assert negotiate("GZIP ; q=0.8, deflate") == "gzip"
+    assert negotiate("gzip;q=oops") is None
+
+
+def test_accepts():
+    assert accepts("br;q=0.2, gzip", "br")
+    assert not accepts("gzip", "br")
+    assert accepts("*", "br")
+    assert not accepts("*, br;q=0", "br")
+    assert not accepts("", "gzip")
+
+
+def test_per_client_payloads_use_streaming_levels():
+    body = b'{"questions": [' + b'{"content": "question text"},' * 200 + b'{}]}'
+    shared = compression.PrecompressedPayload(body)
+    per_client = compression.PrecompressedPayload(body, shared=False)
+
+    assert shared.variant("gzip") == compression.compress(body, "gzip")
+    assert per_client.variant("gzip") == compression.compress(body, "gzip", static=False)
+    assert gzip.decompress(per_client.variant("gzip")) == body
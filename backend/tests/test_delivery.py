@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models import Exam, Question
+from app.services import delivery
+from app.services.delivery import DeliverySnapshot, render_page
+from tests.fakes import FakeSession
+
+
+@pytest.mark.asyncio
+async def test_edits_from_another_worker_are_served_after_the_version_check(monkeypatch):
+    exam = Exam(id=uuid.uuid4(), title="Edits", version=1)
+    question = Question(id=uuid.uuid4(), exam_id=exam.id, content="Before", order=0, points=1, multi_select=False)
+    db = FakeSession(exam, question)
+    snapshot = DeliverySnapshot(
+        attempt_id=uuid.uuid4(),
+        student_id=uuid.uuid4(),
+        exam_id=exam.id,
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        randomize_options=False,
+        page_size=1,
+        question_ids=[question.id]
+    )
+
+    questions, _ = await render_page(db, snapshot, 0, 1)
+    assert questions[0].content == "Before"
+
+    # Saved through another worker: this one's invalidate_questions never ran
+    question.content = "After"
+    exam.version += 1
+    questions, _ = await render_page(db, snapshot, 0, 1)
+    assert questions[0].content == "Before"
+
+    monkeypatch.setattr(settings, "DELIVERY_VERSION_CHECK_SECONDS", 0)
+    questions, _ = await render_page(db, snapshot, 0, 1)
+    assert questions[0].content == "After"
+    delivery.invalidate_questions([question.id])  # Leave the worker caches clean for other tests
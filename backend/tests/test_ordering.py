@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+
+from app.models import Exam, Question
+from app.services import ordering
+from app.services.ordering import GAP, key_between, position_key
+from tests.fakes import FakeSession
+
+
+def test_key_between():
+    assert key_between(None, None) == 0
+    assert key_between(None, 0) == -GAP
+    assert key_between(GAP, None) == 2 * GAP
+    assert key_between(0, GAP) == GAP // 2
+    assert key_between(4, 5) is None
+
+
+def _exam_with(*orders):
+    exam = Exam(id=uuid.uuid4(), title="Order", version=1)
+    questions = [Question(id=uuid.uuid4(), exam_id=exam.id, content="?", order=o, points=1) for o in orders]
+    return exam, questions, FakeSession(exam, *questions)
+
+
+@pytest.mark.asyncio
+async def test_position_key_places_after_before_and_last():
+    exam, (first, second), db = _exam_with(0, GAP)
+
+    assert await position_key(db, Question, exam.id) == (2 * GAP, False)
+    assert await position_key(db, Question, exam.id, after_id=first.id) == (GAP // 2, False)
+    assert await position_key(db, Question, exam.id, before_id=first.id) == (-GAP, False)
+    # Moving the first question after the second: its own key is not a neighbour
+    assert await position_key(db, Question, exam.id, after_id=second.id, exclude_id=first.id) == (2 * GAP, False)
+
+
+@pytest.mark.asyncio
+async def test_position_key_reports_crowding_and_rebalances_an_exhausted_gap():
+    exam, (first, second), db = _exam_with(0, 2 * ordering.MIN_GAP - 2)
+    assert await position_key(db, Question, exam.id, after_id=first.id) == (ordering.MIN_GAP - 1, True)
+
+    first.order, second.order = 7, 8
+    key, crowded = await position_key(db, Question, exam.id, after_id=first.id)
+    assert (first.order, second.order) == (GAP, 2 * GAP)
+    assert (key, crowded) == (GAP + GAP // 2, False)
+
+
+@pytest.mark.asyncio
+async def test_position_key_rejects_foreign_and_self_anchors():
+    exam, (first,), db = _exam_with(0)
+    with pytest.raises(LookupError):
+        await position_key(db, Question, exam.id, after_id=uuid.uuid4())
+    with pytest.raises(LookupError):
+        await position_key(db, Question, exam.id, before_id=first.id, exclude_id=first.id)
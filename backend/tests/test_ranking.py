@@ -0,0 +1,61 @@
+import random
+import uuid
+
+import pytest
+
+from app.services import ranking
+from app.services.ranking import ScoreIndex
+
+
+def test_rank_percentile_and_nth_highest_match_a_sorted_list():
+    rng = random.Random(3)
+    scores = [rng.randint(0, 150) for _ in range(500)]
+    index = ScoreIndex()
+    for score in scores:
+        index.add(score)
+
+    ordered = sorted(scores, reverse=True)
+    assert index.total == len(scores)
+    for score in (0, 1, 42, 99, 150, 151):
+        higher = sum(s > score for s in scores)
+        below = sum(s < score for s in scores)
+        ties = scores.count(score)
+        assert index.rank(score) == higher + 1
+        assert index.percentile(score) == 100.0 * (below + ties / 2) / len(scores)
+    for n in (1, 2, 10, 250, 500):
+        assert index.nth_highest(n) == ordered[n - 1]
+    assert index.nth_highest(0) is None
+    assert index.nth_highest(501) is None
+
+
+def test_index_grows_and_clamps_negative_scores():
+    index = ScoreIndex([(3, 2), (-5, 1)], size=4)
+    assert index.count_at(0) == 1
+
+    index.add(1000)
+    assert index.size > 1000
+    assert (index.total, index.count_at(3), index.rank(1000), index.rank(3)) == (4, 2, 1, 2)
+    assert index.nth_highest(4) == 0
+
+
+def test_empty_index():
+    index = ScoreIndex()
+    assert (index.rank(10), index.percentile(10), index.nth_highest(1)) == (1, 0.0, None)
+
+
+@pytest.mark.asyncio
+async def test_indexes_and_locks_are_lru_bounded(monkeypatch):
+    async def load(db, exam_id, archived):
+        return ScoreIndex([(1, 1)])
+
+    monkeypatch.setattr(ranking, "_load", load)
+    monkeypatch.setattr(ranking, "_INDEX_CACHE_SIZE", 2)
+    monkeypatch.setattr(ranking, "_indexes", ranking.OrderedDict())
+    monkeypatch.setattr(ranking, "_locks", ranking.OrderedDict())
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    for exam_id in (first, second, first, third):
+        await ranking.get_index(None, exam_id, exam_version=1)
+
+    assert list(ranking._indexes) == [first, third]
+    assert len(ranking._locks) == 2 and third in ranking._locks
@@ -0,0 +1,52 @@
+import uuid
+
+import pytest
+
+from app.models import Exam, Question
+from app.services import ordering
+from app.services.sampling import append_to_pool, order_varies_per_attempt, resolve_ids, sample_questions
+from tests.fakes import FakeSession
+
+
+def _question(exam: Exam, order: int) -> Question:
+    return Question(id=uuid.uuid4(), exam_id=exam.id, content="?", order=order, points=1)
+
+
+@pytest.mark.asyncio
+async def test_students_see_inserted_and_moved_questions_in_teacher_order():
+    exam = Exam(id=uuid.uuid4(), title="Order", randomize_questions=False, version=1)
+    first, second = _question(exam, 0), _question(exam, ordering.GAP)
+    db = FakeSession(exam, first, second)
+    for question in (first, second):
+        exam.question_pool = append_to_pool(exam.question_pool, question.id)
+
+    # Insert a question between the two (added to the pool last)
+    order, _ = await ordering.position_key(db, Question, exam.id, after_id=first.id)
+    inserted = _question(exam, order)
+    db.add(inserted)
+    exam.question_pool = append_to_pool(exam.question_pool, inserted.id)
+    exam.version += 1
+
+    indices = await sample_questions(db, exam)
+    assert resolve_ids(exam.question_pool, indices) == [first.id, inserted.id, second.id]
+
+    # Move the first question to the end
+    first.order, _ = await ordering.position_key(db, Question, exam.id, after_id=second.id, exclude_id=first.id)
+    exam.version += 1
+
+    indices = await sample_questions(db, exam)
+    assert resolve_ids(exam.question_pool, indices) == [inserted.id, second.id, first.id]
+
+
+def test_order_varies_per_attempt_only_when_shuffled_or_partially_drawn():
+    exam = Exam(id=uuid.uuid4(), title="Pool", randomize_questions=False, questions_per_attempt=None)
+    for order in range(3):
+        exam.question_pool = append_to_pool(exam.question_pool, _question(exam, order).id)
+
+    assert not order_varies_per_attempt(exam)
+    exam.questions_per_attempt = 3
+    assert not order_varies_per_attempt(exam)
+    exam.questions_per_attempt = 2
+    assert order_varies_per_attempt(exam)
+    exam.questions_per_attempt, exam.randomize_questions = None, True
+    assert order_varies_per_attempt(exam)
@@ -0,0 +1,41 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import ExamClone, ExamCreate, ExamUpdate, QuestionCreate, UserLogin, UserRegister
+from app.schemas.exam import MAX_QUESTION_POINTS
+
+
+@pytest.mark.parametrize("page_size", [0, -5])
+def test_page_size_must_be_positive(page_size):
+    with pytest.raises(ValidationError):
+        ExamCreate(title="Paged", page_size=page_size)
+    with pytest.raises(ValidationError):
+        ExamUpdate(page_size=page_size)
+    assert ExamUpdate(page_size=None).page_size is None
+
+
+@pytest.mark.parametrize("questions_per_attempt", [0, -3])
+def test_questions_per_attempt_must_be_positive(questions_per_attempt):
+    with pytest.raises(ValidationError):
+        ExamCreate(title="Sampled", questions_per_attempt=questions_per_attempt)
+    with pytest.raises(ValidationError):
+        ExamUpdate(questions_per_attempt=questions_per_attempt)
+
+
+def test_login_and_register_emails_are_lowercased_like_the_roster():
+    assert UserLogin(email="Ann.Lee@Example.COM", password="x").email == "ann.lee@example.com"
+    assert UserRegister(email="Ann.Lee@example.com", password="x", full_name="Ann Lee").email == "ann.lee@example.com"
+
+
+@pytest.mark.parametrize("points", [-1, MAX_QUESTION_POINTS + 1])
+def test_question_points_are_bounded(points):
+    with pytest.raises(ValidationError):
+        QuestionCreate(content="?", points=points, options=[])
+    assert QuestionCreate(content="?", points=MAX_QUESTION_POINTS, options=[]).points == MAX_QUESTION_POINTS
+
+
+@pytest.mark.parametrize("title", ["", "x" * 256])
+def test_clone_title_fits_the_title_column(title):
+    with pytest.raises(ValidationError):
+        ExamClone(title=title)
+    assert ExamClone().title is None
@@ -49,4 +49,16 @@ api.interceptors.response.use(
     }
 );
 
+// One Idempotency-Key per operation, kept for the tab's session so retries
+// and page reloads replay the first response instead of repeating the work
+export function idempotencyKey(operation: string): string {
+    const storageKey = `idempotency:${operation}`;
+    let key = sessionStorage.getItem(storageKey);
+    if (!key) {
+        key = crypto.randomUUID();
+        sessionStorage.setItem(storageKey, key);
+    }
+    return key;
+}
+
 export default api;
@@ -3,14 +3,14 @@ import { Question } from '../types';
 interface QuestionCardProps {
     question: Question;
     questionNumber: number;
-    selectedOptionId: string | null;
+    selectedOptionIds: string[];
     onSelectOption: (questionId: string, optionId: string) => void;
 }
 
 export default function QuestionCard({
     question,
     questionNumber,
-    selectedOptionId,
+    selectedOptionIds,
     onSelectOption,
 }: QuestionCardProps) {
     return (
@@ -19,12 +19,22 @@ export default function QuestionCard({
                 Question {questionNumber} <span style={{ color: 'var(--color-text-secondary)' }}>({question.points} pts)</span>
             </div>
             <div className="question-text">{question.content}</div>
+            {question.media_digest && (
+                <img
+                    src={`/api/v1/media/${question.media_digest}`}
+                    alt=""
+                    style={{ maxWidth: '100%', marginBottom: '1rem' }}
+                />
+            )}
+            {question.multi_select && (
+                <div style={{ color: 'var(--color-text-secondary)', marginBottom: '0.5rem' }}>Select all that apply</div>
+            )}
 
             <div className="option-list">
                 {question.options.map((option) => (
                     <div
                         key={option.id}
-                        className={`option ${selectedOptionId === option.id ? 'selected' : ''}`}
+                        className={`option ${selectedOptionIds.includes(option.id) ? 'selected' : ''}`}
                         onClick={() => onSelectOption(question.id, option.id)}
                     >
                         <div className="option-indicator" />
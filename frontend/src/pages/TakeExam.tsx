@@ -1,7 +1,7 @@
 import { useState, useEffect, useCallback } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import api from '../api/client';
-import { AttemptStart, AttemptResult } from '../types';
+import api, { idempotencyKey } from '../api/client';
+import { AttemptStart, AttemptResult, Question, QuestionPage } from '../types';
 import Timer from '../components/Timer';
 import QuestionCard from '../components/QuestionCard';
 import Navbar from '../components/Navbar';
@@ -11,7 +11,7 @@ export default function TakeExam() {
     const navigate = useNavigate();
 
     const [attempt, setAttempt] = useState<AttemptStart | null>(null);
-    const [answers, setAnswers] = useState<Record<string, string>>({});
+    const [answers, setAnswers] = useState<Record<string, string[]>>({});
     const [isLoading, setIsLoading] = useState(true);
     const [isSubmitting, setIsSubmitting] = useState(false);
     const [error, setError] = useState('');
@@ -23,8 +23,22 @@ export default function TakeExam() {
 
     const startExam = async () => {
         try {
-            const { data } = await api.post<AttemptStart>(`/student/exams/${examId}/start`);
-            setAttempt(data);
+            const { data } = await api.post<AttemptStart>(`/student/exams/${examId}/start`, undefined, {
+                headers: { 'Idempotency-Key': idempotencyKey(`start:${examId}`) },
+            });
+            // Paged exams: fetch the remaining pages so every question can be answered
+            const questions: Question[] = [...(data.exam.questions || [])];
+            let cursor = data.next_cursor;
+            while (cursor) {
+                const { data: page } = await api.get<QuestionPage>(
+                    `/student/exams/${examId}/attempts/${data.attempt_id}/questions`,
+                    { params: { cursor } }
+                );
+                questions.push(...page.questions);
+                cursor = page.next_cursor;
+            }
+            questions.sort((a, b) => a.order - b.order);
+            setAttempt({ ...data, exam: { ...data.exam, questions } });
         } catch (err: unknown) {
             const error = err as { response?: { data?: { detail?: string } } };
             setError(error.response?.data?.detail || 'Failed to start exam');
@@ -34,7 +48,17 @@ export default function TakeExam() {
     };
 
     const handleSelectOption = (questionId: string, optionId: string) => {
-        setAnswers((prev) => ({ ...prev, [questionId]: optionId }));
+        const question = attempt?.exam.questions?.find((q) => q.id === questionId);
+        setAnswers((prev) => {
+            if (!question?.multi_select) {
+                return { ...prev, [questionId]: [optionId] };
+            }
+            const chosen = prev[questionId] || [];
+            const next = chosen.includes(optionId)
+                ? chosen.filter((id) => id !== optionId)
+                : [...chosen, optionId];
+            return { ...prev, [questionId]: next };
+        });
     };
 
     const handleSubmit = useCallback(async () => {
@@ -42,14 +66,20 @@ export default function TakeExam() {
 
         setIsSubmitting(true);
         try {
-            const responses = Object.entries(answers).map(([questionId, optionId]) => ({
-                question_id: questionId,
-                selected_option_id: optionId,
-            }));
-
-            const { data } = await api.post<AttemptResult>(`/student/attempts/${attempt.attempt_id}/submit`, {
-                responses,
-            });
+            const multiSelect = new Set(
+                (attempt.exam.questions || []).filter((q) => q.multi_select).map((q) => q.id)
+            );
+            const responses = Object.entries(answers).map(([questionId, optionIds]) =>
+                multiSelect.has(questionId)
+                    ? { question_id: questionId, selected_option_ids: optionIds }
+                    : { question_id: questionId, selected_option_id: optionIds[0] }
+            );
+
+            const { data } = await api.post<AttemptResult>(
+                `/student/exams/${examId}/attempts/${attempt.attempt_id}/submit`,
+                { responses },
+                { headers: { 'Idempotency-Key': idempotencyKey(`submit:${attempt.attempt_id}`) } }
+            );
 
             setResult(data);
         } catch (err: unknown) {
@@ -121,7 +151,7 @@ export default function TakeExam() {
 
     if (!attempt) return null;
 
-    const answeredCount = Object.keys(answers).length;
+    const answeredCount = Object.values(answers).filter((ids) => ids.length > 0).length;
     const totalQuestions = attempt.exam.questions?.length || 0;
 
     return (
@@ -154,7 +184,7 @@ export default function TakeExam() {
                             key={question.id}
                             question={question}
                             questionNumber={index + 1}
-                            selectedOptionId={answers[question.id] || null}
+                            selectedOptionIds={answers[question.id] || []}
                             onSelectOption={handleSelectOption}
                         />
                     ))}
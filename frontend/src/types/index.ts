@@ -24,6 +24,8 @@ export interface Question {
     content: string;
     order: number;
     points: number;
+    multi_select?: boolean;
+    media_digest?: string;
     options: Option[];
 }
 
@@ -44,6 +46,13 @@ export interface AttemptStart {
     exam: Exam;
     server_time: string;
     expires_at: string;
+    question_order?: string[];
+    next_cursor?: string | null;
+}
+
+export interface QuestionPage {
+    questions: Question[];
+    next_cursor?: string | null;
 }
 
 export interface Attempt {
@@ -72,7 +81,9 @@ export interface ResponseResult {
     question_id: string;
     question_content: string;
     selected_option_id?: string;
-    correct_option_id: string;
+    correct_option_id?: string;
+    selected_option_ids?: string[];
+    correct_option_ids?: string[];
     is_correct: boolean;
     points_earned: number;
     max_points: number;